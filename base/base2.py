@@ -1,10 +1,13 @@
 from enum import IntEnum
 from typing_extensions import CapsuleType
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, GetCoreSchemaHandler, SkipValidation
+from pydantic_core import core_schema
+import numpy as np
 from typing import Dict, Any, Union, Tuple
-from PySide6.QtCore import Signal, QObject
 from base.event_codes import EventCodes, EventType
 import abc
+import threading
+import time
 from collections import defaultdict
 
 event_parsers = defaultdict(lambda: defaultdict(lambda: None))
@@ -25,10 +28,48 @@ def event_parser(etype: EventType, code: int):
         return cls
     return decorator
 
+# 批量解析器注册表：[事件类型][事件代码] -> fn(raw_events) -> 批量结果（如 NumPy 结构化数组）
+batch_event_parsers = defaultdict(lambda: defaultdict(lambda: None))
+
+def batch_event_parser(etype: EventType, code: int):
+    """
+    注册批量解析函数，订阅了批量结果的处理函数每批收到一个结果而不是逐个事件
+    """
+    def decorator(fn):
+        if batch_event_parsers[etype][code]:
+            raise ValueError(f"批量事件解析器 {etype} {code} 已注册")
+        batch_event_parsers[etype][code] = fn
+        return fn
+    return decorator
+
 class GameEvent(BaseModel):
     code: int = 0
     type: EventType = 0
-    raw_data: Dict[int, Any] = {}
+    # 参数字典来自 Photon 解码器，键已是 int，不再逐项校验
+    raw_data: SkipValidation[Dict[int, Any]] = {}
+
+
+class RawGameEvent(object):
+    """
+    未解析的原始游戏事件
+    Photon 解码器为每条消息构造，只保存事件码、类型与参数字典，不做 pydantic 校验；
+    有订阅者时才由解析器升级为具体的 GameEvent 子类，没有解析器时通过 to_model 转换
+    """
+    __slots__ = ('code', 'type', 'raw_data')
+
+    def __init__(self, code: int, type: EventType, raw_data: Dict[int, Any]):
+        self.code = code
+        self.type = type
+        self.raw_data = raw_data
+
+    def to_model(self) -> GameEvent:
+        """
+        转换为 GameEvent（不做校验）
+        """
+        return GameEvent.model_construct(code=self.code, type=self.type, raw_data=self.raw_data)
+
+    def __repr__(self) -> str:
+        return f"RawGameEvent(code={self.code}, type={self.type}, raw_data={self.raw_data})"
 
 
 class EventParserBase(abc.ABC):
@@ -40,7 +81,7 @@ class EventParserBase(abc.ABC):
     type: EventType
     debug: bool = False
 
-    def parse(self, raw: GameEvent) -> GameEvent:
+    def parse(self, raw: Union[GameEvent, RawGameEvent]) -> GameEvent:
         event = self._parse(raw)
         event.code = self.code
         event.type = self.type
@@ -48,7 +89,7 @@ class EventParserBase(abc.ABC):
         return event
 
     @abc.abstractmethod
-    def _parse(self, raw_data: GameEvent) -> GameEvent:
+    def _parse(self, raw_data: Union[GameEvent, RawGameEvent]) -> GameEvent:
         """
         解析原始游戏事件数据
         
@@ -61,8 +102,41 @@ class EventParserBase(abc.ABC):
         pass
 
 
-class RawPacketSignal(QObject):
-    packet_received = Signal(object)
+class CallbackSignal(object):
+    """
+    不依赖 Qt 的回调信号
+    emit 在调用线程中同步执行所有槽函数（等价于 Qt.DirectConnection），connect/disconnect 可在任意线程调用
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots: Tuple[callable, ...] = ()
+
+    def connect(self, slot: callable) -> None:
+        with self._lock:
+            self._slots = self._slots + (slot,)
+
+    def disconnect(self, slot: callable) -> None:
+        with self._lock:
+            slots = list(self._slots)
+            if slot in slots:
+                slots.remove(slot)
+            self._slots = tuple(slots)
+
+    def emit(self, *args) -> None:
+        # 读取快照，emit 期间 connect/disconnect 不影响本次调用
+        for slot in self._slots:
+            slot(*args)
+
+
+class RawPacketSignal(object):
+    """
+    数据包提供者到引擎的原始数据包通道，槽函数在抓包线程中执行
+    """
+
+    def __init__(self):
+        self.packet_received = CallbackSignal()
+        self.batch_received = CallbackSignal()
 
     def emit_packet(self, packet: object) -> None:
         """
@@ -91,28 +165,167 @@ class RawPacketSignal(QObject):
         """
         self.packet_received.disconnect(slot)
 
+    def emit_batch(self, packets: list) -> None:
+        """
+        批量发射收到的数据包，一次跨线程事件投递整批数据
+        
+        Args:
+            packets: 数据包列表
+        """
+        self.batch_received.emit(packets)
+
+    def _connect_batch_signal(self, slot: callable) -> None:
+        """
+        连接批量信号到槽函数
+        
+        Args:
+            slot: 接收数据包列表的槽函数
+        """
+        self.batch_received.connect(slot)
+
+    def _disconnect_batch_signal(self, slot: callable) -> None:
+        """
+        断开批量信号与槽函数的连接
+        
+        Args:
+            slot: 要断开的槽函数
+        """
+        self.batch_received.disconnect(slot)
+
+
+class PacketBatcher(object):
+    """
+    数据包聚合器
+    按数量或时间窗口聚合数据包，满足任一条件即整批推送
+    """
+
+    def __init__(self, flush: callable, max_count: int = 64, max_delay: float = 0.002):
+        """
+        Args:
+            flush: 接收数据包列表的推送函数
+            max_count: 每批最大数据包数，达到即立即推送
+            max_delay: 批内首个数据包的最长等待时间（秒）
+        """
+        self._flush = flush
+        self.max_count = max_count
+        self.max_delay = max_delay
+        self._packets: list = []
+        self._first_time: float = 0.0
+        self._cond = threading.Condition()
+        # 取出与推送作为一步执行，超时线程与抓包线程推送的批次不会交错乱序（先于 _cond 获取）
+        self._emit_lock = threading.Lock()
+        self._running = False
+        self._thread: threading.Thread = None
+
+    def start(self) -> None:
+        """启动超时推送线程"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """推送剩余数据包并停止超时推送线程"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._take_and_flush()
+
+    def add(self, packet: object) -> None:
+        """
+        加入一个数据包
+        
+        Args:
+            packet: 数据包内容
+        """
+        with self._cond:
+            self._packets.append(packet)
+            if len(self._packets) == 1:
+                self._first_time = time.monotonic()
+                self._cond.notify()
+            full = len(self._packets) >= self.max_count
+        if full:
+            self._take_and_flush()
+
+    def flush(self) -> None:
+        """立即推送当前已聚合的数据包"""
+        self._take_and_flush()
+
+    def _take_and_flush(self) -> None:
+        with self._emit_lock:
+            with self._cond:
+                batch = self._packets
+                self._packets = []
+            if batch:
+                self._flush(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._packets:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                remaining = self._first_time + self.max_delay - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+            self._take_and_flush()
 
 
 
 class PacketProvider(abc.ABC):
 
-    def __init__(self, signal: RawPacketSignal):
+    def __init__(self, signal: RawPacketSignal, batch_size: int = 1, batch_interval: float = 0.002):
         """
         初始化数据包提供者
         
         Args:
             signal: 用于传输数据包内容的信号
+            batch_size: 每批最大数据包数，<= 1 时逐包发射
+            batch_interval: 批内首个数据包的最长等待时间（秒）
         """
         self.signal = signal
+        self._batcher = PacketBatcher(signal.emit_batch, batch_size, batch_interval) if batch_size > 1 else None
 
     def emit(self, packet: bytes) -> None:
         """
-        发射收到的数据包
+        发射收到的数据包，启用批量模式时先进入聚合器
         
         Args:
             packet: 要发射的数据包内容
         """
-        self.signal.emit_packet(packet)
+        if self._batcher:
+            self._batcher.add(packet)
+        else:
+            self.signal.emit_packet(packet)
+
+    def emit_many(self, packets: list) -> None:
+        """
+        发射一批已聚合好的数据包（如批量接收所得），直接整批投递
+        
+        Args:
+            packets: 数据包列表
+        """
+        if self._batcher:
+            # 先推送聚合器中较早的数据包，保持顺序
+            self._batcher.flush()
+        self.signal.emit_batch(packets)
+
+    def _start_batching(self) -> None:
+        """启动批量聚合（子类在 start 中调用）"""
+        if self._batcher:
+            self._batcher.start()
+
+    def _stop_batching(self) -> None:
+        """推送剩余数据包并停止批量聚合（子类在 stop 中调用）"""
+        if self._batcher:
+            self._batcher.stop()
 
     @abc.abstractmethod
     def start(self, signal: RawPacketSignal) -> bool:
@@ -147,48 +360,90 @@ class PacketProvider(abc.ABC):
         pass
 
 
-class P(BaseModel):
-    # 保留原有字段定义（默认值、类型校验）
-    x: float = 0.0
-    y: float = 0.0
+class P(tuple):
+    """
+    不可变二维坐标点
+    基于 tuple 实现，每个点只占一个二元组，构造时把坐标转为 float，不经过 pydantic 校验；
+    可直接作为 pydantic 模型字段，接受 P / (x, y) / [x, y] / {"x": x, "y": y}，序列化为 (x, y)
+    """
+    __slots__ = ()
+
+    def __new__(cls, x: float = 0.0, y: float = 0.0) -> 'P':
+        return tuple.__new__(cls, (float(x), float(y)))
+
+    @property
+    def x(self) -> float:
+        return self[0]
+
+    @property
+    def y(self) -> float:
+        return self[1]
+
+    def __repr__(self) -> str:
+        return f"P(x={self[0]}, y={self[1]})"
+
+    def __getnewargs__(self) -> Tuple[float, float]:
+        return (self[0], self[1])
+
+    def distance(self, other: 'P') -> float:
+        return ((self[0] - other.x) ** 2 + (self[1] - other.y) ** 2) ** 0.5
+
+    def model_dump(self, as_dict: bool = False, **kwargs) -> Union[tuple[float, float], dict[str, float]]:
+        """
+        兼容原 pydantic 模型的 model_dump，默认返回元组 (x,y)，as_dict=True 返回字典
+        """
+        if as_dict:
+            return {"x": self[0], "y": self[1]}
+        return (self[0], self[1])
 
-    @model_validator(mode='before')
     @classmethod
-    def validate_tuple_list_input(cls, values: Any) -> Union[dict, Any]:
+    def validate(cls, value: Any) -> 'P':
         """
-        Pydantic 前置验证器：将列表/元组转为字典格式，供模型初始化使用
-        mode='before'：在字段校验前执行，处理原始输入
+        将 P / 二元列表或元组 / 含 x,y 的字典或对象转换为 P
         """
-        # 情况1：输入是列表/元组（长度必须为2）
-        if isinstance(values, (list, tuple)):
-            if len(values) != 2:
-                raise ValueError(f"列表/元组必须包含2个元素（x,y），但收到 {len(values)} 个")
-            # 转为字典格式（Pydantic 能识别的格式）
-            return {"x": values[0], "y": values[1]}
-        # 情况2：输入是字典/已实例化对象 → 直接返回（保留原有逻辑）
-        return values
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, (list, tuple)):
+            if len(value) != 2:
+                raise ValueError(f"列表/元组必须包含2个元素（x,y），但收到 {len(value)} 个")
+            return cls(value[0], value[1])
+        if isinstance(value, dict):
+            return cls(value.get("x", 0.0), value.get("y", 0.0))
+        if hasattr(value, "x") and hasattr(value, "y"):
+            return cls(value.x, value.y)
+        raise ValueError(f"无法转换为坐标点: {value!r}")
 
-    def distance(self, other: 'P') -> float:
-        return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** 0.5
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        # 兼容嵌入 P 的 pydantic 模型（MoveEvent、MapPath 等）以及旧版保存的 {"x", "y"} 数据
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(lambda p: (p[0], p[1])),
+        )
+
+    @staticmethod
+    def to_array(points) -> np.ndarray:
+        """
+        将坐标点序列（列表、生成器或数组）转换为 (N, 2) 的 float64 数组
+        """
+        array = np.asarray(list(points) if not isinstance(points, np.ndarray) else points, dtype=np.float64)
+        if array.size == 0:
+            return np.empty((0, 2), dtype=np.float64)
+        return array.reshape(-1, 2)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> list:
+        """
+        将 (N, 2) 数组转换为坐标点列表
+        """
+        return [cls(x, y) for x, y in np.asarray(array, dtype=np.float64).reshape(-1, 2).tolist()]
 
-    def model_dump(
-        self,
-        as_dict: bool = False,  # 新增参数：是否返回字典（兼容原有逻辑）
-        **kwargs
-    ) -> Union[tuple[float, float], dict[str, float]]:
+    def distances(self, points) -> np.ndarray:
         """
-        重写model_dump方法，默认返回元组 (x,y)，可选返回字典
-        :param as_dict: True=返回字典（原有行为），False=返回元组（自定义行为）
-        :param kwargs: 透传父类model_dump的参数（如 exclude_none、include 等）
-        :return: 元组或字典
+        向量化计算本点到一组坐标点（序列或 (N, 2) 数组）的距离
         """
-        # 先调用父类方法获取原始字典
-        original_dict = super().model_dump(** kwargs)
-        
-        # 根据as_dict参数返回对应格式
-        if as_dict:
-            return original_dict
-        return (original_dict["x"], original_dict["y"])
+        array = points if isinstance(points, np.ndarray) else P.to_array(points)
+        return np.hypot(array[:, 0] - self[0], array[:, 1] - self[1])
 
 class ObjectType(IntEnum):
     Unknown = 0
@@ -4,8 +4,9 @@
 """
 from PySide6.QtWidgets import QWidget
 from PySide6.QtCore import QObject
-from typing import Any, Optional
+from typing import Any, Optional, Tuple
 from base.base2 import GameEvent
+from base.event_codes import EventType
 from core.config import global_config_manager, PluginConfig
 
 
@@ -18,6 +19,11 @@ class BasePlugin:
     - 事件处理接口
     - UI 组件接口
     """
+
+    # 插件消费的 (事件类型, 事件代码)，分发器只为这些事件解析并调用 handle_event
+    subscriptions: Tuple[Tuple[EventType, int], ...] = ()
+    # 为 True 时同时注册为 Debug 处理函数，仅在启用 DebugTap 后接收抽样事件
+    debug_tap: bool = False
     
     def __init__(self, plugin_id: str, display_name: str):
         self.id = plugin_id
@@ -0,0 +1,5 @@
+"""
+基准测试
+合成或录制的抓包依次经过各处理阶段，报告吞吐、延迟与内存分配，结果可保存为 JSON 并与基线比较，
+见 python -m bench --help
+"""
@@ -0,0 +1,136 @@
+"""
+端到端吞吐基准
+
+用法:
+    python -m bench                                  合成 ZvZ 会话（500 玩家, 5000 Move/s, 10 秒）
+    python -m bench --recording session.aprc         回放录制文件（PacketRecorder / 配置 record_file）
+    python -m bench --output results.json            保存结果
+    python -m bench --compare baseline.json          与之前的结果比较，有退化时退出码为 1
+    python -m bench --save-recording zvz.aprc        把合成会话保存为录制文件
+    python -m bench.micro [名称 ...]                 组件微基准（见 bench/micro.py）
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from typing import Dict, List
+
+from bench.stages import STAGES, run_stages
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """
+    与基线比较：事件数/秒下降或 p99 延迟上升超过 threshold（比例）视为退化
+
+    Returns:
+        退化描述列表
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or "skipped" in current or "skipped" in previous:
+            continue
+        if previous["events_per_s"] and current["events_per_s"] < previous["events_per_s"] * (1 - threshold):
+            regressions.append(
+                f"{name}: 事件数/秒 {previous['events_per_s']:,.0f} -> {current['events_per_s']:,.0f}"
+            )
+        if previous.get("p99_us") and current.get("p99_us") and current["p99_us"] > previous["p99_us"] * (1 + threshold):
+            regressions.append(f"{name}: p99 {previous['p99_us']:.2f} us -> {current['p99_us']:.2f} us")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="端到端吞吐基准")
+    parser.add_argument("--recording", help="回放录制文件，不指定时使用合成 ZvZ 会话")
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--moves-per-second", type=int, default=5000)
+    parser.add_argument("--casts-per-second", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=10.0, help="合成会话时长（秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"逗号分隔，可选 {','.join(STAGES)}")
+    parser.add_argument("--alloc-sample", type=int, default=2000, help="统计内存分配的对象数，0 表示不统计")
+    parser.add_argument("--save-recording", help="把合成会话保存为录制文件")
+    parser.add_argument("--output", help="结果 JSON 路径")
+    parser.add_argument("--compare", help="基线结果 JSON 路径")
+    parser.add_argument("--threshold", type=float, default=0.10, help="视为退化的变化比例")
+    args = parser.parse_args()
+
+    if args.recording:
+        from network.recording import read_recording
+        packets = list(read_recording(args.recording))
+        source = {"recording": args.recording}
+    else:
+        from bench.synthetic import zvz_session
+        packets = list(zvz_session(
+            players=args.players,
+            moves_per_second=args.moves_per_second,
+            casts_per_second=args.casts_per_second,
+            duration=args.duration,
+            seed=args.seed,
+        ))
+        source = {
+            "synthetic": "zvz",
+            "players": args.players,
+            "moves_per_second": args.moves_per_second,
+            "casts_per_second": args.casts_per_second,
+            "duration": args.duration,
+            "seed": args.seed,
+        }
+        if args.save_recording:
+            from network.recording import PacketRecorder
+            recorder = PacketRecorder(args.save_recording)
+            for timestamp_ns, payload in packets:
+                recorder.record(payload, timestamp_ns)
+            recorder.close()
+            print(f"[Bench] 已保存录制文件 {args.save_recording}")
+    print(f"[Bench] {len(packets)} 个数据包, {sum(len(p) for _, p in packets)} 字节")
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"未知的阶段: {', '.join(sorted(unknown))}")
+    results = run_stages(packets, stages, args.alloc_sample)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "packets": len(packets),
+            "source": source,
+        },
+        "stages": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[Bench] 结果已保存到 {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline.get("stages", {}), args.threshold)
+        base_commit = baseline.get("meta", {}).get("commit", "?")
+        if regressions:
+            print(f"[Bench] 与 {base_commit} 相比出现退化 (阈值 {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"[Bench] 与 {base_commit} 相比无退化 (阈值 {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
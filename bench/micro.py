@@ -0,0 +1,243 @@
+"""
+组件微基准
+各数据结构 / 解析方式的新旧实现对比，原先分散在各模块的 __main__ 中
+
+用法:
+    python -m bench.micro                 运行全部
+    python -m bench.micro spatial spells  只运行指定的基准，可选名称见 MICRO
+"""
+import gc
+import random
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Dict
+
+import numpy as np
+
+from base.event_codes import EventType
+
+
+def event_models() -> None:
+    """比较每条消息构造校验参数字典的 pydantic 模型、GameEvent 与 RawGameEvent 的开销"""
+    from pydantic import BaseModel
+    from base.base2 import GameEvent, RawGameEvent
+
+    class ValidatedGameEvent(BaseModel):
+        code: int = 0
+        type: EventType = 0
+        raw_data: Dict[int, Any] = {}
+
+    samples = {
+        "Move": {0: 123456, 1: bytes(30)},
+        "NewCharacter": {i: i for i in range(48)} | {40: list(range(10)), 43: list(range(6)), 1: "Player", 252: 29},
+        "HugeTable": {i: [i] * 16 for i in range(200)},
+    }
+    number = 20000
+    for name, parameters in samples.items():
+        validated = timeit.timeit(lambda: ValidatedGameEvent(code=1, type=EventType.Event, raw_data=parameters), number=number)
+        model = timeit.timeit(lambda: GameEvent(code=1, type=EventType.Event, raw_data=parameters), number=number)
+        raw = timeit.timeit(lambda: RawGameEvent(1, EventType.Event, parameters), number=number)
+        print(
+            f"{name:<14} 校验字典 {validated / number * 1e6:7.2f} us  "
+            f"GameEvent {model / number * 1e6:7.2f} us  "
+            f"RawGameEvent {raw / number * 1e6:7.2f} us  x{validated / raw:.1f}"
+        )
+
+
+def equipment() -> None:
+    """逐个校验构造 Item 的旧解析方式与扁平元组解码 + 查找表的对比"""
+    from base.base2 import Equipment, Item, SlotType
+    from event_tool.equipment import SLOT_SPELL_INDICES, EquipmentTables, decode_equipment, parses_equipments
+
+    eqs = [1000 + i for i in range(10)]
+    sps = [2000 + i for i in range(14)]
+    tables = EquipmentTables(
+        {1000 + i: (f"T8_ARMOR_PLATE_SET{i}", f"物品{i}", "PLATE") for i in range(10)},
+        [f"技能{i}" for i in range(3000)],
+    )
+
+    def validated():
+        equipment = Equipment()
+        for slot, name in enumerate(Equipment.model_fields):
+            item = Item(slot_type=SlotType(slot), index=eqs[slot])
+            item.spells = [int(sps[i]) for i in SLOT_SPELL_INDICES[slot] if int(sps[i]) != 0]
+            setattr(equipment, name, item)
+
+    def flat():
+        for index, spells in decode_equipment(eqs, sps):
+            if index:
+                tables.item(index)
+                [tables.spell_name(s) for s in spells]
+
+    number = 20000
+    old = timeit.timeit(validated, number=number) / number * 1e6
+    new = timeit.timeit(flat, number=number) / number * 1e6
+    construct = timeit.timeit(lambda: parses_equipments(eqs, sps), number=number) / number * 1e6
+    print(f"校验构造 Item {old:6.2f} us  扁平解码+查表 {new:6.2f} us  扁平解码+构造 Equipment {construct:6.2f} us")
+
+
+def player_cache() -> None:
+    """按 oid 解析 CastStart 的施法者，对比线性扫描与 oid 索引"""
+    from plugins.player_detector.player_cache import PlayerCache
+
+    lookups = 10000
+    for size in (500, 5000):
+        cache = PlayerCache(max_size=size)
+        for i in range(size):
+            cache.put({"oid": 100000 + i, "name": f"Player{i}"})
+        oids = [100000 + random.randrange(size) for _ in range(lookups)]
+
+        def linear_scan():
+            for oid in oids:
+                for p in cache.values():
+                    if p["oid"] == oid:
+                        break
+
+        def indexed():
+            for oid in oids:
+                cache.name_by_oid(oid)
+
+        scan = timeit.timeit(linear_scan, number=1) / lookups
+        index = timeit.timeit(indexed, number=1) / lookups
+        print(f"{size:>5} 个玩家: 线性扫描 {scan * 1e6:8.2f} us/次  oid 索引 {index * 1e6:6.3f} us/次")
+
+
+def spatial() -> None:
+    """网格索引与逐个实体扫描的对比（坐标范围 1000 x 1000，查询半径 30）"""
+    from core.spatial_index import SpatialGrid
+
+    rng = np.random.default_rng(0)
+    queries = 200
+    for count in (100, 1000, 10000):
+        oids = list(range(count))
+        xs = rng.uniform(-500, 500, count)
+        ys = rng.uniform(-500, 500, count)
+        grid = SpatialGrid()
+        grid.update_many(oids, xs, ys)
+        centers = rng.uniform(-500, 500, (queries, 2)).tolist()
+        positions = np.column_stack((xs, ys))
+
+        # 每轮 10% 的实体移动一小段距离
+        moved = rng.choice(count, max(1, count // 10), replace=False)
+        move_xs, move_ys = xs[moved] + 1.5, ys[moved] - 1.5
+        moved_oids = moved.tolist()
+
+        def scan_radius():
+            for cx, cy in centers:
+                d = np.hypot(positions[:, 0] - cx, positions[:, 1] - cy)
+                np.flatnonzero(d <= 30)
+
+        def grid_radius():
+            for cx, cy in centers:
+                grid.query_radius(cx, cy, 30)
+
+        def scan_nearest():
+            for cx, cy in centers:
+                d = np.hypot(positions[:, 0] - cx, positions[:, 1] - cy)
+                np.argpartition(d, min(5, count - 1))[:5]
+
+        def grid_nearest():
+            for cx, cy in centers:
+                grid.nearest(cx, cy, 5)
+
+        def grid_bbox():
+            for cx, cy in centers:
+                grid.query_bbox(cx - 30, cy - 30, cx + 30, cy + 30)
+
+        def grid_update():
+            grid.update_many(moved_oids, move_xs, move_ys)
+
+        def us(fn, n=queries, repeat=5):
+            return timeit.timeit(fn, number=repeat) / (repeat * n) * 1e6
+
+        print(
+            f"{count:>6} 个实体: "
+            f"半径 扫描 {us(scan_radius):7.1f} us / 网格 {us(grid_radius):6.1f} us  "
+            f"k近邻 扫描 {us(scan_nearest):7.1f} us / 网格 {us(grid_nearest):6.1f} us  "
+            f"矩形 网格 {us(grid_bbox):6.1f} us  "
+            f"更新 {len(moved_oids)} 个 {us(grid_update, 1):8.1f} us"
+        )
+
+
+def spells() -> None:
+    """CastStart 按序号查询技能"""
+    from game_data.spells import get_spell_by_index, get_spell_name, get_spell_table
+
+    count = len(get_spell_table())
+    number = 100000
+    hit = timeit.timeit(lambda: get_spell_by_index(count // 2), number=number) / number * 1e6
+    miss = timeit.timeit(lambda: get_spell_by_index(-5), number=number) / number * 1e6
+    name = timeit.timeit(lambda: get_spell_name(count // 2), number=number) / number * 1e6
+    print(f"{count} 个技能  get_spell_by_index 命中 {hit:.3f} us / 未命中 {miss:.3f} us  get_spell_name {name:.3f} us")
+
+
+def localization() -> None:
+    """内存报告：旧的 {id: {语言: 文本}} 字典（全部语言）与只加载默认语言的排序表对比"""
+    from game_data.cache import load_cached
+    from game_data.localization import (
+        CATEGORIES,
+        DEFAULT_LANGS,
+        LOCALIZATION_CACHE_SCHEMA,
+        LOCALIZATION_SOURCE,
+        _build_localization_cache,
+        load,
+    )
+    from game_data import localization as module
+
+    data = load_cached('localization', LOCALIZATION_CACHE_SCHEMA, [LOCALIZATION_SOURCE], _build_localization_cache)
+
+    def legacy_layout():
+        tables = [{} for _ in CATEGORIES]
+        keys = data.strings['key'].tolist()
+        columns = [(lang, data.strings[f'seg:{lang}'].tolist()) for lang in data.meta['langs']]
+        bounds = data.meta['bounds']
+        for category, table in enumerate(tables):
+            for i in range(bounds[category], bounds[category + 1]):
+                table[keys[i]] = {lang: column[i] for lang, column in columns if column[i] is not None}
+        return tables
+
+    def measure(build):
+        gc.collect()
+        tracemalloc.start()
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, size
+
+    _, before = measure(legacy_layout)
+    _, after = measure(lambda: load(DEFAULT_LANGS))
+    print(f"全部 {len(data.meta['langs'])} 种语言的字典: {before / 2 ** 20:8.1f} MB")
+    print(f"{'/'.join(DEFAULT_LANGS)} 排序表:      {after / 2 ** 20:8.1f} MB")
+    for attr, size in module.localization.memory_usage().items():
+        print(f"  {attr:<14} {size / 2 ** 20:8.2f} MB")
+
+
+# 名称 -> 基准函数
+MICRO = {
+    "event_models": event_models,
+    "equipment": equipment,
+    "player_cache": player_cache,
+    "spatial": spatial,
+    "spells": spells,
+    "localization": localization,
+}
+
+
+def main(names) -> int:
+    unknown = [name for name in names if name not in MICRO]
+    if unknown:
+        print(f"[Bench] 未知的基准: {', '.join(unknown)}，可选 {', '.join(MICRO)}")
+        return 2
+    for name in names or MICRO:
+        print(f"[Bench] {name}: {MICRO[name].__doc__}")
+        try:
+            MICRO[name]()
+        except (ImportError, OSError) as e:
+            # 可选依赖或游戏数据文件缺失
+            print(f"[Bench] {name} 跳过: {e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
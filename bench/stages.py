@@ -0,0 +1,285 @@
+"""
+分阶段基准
+把同一段抓包依次送入各处理阶段，每个阶段单独计时:
+
+    l2_l4        FusedParser.parse_ethernet（以太网帧 -> UDP 负载）
+    photon       PhotonPacketParser.parse（按分发器的订阅跳过无人订阅的消息）
+    parse        core.events.game_event.parse（RawGameEvent -> GameEvent）
+    dispatch     GameEventDispatcher._dispatch + flush_gui_events（处理函数为空操作）
+    plugin:<id>  各插件的 handle_event（只送入其订阅的事件）
+    engine       端到端：ReplayProvider 不限速回放到 Engine，直到解码线程处理完
+
+每个阶段报告处理的对象数、事件数/秒、单个对象的 p50/p99 延迟，以及在前 alloc_sample 个对象上
+用 tracemalloc 统计的每对象内存分配峰值与保留的内存块数
+"""
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import traceback
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from base.event_codes import EventType
+
+# 可运行的阶段，plugins 为每个插件各一个 plugin:<id> 结果
+STAGES = ("l2_l4", "photon", "parse", "dispatch", "plugins", "engine")
+
+
+def _noop(_event) -> None:
+    pass
+
+
+def _allocations(items: Sequence, fn: Callable[[object], object], sample: int) -> Dict[str, float]:
+    """
+    在前 sample 个对象上统计内存分配
+    CPython 没有廉价的分配次数计数，这里报告每对象的分配峰值（字节）与处理后仍保留的内存块数
+    """
+    items = items[:sample]
+    if not items:
+        return {"alloc_peak_bytes": 0.0, "retained_blocks": 0.0}
+    gc.collect()
+    tracemalloc.start()
+    peak_total = 0
+    blocks_before = sys.getallocatedblocks()
+    for item in items:
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        fn(item)
+        peak_total += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+    retained = sys.getallocatedblocks() - blocks_before
+    return {
+        "alloc_peak_bytes": peak_total / len(items),
+        "retained_blocks": max(retained, 0) / len(items),
+    }
+
+
+def measure(
+    name: str,
+    unit: str,
+    items: Sequence,
+    fn: Callable[[object], object],
+    events: int,
+    alloc_sample: int = 2000,
+    setup: Optional[Callable[[], None]] = None,
+) -> dict:
+    """
+    逐个处理 items 并计时
+
+    Args:
+        name: 阶段名
+        unit: 处理对象的单位（packet / event）
+        items: 处理对象
+        fn: 处理函数
+        events: 本阶段处理的游戏事件数，用于计算事件数/秒
+        alloc_sample: 统计内存分配的对象数，0 表示不统计
+        setup: 统计内存分配前重置状态的函数（如清空实体表）
+
+    Returns:
+        阶段结果字典
+    """
+    latencies = np.empty(len(items), dtype=np.int64)
+    clock = time.perf_counter_ns
+    gc.collect()
+    start = clock()
+    for i, item in enumerate(items):
+        t = clock()
+        fn(item)
+        latencies[i] = clock() - t
+    elapsed = (clock() - start) / 1e9
+
+    result = {
+        "unit": unit,
+        "items": len(items),
+        "events": events,
+        "seconds": elapsed,
+        "items_per_s": len(items) / elapsed if elapsed else 0.0,
+        "events_per_s": events / elapsed if elapsed else 0.0,
+        "p50_us": float(np.percentile(latencies, 50)) / 1000 if len(items) else None,
+        "p99_us": float(np.percentile(latencies, 99)) / 1000 if len(items) else None,
+    }
+    if alloc_sample > 0:
+        if setup is not None:
+            setup()
+        allocations = _allocations(items, fn, alloc_sample)
+        result.update({
+            "alloc_peak_bytes_per_item": allocations["alloc_peak_bytes"],
+            "retained_blocks_per_item": allocations["retained_blocks"],
+        })
+    print(
+        f"[Bench] {name:<22} {len(items):>8} {unit:<6} {result['events_per_s']:>12,.0f} 事件/s  "
+        f"p50 {result['p50_us'] or 0:8.2f} us  p99 {result['p99_us'] or 0:8.2f} us"
+    )
+    return result
+
+
+def load_plugins() -> Tuple[list, Optional[str]]:
+    """
+    加载默认插件实例
+
+    Returns:
+        (插件列表, 无法加载时的原因)；插件包依赖的可选模块缺失时返回空列表
+    """
+    try:
+        import plugins
+    except ImportError as e:
+        return [], f"无法导入插件: {e}"
+    return [plugins.log_plugin, plugins.player_plugin, plugins.fps_plugin, plugins.path_recorder_plugin], None
+
+
+def _subscriptions(plugin_list: list) -> List[Tuple[EventType, int]]:
+    subscriptions = []
+    for plugin in plugin_list:
+        subscriptions.extend(plugin.subscriptions)
+    return subscriptions
+
+
+def run_stages(
+    packets: Sequence[Tuple[int, bytes]],
+    stages: Sequence[str] = STAGES,
+    alloc_sample: int = 2000,
+) -> Dict[str, dict]:
+    """
+    依次运行各阶段
+
+    Args:
+        packets: (时间戳纳秒, UDP 负载) 列表
+        stages: 要运行的阶段，见 STAGES
+        alloc_sample: 统计内存分配的对象数
+
+    Returns:
+        阶段名 -> 结果字典；无法运行的阶段结果为 {"skipped": 原因}
+    """
+    from core.engine import Engine, HandlerLane
+    from core.events.game_event import parse
+    from core.photon_parser import PhotonPacketParser
+    from network.parsers.fused import FusedParser
+    from bench.synthetic import frame_udp
+
+    results: Dict[str, dict] = {}
+    payloads = [payload for _, payload in packets]
+    plugin_list, plugin_error = load_plugins()
+    subscriptions = _subscriptions(plugin_list)
+
+    # 与应用相同的分发器（含实体表），插件的订阅以空操作代替，只测分发本身
+    engine = Engine()
+    dispatcher = engine.game_event_dispatcher
+    for event_type, event_code in subscriptions:
+        dispatcher.register(event_type, [event_code], _noop, lane=HandlerLane.WORKER)
+
+    # 先解码一遍，得到各阶段的输入
+    raw_by_packet: List[list] = []
+    collected: list = []
+    decoder = PhotonPacketParser(collected.append, wants=dispatcher.wants)
+    for payload in payloads:
+        decoder.parse(payload)
+        raw_by_packet.append(collected[:])
+        collected.clear()
+    raw_events = [event for events in raw_by_packet for event in events]
+    event_count = len(raw_events)
+
+    if "l2_l4" in stages:
+        frames = [frame_udp(payload) for payload in payloads]
+        results["l2_l4"] = measure("l2_l4", "packet", frames, FusedParser.parse_ethernet, event_count, alloc_sample)
+
+    if "photon" in stages:
+        sink = PhotonPacketParser(_noop, wants=dispatcher.wants)
+        results["photon"] = measure("photon", "packet", payloads, sink.parse, event_count, alloc_sample)
+
+    parsed = [parse(event) for event in raw_events]
+    if "parse" in stages:
+        results["parse"] = measure("parse", "event", raw_events, parse, event_count, alloc_sample)
+
+    if "dispatch" in stages:
+        def dispatch(events: list) -> None:
+            for event in events:
+                dispatcher._dispatch(event)
+            dispatcher.flush_gui_events()
+
+        def reset() -> None:
+            if engine.entity_store is not None:
+                engine.entity_store.clear()
+
+        reset()
+        results["dispatch"] = measure("dispatch", "packet", raw_by_packet, dispatch, event_count, alloc_sample, setup=reset)
+
+    if "plugins" in stages:
+        if plugin_error:
+            results["plugins"] = {"skipped": plugin_error}
+            print(f"[Bench] plugins 跳过: {plugin_error}")
+        for plugin in plugin_list:
+            wanted = set(plugin.subscriptions)
+            events = [event for event in parsed if (event.type, event.code) in wanted]
+            name = f"plugin:{plugin.id}"
+            try:
+                for event in events[:1]:
+                    plugin.handle_event(event)
+            except Exception as e:
+                results[name] = {"skipped": f"handle_event 出错: {e!r}"}
+                print(f"[Bench] {name} 跳过: {e!r}")
+                continue
+            results[name] = measure(name, "event", events, plugin.handle_event, len(events), alloc_sample)
+
+    if "engine" in stages:
+        results["engine"] = run_engine(packets, subscriptions, event_count)
+    return results
+
+
+def run_engine(packets: Sequence[Tuple[int, bytes]], subscriptions: List[Tuple[EventType, int]], events: int, batch_size: int = 64) -> dict:
+    """
+    端到端：写入临时录制文件，不限速回放到 Engine（BLOCK 溢出策略，不丢包），等待解码线程处理完
+
+    Returns:
+        阶段结果字典，端到端没有单个对象的延迟
+    """
+    from core.engine import Engine, HandlerLane
+    from core.packet_queue import OverflowPolicy
+    from network.providers.replay import ReplayProvider
+    from network.recording import PacketRecorder
+
+    fd, path = tempfile.mkstemp(suffix=".aprc")
+    os.close(fd)
+    os.remove(path)
+    try:
+        recorder = PacketRecorder(path)
+        for timestamp_ns, payload in packets:
+            recorder.record(payload, timestamp_ns)
+        recorder.close()
+
+        engine = Engine(overflow_policy=OverflowPolicy.BLOCK)
+        for event_type, event_code in subscriptions:
+            engine.game_event_dispatcher.register(event_type, [event_code], _noop, lane=HandlerLane.WORKER)
+        provider = ReplayProvider(engine.packet_signal, path, speed=0, batch_size=batch_size)
+        gc.collect()
+        start = time.perf_counter()
+        engine.start(provider)
+        try:
+            provider.wait()
+            engine.wait_idle()
+            elapsed = time.perf_counter() - start
+        finally:
+            engine.stop()
+    except Exception as e:
+        traceback.print_exc()
+        return {"skipped": f"端到端运行失败: {e!r}"}
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    result = {
+        "unit": "packet",
+        "items": len(packets),
+        "events": events,
+        "seconds": elapsed,
+        "items_per_s": len(packets) / elapsed if elapsed else 0.0,
+        "events_per_s": events / elapsed if elapsed else 0.0,
+        "p50_us": None,
+        "p99_us": None,
+        "queue": engine.get_queue_stats(),
+    }
+    print(f"[Bench] {'engine':<22} {len(packets):>8} packet {result['events_per_s']:>12,.0f} 事件/s  {elapsed:.3f} s")
+    return result
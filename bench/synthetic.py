@@ -0,0 +1,267 @@
+"""
+合成 Photon 抓包
+按 Protocol16 编码事件，组装为 Photon UDP 负载（可再套上以太网 / IPv4 / UDP 头），
+并生成 ZvZ 规模的对战会话：大量玩家进场、持续移动、施法与血量变化，最后离场
+"""
+import random
+import struct
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from base.event_codes import EventCodes
+from network.photon.constants import (
+    PhotonCommandType,
+    PhotonMessageType,
+    PhotonParameterKey,
+    PhotonSignatures,
+    Protocol16Type,
+)
+from network.photon.detector import PhotonDetector
+
+# 参数值: (Protocol16 类型码, 值)
+TypedValue = Tuple[int, Any]
+
+# 单个 UDP 负载的最大长度
+MTU = 1200
+
+_MOVE_PAYLOAD = struct.Struct('<BQffBfff')
+
+
+def byte(value: int) -> TypedValue:
+    return Protocol16Type.Byte, value
+
+
+def short(value: int) -> TypedValue:
+    return Protocol16Type.Short, value
+
+
+def integer(value: int) -> TypedValue:
+    return Protocol16Type.Integer, value
+
+
+def long(value: int) -> TypedValue:
+    return Protocol16Type.Long, value
+
+
+def float32(value: float) -> TypedValue:
+    return Protocol16Type.Float, value
+
+
+def string(value: str) -> TypedValue:
+    return Protocol16Type.String, value
+
+
+def byte_array(value: bytes) -> TypedValue:
+    return Protocol16Type.ByteArray, value
+
+
+def short_array(values: Sequence[int]) -> TypedValue:
+    return Protocol16Type.Array, (Protocol16Type.Short, values)
+
+
+_FIXED_FORMATS = {
+    Protocol16Type.Byte: '>B',
+    Protocol16Type.Short: '>h',
+    Protocol16Type.Integer: '>i',
+    Protocol16Type.Long: '>q',
+    Protocol16Type.Float: '>f',
+}
+
+
+def _write_value(out: bytearray, type_code: int, value: Any) -> None:
+    fmt = _FIXED_FORMATS.get(type_code)
+    if fmt is not None:
+        out += struct.pack(fmt, value)
+    elif type_code == Protocol16Type.String:
+        data = value.encode('utf-8')
+        out += struct.pack('>h', len(data))
+        out += data
+    elif type_code == Protocol16Type.ByteArray:
+        out += struct.pack('>i', len(value))
+        out += value
+    elif type_code == Protocol16Type.Array:
+        element_type, values = value
+        out += struct.pack('>hB', len(values), element_type)
+        for v in values:
+            _write_value(out, element_type, v)
+    else:
+        raise ValueError(f"不支持编码的 Protocol16 类型码: {type_code}")
+
+
+def encode_parameters(parameters: Dict[int, TypedValue]) -> bytes:
+    """编码参数表：数量(short) + 若干 [键(byte) 类型码(byte) 值]"""
+    out = bytearray(struct.pack('>h', len(parameters)))
+    for key, (type_code, value) in parameters.items():
+        out += struct.pack('>BB', key, type_code)
+        _write_value(out, type_code, value)
+    return bytes(out)
+
+
+def encode_event(code: int, parameters: Dict[int, TypedValue]) -> bytes:
+    """
+    编码事件消息: 信号字节 消息类型 Photon 事件码 参数表
+    Move 直接使用 Photon 事件码，其余事件的事件码放在参数 252 中（与游戏一致）
+    """
+    if code == PhotonDetector.MOVE_EVENT_CODE:
+        photon_code = code
+    else:
+        photon_code = 1
+        parameters = {**parameters, PhotonParameterKey.EventCode: short(code)}
+    return bytes((0xF3, PhotonMessageType.Event, photon_code)) + encode_parameters(parameters)
+
+
+def build_packet(messages: Sequence[Tuple[bool, bytes]], sequence: int = 0, timestamp: int = 0) -> bytes:
+    """
+    组装 Photon UDP 负载
+
+    Args:
+        messages: (是否可靠, 消息) 列表，可靠消息使用 SendReliable，否则使用 SendUnreliable
+        sequence: 首个命令的序号
+        timestamp: Photon 头部时间戳
+
+    Returns:
+        UDP 负载
+    """
+    out = bytearray(struct.pack('>HBBII', 1, 0, len(messages), timestamp & 0xFFFFFFFF, 0))
+    for i, (reliable, message) in enumerate(messages):
+        if reliable:
+            command_type, extra = PhotonCommandType.SendReliable, b''
+        else:
+            command_type, extra = PhotonCommandType.SendUnreliable, struct.pack('>I', sequence + i)
+        length = PhotonCommandType.COMMAND_HEADER_LENGTH + len(extra) + len(message)
+        out += struct.pack('>BBBBII', command_type, 0, 1, 0, length, sequence + i)
+        out += extra
+        out += message
+    return bytes(out)
+
+
+def pack_messages(messages: Iterable[Tuple[bool, bytes]], mtu: int = MTU) -> Iterator[bytes]:
+    """按 MTU 把消息依次装入尽量少的 UDP 负载（同一负载内可靠与不可靠命令混合）"""
+    batch: List[Tuple[bool, bytes]] = []
+    size = PhotonSignatures.PHOTON_HEADER_LENGTH
+    sequence = 0
+    for reliable, message in messages:
+        cost = PhotonCommandType.COMMAND_HEADER_LENGTH + len(message) + (0 if reliable else PhotonCommandType.UNRELIABLE_EXTRA_LENGTH)
+        if batch and (size + cost > mtu or len(batch) == 255):
+            yield build_packet(batch, sequence)
+            sequence += len(batch)
+            batch = []
+            size = PhotonSignatures.PHOTON_HEADER_LENGTH
+        batch.append((reliable, message))
+        size += cost
+    if batch:
+        yield build_packet(batch, sequence)
+
+
+def frame_udp(payload: bytes, src_port: int = 5056, dst_port: int = 50000) -> bytes:
+    """套上以太网 / IPv4 / UDP 头（校验和为 0），供 L2-L4 解析器使用"""
+    udp = struct.pack('>HHHH', src_port, dst_port, 8 + len(payload), 0) + payload
+    ip = struct.pack('>BBHHHBBH4s4s', 0x45, 0, 20 + len(udp), 0, 0, 64, 17, 0, bytes((10, 0, 0, 1)), bytes((10, 0, 0, 2)))
+    ethernet = bytes(6) + bytes(6) + struct.pack('>H', 0x0800)
+    return ethernet + ip + udp
+
+
+def move_event(oid: int, ticks: int, x: float, y: float, angle: int, speed: float, nx: float, ny: float) -> bytes:
+    payload = _MOVE_PAYLOAD.pack(0, ticks, x, y, angle, speed, nx, ny)
+    return encode_event(EventCodes.Move, {0: integer(oid), 1: byte_array(payload)})
+
+
+def new_character_event(oid: int, name: str, guild: str, equipment: Sequence[int], spells: Sequence[int]) -> bytes:
+    return encode_event(EventCodes.NewCharacter, {
+        0: integer(oid),
+        1: string(name),
+        7: long(oid * 7919),
+        8: string(guild),
+        40: short_array(equipment),
+        43: short_array(spells),
+    })
+
+
+def cast_start_event(oid: int, spell_id: int) -> bytes:
+    return encode_event(EventCodes.CastStart, {0: integer(oid), 5: short(spell_id)})
+
+
+def health_update_event(oid: int, delta: float, health: float, source: int) -> bytes:
+    return encode_event(EventCodes.HealthUpdate, {0: integer(oid), 2: float32(delta), 3: float32(health), 6: integer(source)})
+
+
+def leave_event(oid: int) -> bytes:
+    return encode_event(EventCodes.Leave, {0: integer(oid)})
+
+
+def zvz_session(
+    players: int = 500,
+    moves_per_second: int = 5000,
+    casts_per_second: int = 300,
+    duration: float = 10.0,
+    tick_rate: int = 50,
+    seed: int = 0,
+    start_ns: int = 0,
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    生成 ZvZ 对战会话，相同参数得到相同的数据包序列
+
+    首个 tick 所有玩家进场（NewCharacter），之后每个 tick 随机选取玩家移动、施法并产生血量变化，
+    最后所有玩家离场（Leave）；每个 tick 的消息按 MTU 装入 UDP 负载
+
+    Args:
+        players: 玩家数
+        moves_per_second: 每秒 Move 事件数
+        casts_per_second: 每秒 CastStart 事件数（各伴随两个 HealthUpdate）
+        duration: 会话时长（秒）
+        tick_rate: 每秒 tick 数
+        seed: 随机种子
+        start_ns: 首个数据包的时间戳
+
+    Yields:
+        (时间戳纳秒, UDP 负载)
+    """
+    rng = random.Random(seed)
+    oids = list(range(100000, 100000 + players))
+    positions = {oid: [rng.uniform(-100, 100), rng.uniform(-100, 100)] for oid in oids}
+    tick_ns = 1_000_000_000 // tick_rate
+    ticks = max(1, int(duration * tick_rate))
+    moves_per_tick = moves_per_second / tick_rate
+    casts_per_tick = casts_per_second / tick_rate
+    move_budget = cast_budget = 0.0
+
+    joins = [
+        (True, new_character_event(
+            oid,
+            f"Player{oid}",
+            f"Guild{oid % 20}",
+            [rng.randrange(1, 8000) for _ in range(10)],
+            [rng.randrange(1, 4000) for _ in range(14)],
+        ))
+        for oid in oids
+    ]
+    for payload in pack_messages(joins):
+        yield start_ns, payload
+
+    for tick in range(ticks):
+        now = start_ns + tick * tick_ns
+        game_ticks = 637000000000000000 + tick * tick_ns // 100
+        messages: List[Tuple[bool, bytes]] = []
+        move_budget += moves_per_tick
+        cast_budget += casts_per_tick
+        for _ in range(int(move_budget)):
+            oid = oids[rng.randrange(players)]
+            pos = positions[oid]
+            x, y = pos
+            pos[0] += rng.uniform(-1.5, 1.5)
+            pos[1] += rng.uniform(-1.5, 1.5)
+            messages.append((False, move_event(oid, game_ticks, x, y, rng.randrange(256), 5.5, pos[0], pos[1])))
+        move_budget -= int(move_budget)
+        for _ in range(int(cast_budget)):
+            caster = oids[rng.randrange(players)]
+            target = oids[rng.randrange(players)]
+            messages.append((True, cast_start_event(caster, rng.randrange(1, 4000))))
+            messages.append((True, health_update_event(target, -rng.uniform(50, 400), rng.uniform(0, 3000), caster)))
+            messages.append((True, health_update_event(caster, rng.uniform(10, 80), rng.uniform(0, 3000), caster)))
+        cast_budget -= int(cast_budget)
+        rng.shuffle(messages)
+        for payload in pack_messages(messages):
+            yield now, payload
+
+    leaves = [(True, leave_event(oid)) for oid in oids]
+    for payload in pack_messages(leaves):
+        yield start_ns + ticks * tick_ns, payload
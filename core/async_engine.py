@@ -0,0 +1,82 @@
+"""
+asyncio 引擎
+数据包由 AsyncPacketProvider 在事件循环中接收，并在同一线程中直接解析与分发，不经过解码队列与解码线程；
+与其他 asyncio 服务组合时用 engine.events(filter=...) 订阅事件:
+
+    async def main():
+        engine = AsyncEngine()
+        engine.start()
+        async with engine.events(filter=[(EventType.Event, EventCodes.NewCharacter)]) as stream:
+            async for event in stream:
+                ...
+"""
+import asyncio
+import traceback
+
+from core.engine import Engine
+
+
+class AsyncEngine(Engine):
+    """
+    在事件循环线程中运行的引擎，须在运行中的事件循环内调用 start / stop
+    注册 / 启动 / 停止接口与 Engine 相同；处理函数（两个通道）都在事件循环线程中执行，不得长时间阻塞
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._loop: asyncio.AbstractEventLoop = None
+
+    def _process(self, item: object) -> None:
+        """
+        事件循环线程中直接执行：photon 解析、游戏事件解析与分发
+
+        Args:
+            item: 单个数据包或数据包列表
+        """
+        try:
+            if isinstance(item, list):
+                self._batch_worker(item)
+            else:
+                self._worker(item)
+        except Exception as e:
+            print(f"[AsyncEngine] 解析数据包时出错: {e}")
+            traceback.print_exc()
+        self.game_event_dispatcher.flush_gui_events()
+
+    def start(self) -> bool:
+        """
+        在当前线程运行中的事件循环上启动引擎（asyncio UDP 接收 Go Sniffer 转发的数据包）
+
+        Returns:
+            如果启动成功返回 True，否则返回 False
+
+        Raises:
+            RuntimeError: 当前线程没有运行中的事件循环
+        """
+        self._loop = asyncio.get_running_loop()
+        self.packet_signal.packet_received.connect(self._process)
+        self.packet_signal.batch_received.connect(self._process)
+        self._start_recording()
+        if not self.network_manager.start(self.packet_signal, mode="async"):
+            self.packet_signal._disconnect_signal(self._process)
+            self.packet_signal._disconnect_batch_signal(self._process)
+            self._stop_recording()
+            return False
+        return True
+
+    def stop(self) -> bool:
+        """
+        停止引擎，未关闭的事件流随之结束
+
+        Returns:
+            如果停止成功返回 True，否则返回 False
+        """
+        self.network_manager.stop()
+        self._stop_recording()
+        self._close_streams()
+        if self._loop is None:
+            return True
+        self.packet_signal._disconnect_signal(self._process)
+        self.packet_signal._disconnect_batch_signal(self._process)
+        self._loop = None
+        return True
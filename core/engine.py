@@ -1,14 +1,23 @@
-from re import T
-from typing import Any, List
+"""
+游戏引擎
+抓包 -> 解码队列 -> Photon 解析 -> 游戏事件分发，不依赖 Qt，可在无界面环境中运行；
+GUI 通道的事件默认在解码线程中直接执行，Qt 界面使用 core.qt_engine.QtEngine 转投到 GUI 线程
+"""
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 from collections import defaultdict
-from PySide6.QtCore import Signal, QObject
 import logging
+import threading
+import time
 
 
 from base import event_codes
 from base.event_codes import EventCodes, EventType
-from base.base2 import GameEvent, EventParserBase, RawPacketSignal
+from base.base2 import GameEvent, EventParserBase, PacketProvider, RawGameEvent, RawPacketSignal, batch_event_parsers
 from network.manager import NetworkManager
+from network.recording import PacketRecorder
+from core.config.storage import global_config_manager
+from core.packet_queue import PacketQueue, OverflowPolicy
+from core.entity_store import EntityStore
 
 from core.photon_parser import PhotonPacketParser
 from core.events.game_event import parse
@@ -18,52 +27,293 @@ import traceback
 logger = logging.getLogger(__name__)
 
 
-class GameEventDispatcher(QObject):
-    game_event_received = Signal(object)
+class HandlerLane:
+    """处理函数执行通道"""
+    # 在解码/分发工作线程中直接执行，不得操作 Qt 控件
+    WORKER = "worker"
+    # 每批数据包处理完后整批交付：QtEngine 转投到 GUI 线程执行，可以操作 Qt 控件；
+    # 无界面的 Engine 在解码线程中紧接着执行
+    GUI = "gui"
 
+
+class DebugTap(object):
+    """
+    Debug 处理函数的采样通道
+    默认关闭；启用后只把匹配过滤条件的事件按固定间隔抽样交给 Debug 处理函数
+    """
+
+    def __init__(self, sample_every: int = 1, event_types: Optional[Iterable[EventType]] = None, event_codes: Optional[Iterable[int]] = None):
+        """
+        Args:
+            sample_every: 每 N 个匹配的事件交付一个，1 表示全部交付
+            event_types: 只采样这些事件类型，None 表示不限
+            event_codes: 只采样这些事件代码，None 表示不限
+        """
+        self.sample_every = max(1, sample_every)
+        self.event_types = set(event_types) if event_types is not None else None
+        self.event_codes = set(event_codes) if event_codes is not None else None
+        self._counter = 0
+
+    def accepts(self, event_type: EventType, event_code: int) -> bool:
+        """
+        判断事件是否匹配过滤条件（不计数）
+        """
+        if self.event_types is not None and event_type not in self.event_types:
+            return False
+        return self.event_codes is None or event_code in self.event_codes
+
+    def sample(self, event_type: EventType, event_code: int) -> bool:
+        """
+        判断本次事件是否交付给 Debug 处理函数
+        """
+        if not self.accepts(event_type, event_code):
+            return False
+        self._counter += 1
+        if self._counter >= self.sample_every:
+            self._counter = 0
+            return True
+        return False
+
+
+class BatchResult(NamedTuple):
+    """批量解析结果，与逐个事件一起按到达顺序投递到 GUI 线程"""
+    event_type: EventType
+    event_code: int
+    batch: Any
+
+
+class GameEventDispatcher(object):
     def __init__(self) -> None:
-        super().__init__()
         self._handlers = defaultdict[EventType, defaultdict[EventCodes, list]](lambda: defaultdict[EventCodes, list](list))
         self._debug_handlers: List[callable] = []
+        self._worker_handlers = defaultdict[EventType, defaultdict[EventCodes, list]](lambda: defaultdict[EventCodes, list](list))
+        self._worker_debug_handlers: List[callable] = []
+        self._batch_handlers = defaultdict[EventType, defaultdict[EventCodes, list]](lambda: defaultdict[EventCodes, list](list))
+        self._worker_batch_handlers = defaultdict[EventType, defaultdict[EventCodes, list]](lambda: defaultdict[EventCodes, list](list))
+        self._debug_tap: Optional[DebugTap] = None
+        # (事件, 是否交付给 Debug 处理函数) 或 BatchResult，保持到达顺序
+        self._pending_gui_events: List[Union[Tuple[GameEvent, bool], BatchResult]] = []
+        # 等待批量解析的原始事件 (事件类型, 事件代码) -> [RawGameEvent]
+        self._pending_batches = defaultdict[Tuple[EventType, int], list](list)
+        # GUI 通道事件的投递函数，默认在调用线程中直接执行
+        self._deliver_gui: Callable[[list], None] = self._dispatch_gui
         register_event_parsers()
 
-    def emit(self, event: GameEvent) -> None:
+    def set_gui_delivery(self, deliver: Callable[[list], None]) -> None:
         """
-        发射收到的游戏数据
+        设置 GUI 通道事件的投递方式，如 Qt 适配层通过跨线程信号转投到 GUI 线程，
+        最终须在目标线程调用 _dispatch_gui(events)
+        
         Args:
-            event: 要发射的游戏数据内容
+            deliver: 接收整批事件的函数
         """
-        self.game_event_received.emit(event)
+        self._deliver_gui = deliver
     
-    def register(self, event_type: EventType, event_codes: List[EventCodes], handler: callable) -> None:
+    def register(self, event_type: EventType, event_codes: List[EventCodes], handler: callable, lane: str = HandlerLane.GUI) -> None:
         """
         注册游戏事件处理函数
+        EventType.Debug 的处理函数只在启用 DebugTap 后接收抽样事件，见 set_debug_tap
         
         Args:
             event_codes: 要注册的事件代码
             handler: 处理该事件的函数
+            lane: 执行通道，操作 Qt 控件的处理函数必须使用 HandlerLane.GUI
+        """
+        if lane == HandlerLane.WORKER:
+            handlers, debug_handlers = self._worker_handlers, self._worker_debug_handlers
+        else:
+            handlers, debug_handlers = self._handlers, self._debug_handlers
+        if event_type == EventType.Debug:
+            debug_handlers.append(handler)
+        for event_code in event_codes or []:
+            handlers[event_type][event_code].append(handler)
+
+    def unregister(self, event_type: EventType, event_codes: List[EventCodes], handler: callable, lane: str = HandlerLane.GUI) -> None:
+        """
+        注销 register 注册的处理函数，参数与注册时相同；未注册的忽略
+        替换为新列表而不是原地删除，解码线程正在遍历的列表不受影响
         """
+        worker = lane == HandlerLane.WORKER
+        handlers = self._worker_handlers if worker else self._handlers
         if event_type == EventType.Debug:
-            self._debug_handlers.append(handler)
+            if worker:
+                self._worker_debug_handlers = [h for h in self._worker_debug_handlers if h != handler]
+            else:
+                self._debug_handlers = [h for h in self._debug_handlers if h != handler]
+        by_code = handlers.get(event_type)
         for event_code in event_codes or []:
-            self._handlers[event_type][event_code].append(handler)
+            if by_code and by_code.get(event_code):
+                by_code[event_code] = [h for h in by_code[event_code] if h != handler]
 
-    def _dispatch(self, event: GameEvent) -> None:
+    def register_plugin(self, plugin, lane: str = HandlerLane.GUI) -> None:
         """
-        分发游戏事件给所有注册的处理函数
+        按插件声明的 subscriptions 注册其 handle_event，
+        声明了 debug_tap 的插件同时注册为 Debug 处理函数
         
         Args:
-            event: 要分发的游戏事件
+            plugin: BasePlugin 实例
+            lane: 执行通道
         """
-        event = parse(event)
+        codes_by_type = defaultdict(list)
+        for event_type, event_code in plugin.subscriptions:
+            codes_by_type[event_type].append(event_code)
+        for event_type, event_codes in codes_by_type.items():
+            self.register(event_type, event_codes, plugin.handle_event, lane=lane)
+        if plugin.debug_tap:
+            self.register(EventType.Debug, None, plugin.handle_event, lane=lane)
 
-        for handler in self._handlers[event.type][event.code]:
+    def register_batch(self, event_type: EventType, event_code: int, handler: callable, lane: str = HandlerLane.GUI) -> None:
+        """
+        注册批量处理函数：每批数据包解码完成后收到该事件的批量解析结果（见 batch_event_parser），
+        如 Move 事件的 NumPy 结构化数组，不逐个构造事件对象
+        
+        Args:
+            event_type: 事件类型
+            event_code: 事件代码，必须已注册批量解析器
+            handler: 处理批量结果的函数
+            lane: 执行通道，操作 Qt 控件的处理函数必须使用 HandlerLane.GUI
+        """
+        if batch_event_parsers[event_type][event_code] is None:
+            raise ValueError(f"事件 {event_type} {event_code} 没有批量解析器")
+        handlers = self._worker_batch_handlers if lane == HandlerLane.WORKER else self._batch_handlers
+        handlers[event_type][event_code].append(handler)
+
+    def set_debug_tap(self, tap: Optional[DebugTap]) -> None:
+        """
+        启用（或传入 None 关闭）Debug 采样通道
+        启用后匹配过滤条件的事件即使无人订阅也会被解码，应尽量用 event_types / event_codes 缩小范围
+        
+        Args:
+            tap: DebugTap 实例
+        """
+        self._debug_tap = tap
+
+    @staticmethod
+    def _has(handlers, event_type: EventType, event_code: int) -> bool:
+        # 使用 get 查询，避免 defaultdict 为每个未订阅的事件码创建空列表
+        by_code = handlers.get(event_type)
+        return bool(by_code and by_code.get(event_code))
+
+    def _has_event_handlers(self, event_type: EventType, event_code: int) -> bool:
+        return self._has(self._handlers, event_type, event_code) or self._has(self._worker_handlers, event_type, event_code)
+
+    def _has_batch_handlers(self, event_type: EventType, event_code: int) -> bool:
+        return self._has(self._batch_handlers, event_type, event_code) or self._has(self._worker_batch_handlers, event_type, event_code)
+
+    def _is_subscribed(self, event_type: EventType, event_code: int) -> bool:
+        return self._has_event_handlers(event_type, event_code) or self._has_batch_handlers(event_type, event_code)
+
+    def _has_debug_handlers(self) -> bool:
+        return bool(self._debug_handlers or self._worker_debug_handlers)
+
+    def wants(self, event_type: EventType, event_code: int) -> bool:
+        """
+        判断是否需要解码该事件，供 Photon 解码器跳过无人订阅的消息
+        
+        Args:
+            event_type: 事件类型
+            event_code: 事件代码
+            
+        Returns:
+            有处理函数订阅该事件，或 DebugTap 已启用且匹配时返回 True
+        """
+        if self._is_subscribed(event_type, event_code):
+            return True
+        tap = self._debug_tap
+        return tap is not None and self._has_debug_handlers() and tap.accepts(event_type, event_code)
+
+    def _dispatch(self, event: RawGameEvent) -> None:
+        """
+        分发游戏事件：有订阅者或被 DebugTap 抽中时才解析为 GameEvent，解析后直接执行 WORKER 通道处理函数，
+        GUI 通道的事件暂存，由 flush_gui_events 整批投递
+        
+        Args:
+            event: 要分发的原始游戏事件
+        """
+        if self._has_batch_handlers(event.type, event.code):
+            self._pending_batches[(event.type, event.code)].append(event)
+        subscribed = self._has_event_handlers(event.type, event.code)
+        tap = self._debug_tap
+        tapped = tap is not None and self._has_debug_handlers() and tap.sample(event.type, event.code)
+        if not subscribed and not tapped:
+            return
+        # 先处理之前暂存的批量事件，保证处理函数看到的事件顺序与到达顺序一致
+        if self._pending_batches:
+            self._flush_batches()
+        try:
+            event = parse(event)
+        except Exception as e:
+            # 单条消息解析失败只丢弃该消息，不影响同一批的其余数据包
+            print(f"[GameEventDispatcher] 解析事件 {event.type} {event.code} 时出错: {e}")
+            traceback.print_exc()
+            return
+
+        self._invoke(event, self._worker_handlers, self._worker_debug_handlers if tapped else ())
+        if self._handlers[event.type][event.code] or (tapped and self._debug_handlers):
+            self._pending_gui_events.append((event, tapped))
+
+    def flush_gui_events(self) -> None:
+        """
+        批量解析暂存的事件并执行 WORKER 通道批量处理函数，
+        再将暂存的 GUI 通道事件与批量结果整批投递（见 set_gui_delivery）
+        """
+        self._flush_batches()
+        if not self._pending_gui_events:
+            return
+        events = self._pending_gui_events
+        self._pending_gui_events = []
+        self._deliver_gui(events)
+
+    def _flush_batches(self) -> None:
+        if not self._pending_batches:
+            return
+        pending = self._pending_batches
+        self._pending_batches = defaultdict[Tuple[EventType, int], list](list)
+        for (event_type, event_code), events in pending.items():
+            try:
+                batch = batch_event_parsers[event_type][event_code](events)
+            except Exception as e:
+                print(f"[GameEventDispatcher] 批量解析事件 {event_type} {event_code} 时出错: {e}")
+                traceback.print_exc()
+                continue
+            self._invoke_batch(event_type, event_code, batch, self._worker_batch_handlers)
+            if self._has(self._batch_handlers, event_type, event_code):
+                self._pending_gui_events.append(BatchResult(event_type, event_code, batch))
+
+    def _dispatch_gui(self, events: List[Union[Tuple[GameEvent, bool], BatchResult]]) -> None:
+        """
+        按到达顺序执行 GUI 通道处理函数与批量处理函数（QtEngine 中在 GUI 线程执行）
+        
+        Args:
+            events: (已解析的游戏事件, 是否交付给 Debug 处理函数) 或 BatchResult 列表
+        """
+        for item in events:
+            if isinstance(item, BatchResult):
+                self._invoke_batch(item.event_type, item.event_code, item.batch, self._batch_handlers)
+            else:
+                event, tapped = item
+                self._invoke(event, self._handlers, self._debug_handlers if tapped else ())
+
+    def _invoke_batch(self, event_type: EventType, event_code: int, batch: Any, handlers) -> None:
+        for handler in handlers[event_type][event_code]:
+            try:
+                handler(batch)
+            except Exception as e:
+                print(f"[GameEventDispatcher] 批量处理事件 {event_type} {event_code} 时出错: {e}")
+                traceback.print_exc()
+
+    def _invoke(self, event: GameEvent, handlers, debug_handlers: Sequence[callable]) -> None:
+        subscribed = handlers[event.type][event.code]
+        for handler in subscribed:
             try:
                 handler(event)
             except Exception as e:
                 print(f"[GameEventDispatcher] 处理事件 {event.type} {event.code} 时出错: {e}")
                 traceback.print_exc()
-        for handler in self._debug_handlers:
+        for handler in debug_handlers:
+            # 同时订阅了该事件的插件已经处理过，不重复交付
+            if handler in subscribed:
+                continue
             try:
                 handler(event)
             except Exception as e:
@@ -73,13 +323,40 @@ class GameEventDispatcher(QObject):
 
 
 class Engine(object):
-    def __init__(self):
+    """
+    无界面引擎，不依赖 Qt 事件循环：抓包线程入队，解码线程解析并分发
+    """
+
+    def __init__(self, queue_size: int = None, overflow_policy: str = None):
+        """
+        Args:
+            queue_size: 抓包线程与解码线程之间的队列容量（数据包数），默认读取配置
+            overflow_policy: 队列满时的处理策略，见 OverflowPolicy，默认读取配置
+        """
+        if queue_size is None:
+            queue_size = global_config_manager.get_setting("general", "ingest_queue_size", 20000)
+        if overflow_policy is None:
+            overflow_policy = global_config_manager.get_setting("general", "ingest_overflow_policy", OverflowPolicy.DROP_BY_CLASS)
         self.packet_signal = RawPacketSignal() # 原始数据包通道
         self.network_manager: PacketProvider = NetworkManager(target_ports=[5055, 5056, 5058]) # 网络管理器
         self.game_event_dispatcher = GameEventDispatcher() # 游戏事件分发器
-        self.photon_parser = PhotonPacketParser(self.photon_handler) # Photon 协议解析器
+        debug_tap_sample_every = global_config_manager.get_setting("general", "debug_tap_sample_every", 0)
+        if debug_tap_sample_every > 0:
+            # Debug 处理函数默认不接收事件，配置采样间隔后才启用采样通道
+            self.game_event_dispatcher.set_debug_tap(DebugTap(debug_tap_sample_every))
+        self.entity_store: EntityStore = None # 实体状态表
+        if global_config_manager.get_setting("general", "entity_tracking", True):
+            self.entity_store = EntityStore()
+            self.entity_store.attach(self.game_event_dispatcher)
+        self.photon_parser = PhotonPacketParser(self.photon_handler, wants=self.game_event_dispatcher.wants) # Photon 协议解析器
+        self.packet_queue = PacketQueue(queue_size, overflow_policy) # 抓包 -> 解码 有界队列
+        self._stop_event = threading.Event()
+        self._decode_thread: threading.Thread = None
+        self._streams: list = [] # 未关闭的 EventStream
+        self._decoded = 0 # 已处理完的数据包数，与 packet_queue.dequeued 比较判断是否空闲
+        self.recorder: Optional[PacketRecorder] = None # 配置 record_file 时录制收到的数据包
 
-    def photon_handler(self, event:GameEvent):
+    def photon_handler(self, event: RawGameEvent):
         if type(event) is dict:
             print(event)
         self.game_event_dispatcher._dispatch(event)
@@ -90,16 +367,137 @@ class Engine(object):
         """
         self.photon_parser.parse(raw_packet)
 
+    def _batch_worker(self, raw_packets: list) -> None:
+        """
+        批量处理整批原始网络层packet
+        """
+        parse = self.photon_parser.parse
+        for raw_packet in raw_packets:
+            try:
+                parse(raw_packet)
+            except Exception as e:
+                print(f"[Engine] 解析数据包时出错: {e}")
+                traceback.print_exc()
+
+    def _enqueue(self, item: object) -> None:
+        """
+        抓包线程中直接执行（DirectConnection）：放入解码队列，队列满时按溢出策略处理
+        
+        Args:
+            item: 单个数据包或数据包列表
+        """
+        if isinstance(item, list):
+            self.packet_queue.put_many(item)
+        else:
+            self.packet_queue.put(item)
+
+    def events(self, filter: Iterable[Tuple[EventType, int]], maxsize: int = 4096):
+        """
+        以异步迭代器订阅游戏事件，须在事件循环中调用；引擎停止时自动结束
+        
+        Args:
+            filter: 订阅的 (事件类型, 事件代码)
+            maxsize: 队列容量，队列满时丢弃新事件
+        
+        Returns:
+            EventStream，用 async with 管理其生命周期
+        """
+        from core.event_stream import EventStream
+        stream = EventStream(self.game_event_dispatcher, filter, maxsize, on_close=self._streams.remove)
+        self._streams.append(stream)
+        return stream
+
+    def _close_streams(self) -> None:
+        for stream in list(self._streams):
+            stream.close()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待解码队列中的数据包全部处理完（如回放结束后收集结果）
+        
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
         
-    def start(self) -> bool:
+        Returns:
+            空闲返回 True，超时返回 False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stats = self.packet_queue.stats()
+            if stats['size'] == 0 and stats['dequeued'] == self._decoded:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+
+    def _start_recording(self) -> None:
+        record_file = global_config_manager.get_setting("general", "record_file", "")
+        if not record_file:
+            return
+        try:
+            self.recorder = PacketRecorder(record_file)
+        except OSError as e:
+            print(f"[Engine] 无法录制到 {record_file}: {e}")
+            return
+        self.recorder.attach(self.packet_signal)
+        print(f"[Engine] 录制数据包到 {record_file}")
+
+    def _stop_recording(self) -> None:
+        if self.recorder is None:
+            return
+        self.recorder.close()
+        print(f"[Engine] 录制结束，共 {self.recorder.packets} 个数据包")
+        self.recorder = None
+
+    def get_queue_stats(self) -> dict:
+        """
+        获取解码队列统计（入队数、丢弃数、高水位等）
+        """
+        return self.packet_queue.stats()
+
+    def get_decode_stats(self) -> dict:
+        """
+        获取 Photon 解码统计（已解码、因无订阅者跳过、数据损坏的消息数）
+        """
+        return self.photon_parser.get_stats()
+
+    def _decode_loop(self) -> None:
+        """
+        解码/分发线程：photon解析、游戏事件解析、WORKER 通道分发，
+        每取出一批数据包将 GUI 通道事件整批转投到 GUI 线程
+        """
+        while not self._stop_event.is_set():
+            packets = self.packet_queue.get_many(timeout=0.5)
+            if not packets:
+                continue
+            try:
+                self._batch_worker(packets)
+            except Exception as e:
+                print(f"[Engine] 解析数据包时出错: {e}")
+                traceback.print_exc()
+            self.game_event_dispatcher.flush_gui_events()
+            self._decoded += len(packets)
+        
+    def start(self, provider: Optional[PacketProvider] = None) -> bool:
         """
         启动引擎
         
+        Args:
+            provider: 使用指定的数据包提供者（须绑定 self.packet_signal），None 表示按配置 sniffer_mode 创建
+        
         Returns:
             如果启动成功返回 True，否则返回 False
         """
-        self.network_manager.start(self.packet_signal)
-        self.packet_signal._connect_signal(self._worker)
+        self._stop_event.clear()
+        self._decode_thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self._decode_thread.start()
+        self.packet_signal.packet_received.connect(self._enqueue)
+        self.packet_signal.batch_received.connect(self._enqueue)
+        self._start_recording()
+        if provider is not None:
+            self.network_manager.start_provider(provider)
+        else:
+            self.network_manager.start(self.packet_signal)
         return True
 
 
@@ -111,5 +509,14 @@ class Engine(object):
             如果停止成功返回 True，否则返回 False
         """
         self.network_manager.stop()
-        self.packet_signal._disconnect_signal(self._worker)
+        self._stop_recording()
+        self._close_streams()
+        if self._decode_thread is None:
+            return True
+        self.packet_signal._disconnect_signal(self._enqueue)
+        self.packet_signal._disconnect_batch_signal(self._enqueue)
+        self._stop_event.set()
+        self.packet_queue.close()
+        self._decode_thread.join(timeout=2.0)
+        self._decode_thread = None
         return True
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""
+实体状态表
+以 oid -> 行号 映射到预分配的 NumPy 列上，由 Move / NewCharacter / Leave 事件维护，
+提供 O(1) 状态查询，以及基于空间网格的半径 / k 近邻 / 矩形范围查询
+"""
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from base.base2 import GameEvent, ObjectSubType, ObjectType, P
+from base.event_codes import EventCodes, EventType
+from core.events.event.move import MOVE_BATCH_DTYPE
+from core.events.event.new_characters import NewCharacterEvent
+from core.events.request.move import MoveRequestEvent
+from core.events.response.join import JoinFinishResponseEvent
+from core.spatial_index import SpatialGrid
+
+
+class EntityState(NamedTuple):
+    """单个实体的状态快照"""
+    oid: int
+    pos: P
+    velocity: P
+    last_tick: int
+    otype: ObjectType
+    osub_type: ObjectSubType
+
+
+class EntityStore(object):
+    """
+    实体状态表
+    位置、速度、最后时间戳、类型、子类型按列存放，删除的行放回空闲列表复用，容量不足时翻倍扩容
+    更新在解码线程执行，查询可在任意线程执行
+    """
+
+    def __init__(self, capacity: int = 1024, cell_size: float = 16.0):
+        """
+        Args:
+            capacity: 初始行数
+            cell_size: 空间网格边长
+        """
+        self._lock = threading.Lock()
+        self.grid = SpatialGrid(cell_size)
+        self._rows: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._allocate(capacity)
+        # 本地玩家位置，由 MoveRequest / JoinFinish 更新
+        self.local_pos: Optional[P] = None
+
+    def _allocate(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._oid = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=np.bool_)
+        self._pos = np.zeros((capacity, 2), dtype=np.float32)
+        self._velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self._last_tick = np.zeros(capacity, dtype=np.uint64)
+        self._otype = np.zeros(capacity, dtype=np.int8)
+        self._osub_type = np.zeros(capacity, dtype=np.int8)
+
+    def _grow(self) -> None:
+        old = (self._oid, self._alive, self._pos, self._velocity, self._last_tick, self._otype, self._osub_type)
+        size = self.capacity
+        self._allocate(size * 2)
+        for new, previous in zip(
+            (self._oid, self._alive, self._pos, self._velocity, self._last_tick, self._otype, self._osub_type), old
+        ):
+            new[:size] = previous
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, oid: int) -> bool:
+        return oid in self._rows
+
+    def attach(self, dispatcher) -> None:
+        """
+        在分发器的 WORKER 通道注册维护实体表所需的事件
+
+        Args:
+            dispatcher: GameEventDispatcher 实例
+        """
+        from core.engine import HandlerLane
+
+        dispatcher.register_batch(EventType.Event, EventCodes.Move, self.apply_moves, lane=HandlerLane.WORKER)
+        dispatcher.register(EventType.Event, [EventCodes.NewCharacter], self.on_new_character, lane=HandlerLane.WORKER)
+        dispatcher.register(EventType.Event, [EventCodes.Leave], self.on_leave, lane=HandlerLane.WORKER)
+        dispatcher.register(EventType.Request, [21], self.on_local_move, lane=HandlerLane.WORKER)
+        dispatcher.register(EventType.Response, [2], self.on_join, lane=HandlerLane.WORKER)
+
+    # ---------------- 更新 ----------------
+
+    def _row_for(self, oid: int) -> int:
+        """获取或分配 oid 对应的行（调用方持有锁）"""
+        row = self._rows.get(oid)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self._size >= self.capacity:
+                self._grow()
+            row = self._size
+            self._size += 1
+        self._rows[oid] = row
+        self._oid[row] = oid
+        self._alive[row] = True
+        self._pos[row] = 0.0
+        self._velocity[row] = 0.0
+        self._last_tick[row] = 0
+        self._otype[row] = ObjectType.Unknown
+        self._osub_type[row] = ObjectSubType.Unknown
+        return row
+
+    def apply_moves(self, moves: np.ndarray) -> None:
+        """
+        批量应用 Move 事件（decode_move_batch 的结果）
+        同一实体在一批中出现多次时保留时间戳最大的一次，时间戳早于已记录值的更新被忽略
+
+        Args:
+            moves: MOVE_BATCH_DTYPE 结构化数组
+        """
+        if not len(moves):
+            return
+        with self._lock:
+            row_for = self._row_for
+            rows = np.fromiter((row_for(oid) for oid in moves['entity_id'].tolist()), dtype=np.int64, count=len(moves))
+
+            # 每行只保留本批时间戳最大的一次更新（相同时取最后一次）
+            all_ticks = moves['ticks']
+            order = np.lexsort((np.arange(len(rows)), all_ticks, rows))
+            sorted_rows = rows[order]
+            last = np.append(sorted_rows[1:] != sorted_rows[:-1], True)
+            picked = order[last]
+            unique_rows = sorted_rows[last]
+            ticks = all_ticks[picked]
+            newer = ticks >= self._last_tick[unique_rows]
+            unique_rows, picked, ticks = unique_rows[newer], picked[newer], ticks[newer]
+
+            x1, y1 = moves['x1'][picked], moves['y1'][picked]
+            dx, dy = moves['x2'][picked] - x1, moves['y2'][picked] - y1
+            length = np.hypot(dx, dy)
+            scale = np.divide(moves['speed'][picked], length, out=np.zeros_like(length), where=length > 0)
+
+            self._pos[unique_rows, 0] = x1
+            self._pos[unique_rows, 1] = y1
+            self._velocity[unique_rows, 0] = dx * scale
+            self._velocity[unique_rows, 1] = dy * scale
+            self._last_tick[unique_rows] = ticks
+            self.grid.update_many(self._oid[unique_rows].tolist(), x1, y1)
+
+    def on_new_character(self, event: NewCharacterEvent) -> None:
+        """记录新出现的玩家及其类型"""
+        entity = event.entity
+        with self._lock:
+            row = self._row_for(entity.oid)
+            self._otype[row] = entity.otype
+            self._osub_type[row] = entity.osub_type
+
+    def on_leave(self, event: GameEvent) -> None:
+        """实体离开视野时删除，参数 0 为 oid"""
+        oid = event.raw_data.get(0)
+        if oid is not None:
+            self.remove(oid)
+
+    def on_local_move(self, event: MoveRequestEvent) -> None:
+        """记录本地玩家位置"""
+        self.local_pos = event.pos
+
+    def on_join(self, event: JoinFinishResponseEvent) -> None:
+        """进入新地图时清空实体表"""
+        self.clear()
+        self.local_pos = event.new_pos
+
+    def remove(self, oid: int) -> bool:
+        """
+        删除实体
+
+        Returns:
+            实体存在返回 True
+        """
+        with self._lock:
+            row = self._rows.pop(oid, None)
+            if row is None:
+                return False
+            self._alive[row] = False
+            self._free.append(row)
+            self.grid.remove(oid)
+            return True
+
+    def clear(self) -> None:
+        """清空所有实体，保留已分配的容量"""
+        with self._lock:
+            self._rows.clear()
+            self._free.clear()
+            self._alive[:] = False
+            self._size = 0
+            self.grid.clear()
+
+    # ---------------- 查询 ----------------
+
+    def get(self, oid: int) -> Optional[EntityState]:
+        """
+        获取实体状态快照
+
+        Returns:
+            EntityState，实体不存在返回 None
+        """
+        with self._lock:
+            row = self._rows.get(oid)
+            if row is None:
+                return None
+            return EntityState(
+                oid=oid,
+                pos=P(*self._pos[row].tolist()),
+                velocity=P(*self._velocity[row].tolist()),
+                last_tick=int(self._last_tick[row]),
+                otype=ObjectType(int(self._otype[row])),
+                osub_type=ObjectSubType(int(self._osub_type[row])),
+            )
+
+    def position(self, oid: int) -> Optional[P]:
+        """获取实体位置，实体不存在返回 None"""
+        with self._lock:
+            row = self._rows.get(oid)
+            if row is None:
+                return None
+            return P(*self._pos[row].tolist())
+
+    def _accept(self, otype: Optional[ObjectType]):
+        if otype is None:
+            return None
+        rows, types = self._rows, self._otype
+        return lambda oid: types[rows[oid]] == otype
+
+    def within(self, radius: float, center: Optional[P] = None, otype: Optional[ObjectType] = None) -> np.ndarray:
+        """
+        查询 center 周围 radius 内的实体
+
+        Args:
+            radius: 半径
+            center: 中心点，默认为本地玩家位置
+            otype: 只返回该类型的实体，None 表示不限
+
+        Returns:
+            按距离升序排列的 oid 数组；未指定 center 且本地玩家位置未知时为空
+        """
+        center = center if center is not None else self.local_pos
+        if center is None:
+            return np.empty(0, dtype=np.int64)
+        with self._lock:
+            found = self.grid.query_radius(center.x, center.y, radius, self._accept(otype))
+        return np.fromiter((oid for oid, _ in found), dtype=np.int64, count=len(found))
+
+    def players_within(self, radius: float, center: Optional[P] = None) -> np.ndarray:
+        """查询 center（默认本地玩家）周围 radius 内的玩家 oid"""
+        return self.within(radius, center, ObjectType.Player)
+
+    def nearest(self, k: int = 1, center: Optional[P] = None, otype: Optional[ObjectType] = None) -> List[Tuple[int, float]]:
+        """
+        查询距离 center（默认本地玩家）最近的 k 个实体
+
+        Returns:
+            按距离升序排列的 (oid, 距离) 列表
+        """
+        center = center if center is not None else self.local_pos
+        if center is None:
+            return []
+        with self._lock:
+            return self.grid.nearest(center.x, center.y, k, self._accept(otype))
+
+    def in_bbox(self, min_x: float, min_y: float, max_x: float, max_y: float, otype: Optional[ObjectType] = None) -> List[int]:
+        """
+        查询矩形范围（含边界）内的实体
+
+        Returns:
+            oid 列表（无序）
+        """
+        with self._lock:
+            return self.grid.query_bbox(min_x, min_y, max_x, max_y, self._accept(otype))
@@ -0,0 +1,109 @@
+"""
+异步事件流
+把分发器的游戏事件转为 asyncio 异步迭代器:
+
+    async with engine.events(filter=[(EventType.Event, EventCodes.NewCharacter)]) as stream:
+        async for event in stream:
+            ...
+
+事件在 WORKER 通道注册，与 asyncio 服务组合时不经过 GUI 通道；
+分发发生在事件循环线程（AsyncEngine）时直接入队，否则通过 call_soon_threadsafe 转投
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Callable, Iterable, Optional, Tuple
+
+from base.base2 import GameEvent
+from base.event_codes import EventType
+from core.engine import HandlerLane
+
+# 结束标记
+_CLOSED = object()
+
+
+class EventStream(object):
+    """
+    订阅部分游戏事件的异步迭代器，须在事件循环线程中创建与迭代
+    队列满时丢弃新事件并计入 dropped，不阻塞分发线程
+    """
+
+    def __init__(
+        self,
+        dispatcher,
+        filter: Iterable[Tuple[EventType, int]],
+        maxsize: int = 4096,
+        on_close: Optional[Callable[["EventStream"], None]] = None,
+    ):
+        """
+        Args:
+            dispatcher: GameEventDispatcher
+            filter: 订阅的 (事件类型, 事件代码)，与插件的 subscriptions 格式相同
+            maxsize: 队列容量，<= 0 表示不限
+            on_close: 关闭时的回调（Engine 用于移除登记）
+        """
+        self._dispatcher = dispatcher
+        self._lane = HandlerLane.WORKER
+        self._codes_by_type = defaultdict(list)
+        for event_type, event_code in filter:
+            self._codes_by_type[event_type].append(event_code)
+        if not self._codes_by_type:
+            raise ValueError("filter 不能为空：未订阅的事件不会被解析")
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._on_close = on_close
+        self.closed = False
+        self.dropped = 0
+        for event_type, event_codes in self._codes_by_type.items():
+            dispatcher.register(event_type, event_codes, self._push, lane=self._lane)
+
+    def _push(self, event: GameEvent) -> None:
+        if threading.get_ident() == self._loop_thread:
+            self._put(event)
+        else:
+            self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, item: object) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """停止订阅，已入队的事件仍会被迭代完；可在任意线程调用"""
+        if self.closed:
+            return
+        self.closed = True
+        for event_type, event_codes in self._codes_by_type.items():
+            self._dispatcher.unregister(event_type, event_codes, self._push, lane=self._lane)
+        if threading.get_ident() == self._loop_thread:
+            self._finish()
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._finish)
+        if self._on_close is not None:
+            self._on_close(self)
+
+    def _finish(self) -> None:
+        # 结束标记不受容量限制，队列满时先腾出一个位置
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(_CLOSED)
+
+    def __aiter__(self) -> "EventStream":
+        return self
+
+    async def __anext__(self) -> GameEvent:
+        item = await self._queue.get()
+        if item is _CLOSED:
+            # 保留结束标记，重复迭代立即结束
+            self._queue.put_nowait(_CLOSED)
+            raise StopAsyncIteration
+        return item
+
+    async def __aenter__(self) -> "EventStream":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
@@ -1,6 +1,10 @@
 
 import struct
-from base.base2 import P, EventParserBase, GameEvent, event_parser
+from typing import Sequence
+
+import numpy as np
+
+from base.base2 import P, EventParserBase, GameEvent, batch_event_parser, event_parser
 from base.event_codes import EventCodes, EventType
 
 class MoveEvent(GameEvent):
@@ -67,3 +71,64 @@ class MoveEventParser(EventParserBase):
             speed=speed,
             new_pos=P(x=x2, y=y2)
         )
+
+
+# Move 二进制负载布局（紧凑、小端，共 30 字节），与 MoveEventParser 的 '<B Q f f B f f f' 一致
+MOVE_PAYLOAD_DTYPE = np.dtype([
+    ('flag', 'u1'),
+    ('ticks', '<u8'),
+    ('x1', '<f4'),
+    ('y1', '<f4'),
+    ('angle', 'u1'),
+    ('speed', '<f4'),
+    ('x2', '<f4'),
+    ('y2', '<f4'),
+])
+MOVE_PAYLOAD_SIZE = MOVE_PAYLOAD_DTYPE.itemsize
+
+# 批量解码结果，每行对应一个 Move 事件
+MOVE_BATCH_DTYPE = np.dtype([
+    ('entity_id', '<i8'),
+    ('ticks', '<u8'),
+    ('x1', '<f4'),
+    ('y1', '<f4'),
+    ('angle', 'u1'),
+    ('speed', '<f4'),
+    ('x2', '<f4'),
+    ('y2', '<f4'),
+])
+
+_EMPTY_MOVE_PAYLOAD = bytes(MOVE_PAYLOAD_SIZE)
+
+
+@batch_event_parser(EventType.Event, EventCodes.Move)
+def decode_move_batch(events: Sequence[GameEvent]) -> np.ndarray:
+    """
+    批量解码 Move 事件
+    所有负载拼接后用一次 np.frombuffer 解析，不为每个事件构造 MoveEvent / P；
+    负载缺失或不足 30 字节的事件与 MoveEventParser 一样得到全 0 坐标
+
+    Args:
+        events: 原始 Move 事件（RawGameEvent 或 GameEvent）
+
+    Returns:
+        MOVE_BATCH_DTYPE 结构化数组，顺序与 events 一致
+    """
+    count = len(events)
+    payloads = []
+    entity_ids = np.empty(count, dtype='<i8')
+    for i, event in enumerate(events):
+        params = event.raw_data or {}
+        entity_ids[i] = params.get(0, 0)
+        data = params.get(1)
+        if isinstance(data, (bytes, bytearray)) and len(data) >= MOVE_PAYLOAD_SIZE:
+            payloads.append(data[:MOVE_PAYLOAD_SIZE])
+        else:
+            payloads.append(_EMPTY_MOVE_PAYLOAD)
+
+    raw = np.frombuffer(b''.join(payloads), dtype=MOVE_PAYLOAD_DTYPE, count=count)
+    result = np.empty(count, dtype=MOVE_BATCH_DTYPE)
+    result['entity_id'] = entity_ids
+    for name in MOVE_BATCH_DTYPE.names[1:]:
+        result[name] = raw[name]
+    return result
@@ -10,13 +10,16 @@ from base.base2 import (
     SlotSpell,
 )
 from base.event_codes import EventCodes, EventType
-from typing import List
+from typing import Tuple
+from pydantic import SkipValidation
 from event_tool.object import to_int, to_str, to_int_list
-from event_tool.equipment import parses_equipments
+from event_tool.equipment import EquipmentSlot, decode_equipment, equipment_from_slots
 
 
 class NewCharacterEvent(GameEvent):
     entity: Entity
+    # decode_equipment 的结果，供查找表直接解析
+    equipment_slots: SkipValidation[Tuple[EquipmentSlot, ...]] = ()
 
 
 
@@ -33,7 +36,8 @@ class NewCharacterEventParser(EventParserBase):
 
         equipment_values = to_int_list(params.get(40, []))
         spells = to_int_list(params.get(43, []))
-        equipment = parses_equipments(equipment_values, spells)
+        equipment_slots = decode_equipment(equipment_values, spells)
+        equipment = equipment_from_slots(equipment_slots)
 
         entity = Entity(
             oid=oid,
@@ -45,4 +49,4 @@ class NewCharacterEventParser(EventParserBase):
             osub_type=ObjectSubType.Player,
         )
 
-        return NewCharacterEvent(entity=entity)
+        return NewCharacterEvent(entity=entity, equipment_slots=equipment_slots)
@@ -1,7 +1,8 @@
 import os
-from base.base2 import event_parsers, GameEvent, EventParserBase
+from base.base2 import event_parsers, GameEvent, EventParserBase, RawGameEvent
 import importlib.util
 import inspect
+from typing import Union
 
 
 def find_classes_inherit_from(base_class, target_dir):
@@ -69,10 +70,10 @@ def register_event_parsers():
     pass
 
 
-def parse(event: GameEvent) -> GameEvent:
+def parse(event: Union[GameEvent, RawGameEvent]) -> GameEvent:
     parser = event_parsers[event.type][event.code]
     if parser is None:
-        return event
+        return event.to_model() if isinstance(event, RawGameEvent) else event
     event = parser.parse(event)
     if parser.debug:
         print(f"事件解析器 {event.type} {event.code} {parser.__class__} {event}")
@@ -0,0 +1,193 @@
+"""
+抓包 -> 解码 的有界数据包队列
+提供容量上限、溢出策略与丢包统计
+"""
+import threading
+from collections import deque
+from enum import IntEnum
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from network.photon.detector import PhotonDetector
+
+
+class OverflowPolicy:
+    """队列满时的处理策略"""
+    # 阻塞生产者直到有空位
+    BLOCK = "block"
+    # 丢弃最旧的数据包
+    DROP_OLDEST = "drop_oldest"
+    # 按数据包类别丢弃：先丢 Move，再丢其他数据包中最旧的
+    DROP_BY_CLASS = "drop_by_class"
+
+
+class PacketClass(IntEnum):
+    """数据包类别，数值越小越先被丢弃"""
+    Move = 0
+    Normal = 1
+
+
+def classify_packet(packet: bytes) -> PacketClass:
+    """默认分类函数：只含 Move 事件的数据包归为 Move"""
+    return PacketClass.Move if PhotonDetector.is_move_only(packet) else PacketClass.Normal
+
+
+class PacketQueue(object):
+    """
+    有界数据包队列
+    每个类别一个环形缓冲，出队时按全局序号保持入队顺序
+    """
+
+    def __init__(
+        self,
+        capacity: int = 20000,
+        policy: str = OverflowPolicy.DROP_BY_CLASS,
+        classify: Callable[[bytes], PacketClass] = classify_packet,
+    ):
+        """
+        Args:
+            capacity: 最大数据包数
+            policy: 溢出策略，见 OverflowPolicy
+            classify: 数据包分类函数，仅 DROP_BY_CLASS 策略使用
+        """
+        self.capacity = capacity
+        self.policy = policy
+        self._classify = classify
+        self._buckets: Dict[PacketClass, Deque[Tuple[int, object]]] = {c: deque() for c in PacketClass}
+        self._size = 0
+        self._seq = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.dropped_by_class: Dict[PacketClass, int] = {c: 0 for c in PacketClass}
+        self.high_water = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, packet: object) -> bool:
+        """
+        放入一个数据包
+
+        Returns:
+            数据包被放入返回 True，被丢弃返回 False
+        """
+        return self.put_many((packet,)) == 1
+
+    def put_many(self, packets) -> int:
+        """
+        放入一批数据包
+
+        Returns:
+            实际放入的数据包数
+        """
+        by_class = self.policy == OverflowPolicy.DROP_BY_CLASS
+        accepted = 0
+        with self._cond:
+            for packet in packets:
+                cls = self._classify(packet) if by_class else PacketClass.Normal
+                if self._size >= self.capacity and not self._make_room(cls):
+                    self._count_drop(cls)
+                    continue
+                self._buckets[cls].append((self._seq, packet))
+                self._seq += 1
+                self._size += 1
+                accepted += 1
+            self.enqueued += accepted
+            if self._size > self.high_water:
+                self.high_water = self._size
+            if accepted:
+                self._cond.notify_all()
+        return accepted
+
+    def get_many(self, max_count: int = 256, timeout: Optional[float] = None) -> List[object]:
+        """
+        按入队顺序取出最多 max_count 个数据包，队列为空时等待
+
+        Args:
+            max_count: 最多取出的数据包数
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            数据包列表，超时或队列已关闭时可能为空
+        """
+        with self._cond:
+            if not self._size and not self._closed:
+                self._cond.wait(timeout)
+            result = []
+            while self._size and len(result) < max_count:
+                result.append(self._buckets[self._oldest_class()].popleft()[1])
+                self._size -= 1
+            self.dequeued += len(result)
+            if result and self.policy == OverflowPolicy.BLOCK:
+                self._cond.notify_all()
+            return result
+
+    def close(self) -> None:
+        """关闭队列，唤醒所有等待中的生产者与消费者"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        """
+        获取队列统计
+
+        Returns:
+            包含 size, capacity, enqueued, dequeued, dropped, dropped_by_class, high_water 的字典
+        """
+        with self._cond:
+            return {
+                'size': self._size,
+                'capacity': self.capacity,
+                'policy': self.policy,
+                'enqueued': self.enqueued,
+                'dequeued': self.dequeued,
+                'dropped': self.dropped,
+                'dropped_by_class': {c.name: n for c, n in self.dropped_by_class.items()},
+                'high_water': self.high_water,
+            }
+
+    def _oldest_class(self) -> PacketClass:
+        oldest = None
+        for cls, bucket in self._buckets.items():
+            if bucket and (oldest is None or bucket[0][0] < self._buckets[oldest][0][0]):
+                oldest = cls
+        return oldest
+
+    def _count_drop(self, cls: PacketClass) -> None:
+        self.dropped += 1
+        self.dropped_by_class[cls] += 1
+
+    def _make_room(self, incoming: PacketClass) -> bool:
+        """
+        队列已满时按策略腾出一个位置（调用方持有锁）
+
+        Returns:
+            腾出位置返回 True，应丢弃新数据包返回 False
+        """
+        if self.policy == OverflowPolicy.BLOCK:
+            while self._size >= self.capacity and not self._closed:
+                self._cond.wait(0.5)
+            return self._size < self.capacity
+
+        if self.policy == OverflowPolicy.DROP_OLDEST:
+            victim = self._oldest_class()
+        else:
+            # 淘汰类别不高于新数据包的最低类别中最旧的一个
+            victim = None
+            for cls in PacketClass:
+                if cls > incoming:
+                    break
+                if self._buckets[cls]:
+                    victim = cls
+                    break
+            if victim is None:
+                return False
+
+        self._buckets[victim].popleft()
+        self._size -= 1
+        self._count_drop(victim)
+        return True
@@ -1,49 +1,54 @@
+from typing import Callable, Optional
+
 from base.event_codes import EventType
-from base.base2 import GameEvent
-from photon_packet_parser import PhotonPacketParser as _PhotonPacketParser
+from base.base2 import RawGameEvent
+from network.photon.constants import PhotonMessageType
+from network.photon.decoder import PhotonDecoder
 
 def log(type, event_code, code):
     if type == "Response":
         print(f"{type} {event_code} {code}")
 
+# Photon 消息类型 -> 游戏事件类型
+MESSAGE_EVENT_TYPES = {
+    PhotonMessageType.Event: EventType.Event,
+    PhotonMessageType.OperationRequest: EventType.Request,
+    PhotonMessageType.OperationResponse: EventType.Response,
+}
+
 class PhotonPacketParser(object):
-    def __init__(self, handler) -> None:
-        self._parser = _PhotonPacketParser(self.on_event, self.on_request, self.on_response)
+    def __init__(self, handler, wants: Optional[Callable[[EventType, int], bool]] = None) -> None:
+        """
+        Args:
+            handler: 游戏事件回调
+            wants: 订阅判断 (事件类型, 事件码) -> bool，返回 False 的消息不反序列化参数表；None 表示全部解码
+        """
         self.handler = handler
-
-    def _handle(self, event, code_idx):
-        parameters = event.parameters
-        code = event.parameters.get(code_idx, -1)
-        return code, parameters
-
-    def on_event(self, event) -> GameEvent:
-        code, parameters = self._handle(event, 252)
-        event_code = event.code
-        # log("Event", event_code, code)
-        if code == -1:
-            # logger.warning(f"未找到 Response 事件代码 {event.parameters}")
-            # return
-            code = event_code
-        self.handler(GameEvent(code=code, type=EventType.Event, raw_data=parameters))
-
-    def on_request(self, event) -> GameEvent:
-        code, parameters = self._handle(event, 253)
-        event_code = event.operation_code
-        # log("Request", event_code, code)
-        if code == -1:
-            # logger.warning(f"未找到 Request 事件代码 {event.parameters}")
-            return
-        self.handler(GameEvent(code=code, type=EventType.Request, raw_data=parameters))
-
-    def on_response(self, event) -> GameEvent:
-        code, parameters = self._handle(event, 253)
-        event_code = event.operation_code
-        # log("Response", event_code, code)
-        if code == -1:
-            # logger.warning(f"未找到 Response 事件代码 {event.parameters}")
-            return
-        self.handler(GameEvent(code=code, type=EventType.Response, raw_data=parameters))
-
-
-    def parse(self, packet: bytes) -> GameEvent:
-        self._parser.HandlePayload(packet)
\ No newline at end of file
+        self.wants = wants
+        self._parser = PhotonDecoder(
+            self.on_event,
+            self.on_request,
+            self.on_response,
+            wants=self._wants if wants is not None else None,
+        )
+
+    def _wants(self, message_type: int, code: int) -> bool:
+        return self.wants(MESSAGE_EVENT_TYPES[message_type], code)
+
+    def on_event(self, code: int, parameters: dict) -> None:
+        self.handler(RawGameEvent(code, EventType.Event, parameters))
+
+    def on_request(self, code: int, parameters: dict) -> None:
+        self.handler(RawGameEvent(code, EventType.Request, parameters))
+
+    def on_response(self, code: int, parameters: dict) -> None:
+        self.handler(RawGameEvent(code, EventType.Response, parameters))
+
+    def get_stats(self) -> dict:
+        """
+        获取解码统计（已解码、因无订阅者跳过、数据损坏的消息数）
+        """
+        return self._parser.stats()
+
+    def parse(self, packet: bytes) -> None:
+        self._parser.handle_payload(packet)
@@ -0,0 +1,33 @@
+"""
+Qt 适配层
+在 Engine 的基础上把 GUI 通道的事件通过跨线程信号转投到 GUI 线程执行，供带界面的程序使用
+"""
+from PySide6.QtCore import QObject, Signal
+
+from core.engine import Engine, GameEventDispatcher
+
+
+class QtGuiBridge(QObject):
+    """把分发器的 GUI 通道事件转投到创建该对象的线程（GUI 线程）"""
+    gui_events_received = Signal(object)
+
+    def __init__(self, dispatcher: GameEventDispatcher) -> None:
+        super().__init__()
+        self._dispatcher = dispatcher
+        # 对象创建于 GUI 线程，跨线程发射时该槽在 GUI 线程执行
+        self.gui_events_received.connect(self._on_events)
+        dispatcher.set_gui_delivery(self.gui_events_received.emit)
+
+    def _on_events(self, events: list) -> None:
+        self._dispatcher._dispatch_gui(events)
+
+
+class QtEngine(Engine):
+    """
+    带界面程序使用的引擎，须在 GUI 线程创建
+    注册 / 启动 / 停止接口与 Engine 相同
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.gui_bridge = QtGuiBridge(self.game_event_dispatcher)
@@ -0,0 +1,237 @@
+"""
+空间索引
+均匀网格，按 Move 事件增量更新，支持半径、k 近邻与矩形范围查询
+实体只在跨越网格边界时移动所在的格子，同一地图（cluster）内使用同一个网格，切换地图时清空
+"""
+import heapq
+import math
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+Cell = Tuple[int, int]
+
+
+class SpatialGrid(object):
+    """
+    均匀网格空间索引
+    非线程安全，由调用方（EntityStore）加锁
+    """
+
+    # 实体数不超过该值时 k 近邻直接遍历全部实体
+    NEAREST_SCAN_THRESHOLD = 256
+
+    def __init__(self, cell_size: float = 16.0):
+        """
+        Args:
+            cell_size: 网格边长（游戏坐标单位），接近常用查询半径时效果最好
+        """
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Set[int]] = defaultdict(set)
+        # oid -> (x, y, 所在格子)
+        self._points: Dict[int, Tuple[float, float, Cell]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, oid: int) -> bool:
+        return oid in self._points
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    # ---------------- 更新 ----------------
+
+    def update(self, oid: int, x: float, y: float) -> None:
+        """插入或移动一个实体"""
+        cell = self._cell(x, y)
+        previous = self._points.get(oid)
+        if previous is not None and previous[2] != cell:
+            self._discard(oid, previous[2])
+        if previous is None or previous[2] != cell:
+            self._cells[cell].add(oid)
+        self._points[oid] = (x, y, cell)
+
+    def update_many(self, oids: Iterable[int], xs: np.ndarray, ys: np.ndarray) -> None:
+        """
+        批量插入或移动实体，格子坐标一次性向量化计算
+
+        Args:
+            oids: 实体 oid
+            xs: x 坐标数组
+            ys: y 坐标数组
+        """
+        cxs = np.floor(np.asarray(xs, dtype=np.float64) / self.cell_size).astype(np.int64).tolist()
+        cys = np.floor(np.asarray(ys, dtype=np.float64) / self.cell_size).astype(np.int64).tolist()
+        points, cells = self._points, self._cells
+        for oid, x, y, cx, cy in zip(oids, np.asarray(xs).tolist(), np.asarray(ys).tolist(), cxs, cys):
+            cell = (cx, cy)
+            previous = points.get(oid)
+            if previous is None:
+                cells[cell].add(oid)
+            elif previous[2] != cell:
+                self._discard(oid, previous[2])
+                cells[cell].add(oid)
+            points[oid] = (x, y, cell)
+
+    def remove(self, oid: int) -> bool:
+        """
+        删除实体
+
+        Returns:
+            实体存在返回 True
+        """
+        previous = self._points.pop(oid, None)
+        if previous is None:
+            return False
+        self._discard(oid, previous[2])
+        return True
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._points.clear()
+
+    def _discard(self, oid: int, cell: Cell) -> None:
+        members = self._cells.get(cell)
+        if members is None:
+            return
+        members.discard(oid)
+        if not members:
+            del self._cells[cell]
+
+    # ---------------- 查询 ----------------
+
+    def position(self, oid: int) -> Optional[Tuple[float, float]]:
+        point = self._points.get(oid)
+        return None if point is None else (point[0], point[1])
+
+    def query_radius(
+        self, x: float, y: float, radius: float, accept: Optional[Callable[[int], bool]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        查询 (x, y) 周围 radius 内的实体
+
+        Args:
+            accept: 过滤函数，返回 False 的 oid 被忽略
+
+        Returns:
+            按距离升序排列的 (oid, 距离) 列表
+        """
+        radius2 = radius * radius
+        min_cx, min_cy = self._cell(x - radius, y - radius)
+        max_cx, max_cy = self._cell(x + radius, y + radius)
+        points = self._points
+        result = []
+        for cell in self._cells_in(min_cx, min_cy, max_cx, max_cy):
+            for oid in self._cells[cell]:
+                px, py, _ = points[oid]
+                d2 = (px - x) ** 2 + (py - y) ** 2
+                if d2 <= radius2 and (accept is None or accept(oid)):
+                    result.append((oid, d2))
+        result.sort(key=lambda item: item[1])
+        return [(oid, math.sqrt(d2)) for oid, d2 in result]
+
+    def query_bbox(
+        self, min_x: float, min_y: float, max_x: float, max_y: float, accept: Optional[Callable[[int], bool]] = None
+    ) -> List[int]:
+        """
+        查询矩形范围（含边界）内的实体
+
+        Returns:
+            oid 列表（无序）
+        """
+        min_cx, min_cy = self._cell(min_x, min_y)
+        max_cx, max_cy = self._cell(max_x, max_y)
+        points = self._points
+        result = []
+        for cell in self._cells_in(min_cx, min_cy, max_cx, max_cy):
+            for oid in self._cells[cell]:
+                px, py, _ = points[oid]
+                if min_x <= px <= max_x and min_y <= py <= max_y and (accept is None or accept(oid)):
+                    result.append(oid)
+        return result
+
+    def nearest(
+        self, x: float, y: float, k: int = 1, accept: Optional[Callable[[int], bool]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        查询距离 (x, y) 最近的 k 个实体
+        从所在格子向外逐圈搜索，实体较少或搜索区域大于已占用格子数时改为遍历全部实体
+
+        Args:
+            accept: 过滤函数，返回 False 的 oid 被忽略
+
+        Returns:
+            按距离升序排列的 (oid, 距离) 列表，实体不足 k 个时返回全部
+        """
+        if k <= 0 or not self._points:
+            return []
+        if len(self._points) <= self.NEAREST_SCAN_THRESHOLD:
+            return self._nearest_scan(x, y, k, accept)
+        cs = self.cell_size
+        cx, cy = self._cell(x, y)
+        points = self._points
+        # 最大堆保存当前最近的 k 个: (-d2, oid)
+        best: List[Tuple[float, int]] = []
+        ring = 0
+        while True:
+            if (2 * ring + 1) ** 2 > len(self._cells):
+                return self._nearest_scan(x, y, k, accept)
+            for cell in self._ring(cx, cy, ring):
+                members = self._cells.get(cell)
+                if not members:
+                    continue
+                for oid in members:
+                    if accept is not None and not accept(oid):
+                        continue
+                    px, py, _ = points[oid]
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    if len(best) < k:
+                        heapq.heappush(best, (-d2, oid))
+                    elif d2 < -best[0][0]:
+                        heapq.heapreplace(best, (-d2, oid))
+            # 已搜索区域外的点到 (x, y) 的最小距离
+            bound = min(
+                x - (cx - ring) * cs,
+                (cx + ring + 1) * cs - x,
+                y - (cy - ring) * cs,
+                (cy + ring + 1) * cs - y,
+            )
+            if len(best) == k and -best[0][0] <= bound * bound:
+                break
+            ring += 1
+        return [(oid, math.sqrt(-neg_d2)) for neg_d2, oid in sorted(best, reverse=True)]
+
+    def _nearest_scan(self, x: float, y: float, k: int, accept: Optional[Callable[[int], bool]]) -> List[Tuple[int, float]]:
+        candidates = (
+            ((px - x) ** 2 + (py - y) ** 2, oid)
+            for oid, (px, py, _) in self._points.items()
+            if accept is None or accept(oid)
+        )
+        return [(oid, math.sqrt(d2)) for d2, oid in heapq.nsmallest(k, candidates)]
+
+    def _cells_in(self, min_cx: int, min_cy: int, max_cx: int, max_cy: int) -> Iterable[Cell]:
+        # 范围内格子多于已占用格子时改为遍历已占用格子
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(self._cells):
+            return [c for c in self._cells if min_cx <= c[0] <= max_cx and min_cy <= c[1] <= max_cy]
+        cells = self._cells
+        return [
+            (ix, iy)
+            for ix in range(min_cx, max_cx + 1)
+            for iy in range(min_cy, max_cy + 1)
+            if (ix, iy) in cells
+        ]
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int) -> Iterable[Cell]:
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for ix in range(cx - ring, cx + ring + 1):
+            yield (ix, cy - ring)
+            yield (ix, cy + ring)
+        for iy in range(cy - ring + 1, cy + ring):
+            yield (cx - ring, iy)
+            yield (cx + ring, iy)
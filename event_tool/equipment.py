@@ -1,4 +1,11 @@
-from typing import List
+"""
+装备解析
+NewCharacter 的装备参数先解码为扁平元组，再由只构建一次的查找表解析出物品名、唯一名、护甲类型与技能名
+"""
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
 from base.base2 import Equipment, Item, SlotType
 
 slot_spelles_idx = {
@@ -10,26 +17,140 @@ slot_spelles_idx = {
     SlotType.BuffFood: [13],
 }
 
+# 按 SlotType 顺序排列的技能参数下标
+SLOT_SPELL_INDICES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(slot_spelles_idx.get(slot, ())) for slot in SlotType
+)
+
+# 单个槽位: (物品序号, 技能序号元组)
+EquipmentSlot = Tuple[int, Tuple[int, ...]]
+# 物品信息: (唯一名, 本地化名, 护甲类型)
+ItemInfo = Tuple[str, str, str]
+
+EMPTY_SLOT: EquipmentSlot = (0, ())
+
+_ARMOR_CLASS_RE = re.compile(r"_(?:ARMOR|HEAD|SHOES)_(PLATE|CLOTH|LEATHER)")
+
+
+def decode_equipment(eqs: Sequence[int], sps: Sequence[int]) -> Tuple[EquipmentSlot, ...]:
+    """
+    解码装备参数（参数 40）与技能参数（参数 43）
+
+    Returns:
+        按 SlotType 顺序排列的 (物品序号, 技能序号元组)，技能序号为 0 的被忽略
+    """
+    eq_count = len(eqs)
+    sp_count = len(sps)
+    return tuple(
+        (
+            int(eqs[slot]) if slot < eq_count else 0,
+            tuple(int(sps[i]) for i in idxs if i < sp_count and int(sps[i]) != 0),
+        )
+        for slot, idxs in enumerate(SLOT_SPELL_INDICES)
+    )
+
+
+def equipment_from_slots(slots: Sequence[EquipmentSlot]) -> Equipment:
+    """由 decode_equipment 的结果构造 Equipment（数据已是 int，跳过 pydantic 校验）"""
+    items = [
+        Item.model_construct(slot_type=SlotType(slot), index=index, spells=list(spells))
+        for slot, (index, spells) in enumerate(slots)
+    ]
+    return Equipment.model_construct(
+        main_hand=items[SlotType.MainHand],
+        off_hand=items[SlotType.OffHand],
+        head=items[SlotType.Head],
+        chest=items[SlotType.Chest],
+        shoes=items[SlotType.Shoes],
+        bag=items[SlotType.Bag],
+        cape=items[SlotType.Cape],
+        mount=items[SlotType.Mount],
+        potion=items[SlotType.Potion],
+        buff_food=items[SlotType.BuffFood],
+    )
+
+
 def parses_equipments(eqs: List[int], sps: List[int]) -> Equipment:
-    equipment = Equipment()
-    def v(i: int) -> int:
-        return int(eqs[i]) if i < len(eqs) else 0
-    equipment.main_hand = Item(slot_type=SlotType.MainHand, index=v(0))
-    equipment.off_hand = Item(slot_type=SlotType.OffHand, index=v(1))
-    equipment.head = Item(slot_type=SlotType.Head, index=v(2))
-    equipment.chest = Item(slot_type=SlotType.Chest, index=v(3))
-    equipment.shoes = Item(slot_type=SlotType.Shoes, index=v(4))
-    equipment.bag = Item(slot_type=SlotType.Bag, index=v(5))
-    equipment.cape = Item(slot_type=SlotType.Cape, index=v(6))
-    equipment.mount = Item(slot_type=SlotType.Mount, index=v(7))
-    equipment.potion = Item(slot_type=SlotType.Potion, index=v(8))
-    equipment.buff_food = Item(slot_type=SlotType.BuffFood, index=v(9))
-    def set_spells(item: Item, idxs: List[int]):
-        item.spells = [int(sps[idx]) for idx in idxs if idx < len(sps) and int(sps[idx]) != 0]
-    set_spells(equipment.main_hand, slot_spelles_idx.get(SlotType.MainHand, []))
-    set_spells(equipment.chest, slot_spelles_idx.get(SlotType.Chest, []))
-    set_spells(equipment.head, slot_spelles_idx.get(SlotType.Head, []))
-    set_spells(equipment.shoes, slot_spelles_idx.get(SlotType.Shoes, []))
-    set_spells(equipment.potion, slot_spelles_idx.get(SlotType.Potion, []))
-    set_spells(equipment.buff_food, slot_spelles_idx.get(SlotType.BuffFood, []))
-    return equipment
+    return equipment_from_slots(decode_equipment(eqs, sps))
+
+
+class EquipmentTables(object):
+    """
+    预编译的装备查找表
+    物品序号 -> (唯一名, 本地化名, 护甲类型)，技能序号 -> 技能名
+    """
+
+    def __init__(self, items: Dict[int, ItemInfo], spell_names: Sequence[str]):
+        """
+        Args:
+            items: 物品序号 -> ItemInfo
+            spell_names: 按技能序号排列的技能名
+        """
+        self.items = items
+        self.spell_names = tuple(spell_names)
+
+    @staticmethod
+    def armor_class(unique_name: str) -> str:
+        """
+        从唯一名解析护甲类型
+
+        Returns:
+            "PLATE" / "CLOTH" / "LEATHER"，非护甲返回空字符串
+        """
+        match = _ARMOR_CLASS_RE.search(unique_name)
+        return match.group(1) if match else ""
+
+    @classmethod
+    def build(cls) -> "EquipmentTables":
+        """从 game_data 的物品与技能数据构建查找表"""
+        from game_data import items as item_data, spells as spell_data
+        from game_data.items import Lang, item_table
+
+        item_data.loader.ensure()
+
+        items: Dict[int, ItemInfo] = {}
+        for index, item in enumerate(item_table):
+            if item is None:
+                continue
+            names = item.name or {}
+            name = names.get(Lang.zh_cn, names.get(Lang.en, f'Unknown({index})'))
+            items[index] = (item.unique_name, name, cls.armor_class(item.unique_name))
+        return cls(items, spell_data.get_spell_table().names())
+
+    def item(self, index: int) -> ItemInfo:
+        """
+        查找物品
+
+        Returns:
+            ItemInfo，未知物品返回 ("", "Unknown(序号)", "")
+        """
+        info = self.items.get(index)
+        if info is None:
+            return ("", f'Unknown({index})', "")
+        return info
+
+    def spell_name(self, index: int) -> str:
+        """查找技能名，负数按无符号 32 位处理，未知技能返回空字符串"""
+        if index < 0:
+            index = (index + (1 << 32)) & 0xFFFFFFFF
+        if index < len(self.spell_names):
+            return self.spell_names[index]
+        return ""
+
+
+_tables: Optional[EquipmentTables] = None
+_tables_lock = threading.Lock()
+
+
+def get_equipment_tables() -> EquipmentTables:
+    """获取装备查找表，首次调用时构建；物品或技能数据加载失败时返回不缓存的空表，数据可用后重新构建"""
+    global _tables
+    if _tables is None:
+        from game_data import items as item_data, spells as spell_data
+        with _tables_lock:
+            if _tables is None:
+                tables = EquipmentTables.build()
+                if not (item_data.loader.loaded and spell_data.loader.loaded):
+                    return tables
+                _tables = tables
+    return _tables
@@ -0,0 +1,278 @@
+"""
+游戏数据二进制缓存
+将 JSON / XML 源文件编译为带版本号的列式二进制文件（NumPy 数值列 + UTF-8 字符串表），不使用 pickle，
+读取时通过 mmap 直接映射；缓存按源文件哈希校验，源文件变化或格式版本升级时自动重新生成
+
+文件布局:
+    魔数(4) 格式版本(u32) 头部长度(u32) 头部(UTF-8 JSON) 对齐填充 列数据(每列按 64 字节对齐)
+
+用法:
+    python -m game_data.cache [--force]    预先构建全部缓存，--force 忽略已有缓存
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+MAGIC = b"AGDC"
+FORMAT_VERSION = 1
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "data", "cache")
+
+_PREAMBLE = struct.Struct("<4sII")
+_ALIGN = 64
+
+
+class StringTable(object):
+    """
+    UTF-8 字符串表
+    所有字符串拼接为一段字节，offsets[i]:offsets[i + 1] 为第 i 个字符串，按需解码；nulls 标记 None
+    """
+    __slots__ = ('data', 'offsets', 'nulls')
+
+    def __init__(self, data, offsets: np.ndarray, nulls: Optional[np.ndarray] = None):
+        """
+        Args:
+            data: 拼接后的 UTF-8 字节（bytes / memoryview）
+            offsets: int64 偏移数组，长度为字符串数 + 1
+            nulls: bool 数组，True 表示该位置为 None；None 表示没有空值
+        """
+        self.data = memoryview(data)
+        self.offsets = offsets
+        self.nulls = nulls
+
+    @classmethod
+    def from_strings(cls, values: Sequence[Optional[str]]) -> "StringTable":
+        encoded = [b"" if v is None else v.encode("utf-8") for v in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        nulls = np.fromiter((v is None for v in values), dtype=np.bool_, count=len(values))
+        return cls(b"".join(encoded), offsets, nulls if nulls.any() else None)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if self.nulls is not None and self.nulls[i]:
+            return None
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return iter(self.tolist())
+
+    def tolist(self) -> List[Optional[str]]:
+        """一次性解码全部字符串"""
+        # 整段解码一次，再把字节偏移换算为字符偏移（非 UTF-8 后续字节的个数）后切片
+        raw = np.frombuffer(self.data, dtype=np.uint8)
+        text = str(self.data, "utf-8")
+        if len(text) == len(raw):
+            bounds = self.offsets.tolist()
+        else:
+            starts = np.zeros(len(raw) + 1, dtype=np.int64)
+            np.cumsum((raw & 0xC0) != 0x80, out=starts[1:])
+            bounds = starts[self.offsets].tolist()
+        values = [text[s:e] for s, e in zip(bounds, bounds[1:])]
+        if self.nulls is not None:
+            for i in np.flatnonzero(self.nulls).tolist():
+                values[i] = None
+        return values
+
+
+class CacheData(object):
+    """
+    缓存内容
+    arrays: 名字 -> NumPy 数值列；strings: 名字 -> StringTable；meta: 可 JSON 序列化的少量元数据
+    """
+
+    def __init__(
+        self,
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+        strings: Optional[Dict[str, StringTable]] = None,
+        meta: Optional[dict] = None,
+    ):
+        self.arrays = arrays or {}
+        self.strings = strings or {}
+        self.meta = meta or {}
+
+
+def source_digest(path: str) -> str:
+    """计算源文件内容的 BLAKE2b 摘要"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_record(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": source_digest(path)}
+
+
+def _is_fresh(header: dict, schema: int, sources: Sequence[str]) -> bool:
+    """检查缓存是否与当前源文件一致；大小与修改时间不变时不重新计算哈希"""
+    if header.get("schema") != schema:
+        return False
+    recorded = header.get("sources", {})
+    if set(recorded) != {os.path.basename(p) for p in sources}:
+        return False
+    for path in sources:
+        record = recorded[os.path.basename(path)]
+        st = os.stat(path)
+        if st.st_size != record["size"]:
+            return False
+        if st.st_mtime_ns != record["mtime_ns"] and source_digest(path) != record["digest"]:
+            return False
+    return True
+
+
+def write_cache(path: str, data: CacheData, schema: int, sources: Sequence[str]) -> None:
+    """
+    写入缓存文件（先写临时文件再替换，避免读到写了一半的缓存）
+
+    Args:
+        path: 缓存文件路径
+        data: 缓存内容
+        schema: 数据布局版本，由各加载器定义，布局变化时递增
+        sources: 源文件路径
+    """
+    blocks: List[Tuple[dict, np.ndarray]] = []
+
+    def add(array: np.ndarray) -> str:
+        name = f"#{len(blocks)}"
+        array = np.ascontiguousarray(array)
+        blocks.append(({"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "nbytes": array.nbytes}, array))
+        return name
+
+    arrays = {name: add(array) for name, array in data.arrays.items()}
+    strings = {}
+    for name, table in data.strings.items():
+        strings[name] = {
+            "data": add(np.frombuffer(table.data, dtype=np.uint8)),
+            "offsets": add(table.offsets.astype(np.int64, copy=False)),
+            "nulls": None if table.nulls is None else add(table.nulls),
+        }
+
+    header = {
+        "schema": schema,
+        "sources": {os.path.basename(p): _source_record(p) for p in sources},
+        "meta": data.meta,
+        "arrays": arrays,
+        "strings": strings,
+        "columns": [entry for entry, _ in blocks],
+    }
+    # 先用不短于真实值的占位偏移确定头部长度，再回填真实偏移，头部不足的部分以空格填充
+    for entry, _ in blocks:
+        entry["offset"] = 1 << 48
+    header_length = len(json.dumps(header).encode("utf-8"))
+    offset = _align(_PREAMBLE.size + header_length)
+    for entry, array in blocks:
+        entry["offset"] = offset
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode("utf-8").ljust(header_length)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, header_length))
+        f.write(header_bytes)
+        for entry, array in blocks:
+            f.write(b"\0" * (entry["offset"] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp, path)
+
+
+def read_cache(path: str) -> Tuple[dict, CacheData]:
+    """
+    读取缓存文件，列数据直接映射到文件上，不复制
+
+    Returns:
+        (头部, 缓存内容)
+
+    Raises:
+        OSError: 文件不存在或无法读取
+        ValueError: 魔数或格式版本不匹配、文件损坏
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mm) < _PREAMBLE.size:
+        raise ValueError(f"cache file too short: {path}")
+    magic, version, header_length = _PREAMBLE.unpack_from(mm, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"unsupported cache format: {magic!r} v{version}")
+    header = json.loads(bytes(mm[_PREAMBLE.size:_PREAMBLE.size + header_length]))
+
+    columns = {}
+    for entry in header["columns"]:
+        dtype = np.dtype(entry["dtype"])
+        count = entry["nbytes"] // dtype.itemsize
+        if entry["offset"] + entry["nbytes"] > len(mm):
+            raise ValueError(f"truncated cache file: {path}")
+        columns[entry["name"]] = np.frombuffer(mm, dtype=dtype, count=count, offset=entry["offset"]).reshape(entry["shape"])
+
+    strings = {}
+    for name, entry in header["strings"].items():
+        nulls = entry["nulls"]
+        strings[name] = StringTable(
+            columns[entry["data"]],
+            columns[entry["offsets"]],
+            None if nulls is None else columns[nulls],
+        )
+    arrays = {name: columns[column] for name, column in header["arrays"].items()}
+    return header, CacheData(arrays, strings, header.get("meta"))
+
+
+def load_cached(name: str, schema: int, sources: Sequence[str], build: Callable[[], CacheData]) -> CacheData:
+    """
+    读取名为 name 的缓存，缓存不存在或已过期时调用 build 重新生成
+
+    Args:
+        name: 缓存名，对应 CACHE_DIR/<name>.bin
+        schema: 数据布局版本
+        sources: 源文件路径，任一文件内容变化都会使缓存失效
+        build: 从源文件构建 CacheData
+
+    Returns:
+        CacheData；缓存写入失败时返回刚构建的内容
+    """
+    path = os.path.join(CACHE_DIR, f"{name}.bin")
+    try:
+        header, data = read_cache(path)
+        if _is_fresh(header, schema, sources):
+            return data
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    data = build()
+    try:
+        write_cache(path, data, schema, sources)
+    except OSError as e:
+        print(f"[GameDataCache] 写入缓存失败 {path}: {e}")
+    return data
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+if __name__ == "__main__":
+    import sys
+
+    from game_data.loader import DATASETS, preload
+
+    if "--force" in sys.argv and os.path.isdir(CACHE_DIR):
+        for filename in os.listdir(CACHE_DIR):
+            if filename.endswith(".bin"):
+                os.remove(os.path.join(CACHE_DIR, filename))
+
+    for name in DATASETS:
+        try:
+            elapsed = preload([name])[name]
+        except FileNotFoundError as e:
+            print(f"{name:<14} 跳过: 源文件不存在 {e.filename}")
+            continue
+        print(f"{name:<14} {elapsed * 1000:8.1f} ms")
@@ -1,11 +1,13 @@
 from base.tools import StrEnum
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import json
 import os
 
+import numpy as np
 from pydantic import BaseModel
 
-from base.base2 import Item
+from game_data.cache import CacheData, StringTable, load_cached
+from game_data.loader import register
 
 
 class Lang(StrEnum):
@@ -33,29 +35,86 @@ class Item(BaseModel):
     desc_var: str
     unique_name: str
 
-item_idx = {}
-item_unique_name = {}
-
-with open(os.path.join(os.path.dirname(__file__), './data/indexedItems.json'), "r", encoding="utf-8") as f:
-    raw_items = json.load(f)
-    for item in raw_items:
-        index = item["Index"]
-        localized_names = item["LocalizedNames"]
-        localized_descriptions = item["LocalizedDescriptions"]
-        name_var = item['LocalizationNameVariable']
-        desc_var = item['LocalizationDescriptionVariable']
-        unique_name = item['UniqueName']
-        i = Item(index=index, name=localized_names, desc=localized_descriptions, name_var=name_var, desc_var=desc_var, unique_name=unique_name)
-        item_idx[index] = i
-        item_unique_name[unique_name] = i
+# 按物品序号直接下标访问，未使用的序号为 None
+item_table: List[Optional[Item]] = []
+# 唯一名 -> 物品序号
+unique_name_index: Dict[str, int] = {}
+
+ITEMS_SOURCE = os.path.join(os.path.dirname(__file__), './data/indexedItems.json')
+# 缓存数据布局版本，列变化时递增
+ITEMS_CACHE_SCHEMA = 2
+
+
+def _build_items_cache() -> CacheData:
+    """indexedItems.json -> 列式缓存：每种语言的名字 / 描述各占一个字符串表"""
+    with open(ITEMS_SOURCE, "r", encoding="utf-8") as f:
+        raw_items = json.load(f)
+    strings = {
+        "unique_name": StringTable.from_strings([item['UniqueName'] for item in raw_items]),
+        "name_var": StringTable.from_strings([item['LocalizationNameVariable'] for item in raw_items]),
+        "desc_var": StringTable.from_strings([item['LocalizationDescriptionVariable'] for item in raw_items]),
+    }
+    # JSON 中的 Index 为字符串，缓存中统一保存为整数
+    arrays = {"index": np.array([int(item["Index"]) for item in raw_items], dtype=np.int32)}
+    for field, key in (("name", "LocalizedNames"), ("desc", "LocalizedDescriptions")):
+        values = [item[key] for item in raw_items]
+        arrays[f"{field}_present"] = np.array([v is not None for v in values], dtype=np.bool_)
+        for lang in Lang:
+            strings[f"{field}:{lang.value}"] = StringTable.from_strings([(v or {}).get(lang.value) for v in values])
+    return CacheData(arrays, strings)
+
+
+def _localized(data: CacheData, field: str, count: int) -> list:
+    """还原每个物品的 {Lang: 文本} 字典，整列 None 的物品还原为 None"""
+    result = [{} for _ in range(count)]
+    for lang in Lang:
+        for i, text in enumerate(data.strings[f"{field}:{lang.value}"].tolist()):
+            if text is not None:
+                result[i][lang] = text
+    present = data.arrays[f"{field}_present"].tolist()
+    return [value if has else None for value, has in zip(result, present)]
+
+
+def load():
+    data = load_cached("items", ITEMS_CACHE_SCHEMA, [ITEMS_SOURCE], _build_items_cache)
+    indexes = data.arrays["index"].tolist()
+    count = len(indexes)
+    names = _localized(data, "name", count)
+    descs = _localized(data, "desc", count)
+    table: List[Optional[Item]] = [None] * (max(indexes) + 1 if indexes else 0)
+    names_index: Dict[str, int] = {}
+    # 缓存中的数据已是合法类型，跳过 pydantic 校验
+    for index, name, desc, name_var, desc_var, unique_name in zip(
+        indexes, names, descs,
+        data.strings["name_var"].tolist(),
+        data.strings["desc_var"].tolist(),
+        data.strings["unique_name"].tolist(),
+    ):
+        table[index] = Item.model_construct(index=index, name=name, desc=desc, name_var=name_var, desc_var=desc_var, unique_name=unique_name)
+        names_index[unique_name] = index
+    item_table[:] = table
+    unique_name_index.clear()
+    unique_name_index.update(names_index)
+
+
+# 首次查询时加载；直接使用 item_table / unique_name_index 前需调用 loader.ensure()
+loader = register("items", load)
 
 def get_item(index: int) -> Optional[Item]:
-    return item_idx.get(str(index))
+    loader.ensure()
+    if 0 <= index < len(item_table):
+        return item_table[index]
+    return None
+
+def get_item_by_unique_name(unique_name: str) -> Optional[Item]:
+    loader.ensure()
+    index = unique_name_index.get(unique_name)
+    return None if index is None else item_table[index]
 
 def get_item_name(index: int, lang: Lang = Lang.zh_cn) -> str:
     d = f'Unknown({index})'
-    item = item_idx.get(str(index))
-    if item:
+    item = get_item(index)
+    if item and item.name:
         return item.name.get(lang, item.name.get(Lang.en, d))
     return d
 
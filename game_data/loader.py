@@ -0,0 +1,134 @@
+"""
+游戏数据按需加载
+各数据模块导入时不再读取数据文件，首次访问时才加载；preload 可显式加载，
+preload_in_background 在后台线程预热（例如主界面显示之后）
+"""
+import importlib
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+# 数据集名 -> 模块名
+DATASETS: Dict[str, str] = {
+    "localization": "game_data.localization",
+    "items": "game_data.items",
+    "spells": "game_data.spells",
+    "world": "game_data.world",
+}
+
+
+class LazyLoader(object):
+    """
+    只执行一次的加载函数
+    多个线程同时访问时只有一个线程加载，其余线程等待加载完成；
+    加载失败时记录错误（相同错误只打印一次），retry_interval 秒内的访问直接返回，查询函数使用空表的默认值
+    """
+
+    def __init__(self, name: str, load: Callable[[], object], retry_interval: float = 60.0):
+        """
+        Args:
+            name: 数据集名
+            load: 加载函数
+            retry_interval: 加载失败后重试的间隔（秒）
+        """
+        self.name = name
+        self._load = load
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.elapsed = 0.0
+        self.retry_interval = retry_interval
+        self.error: Optional[Exception] = None # 最近一次加载失败的异常
+        self._retry_at = 0.0
+
+    def ensure(self) -> bool:
+        """
+        确保数据已加载
+
+        Returns:
+            已加载返回 True，加载失败或仍在重试间隔内返回 False（错误见 error）
+        """
+        if self.loaded:
+            return True
+        if self.error is not None and time.monotonic() < self._retry_at:
+            return False
+        with self._lock:
+            if self.loaded:
+                return True
+            if self.error is not None and time.monotonic() < self._retry_at:
+                return False
+            start = time.perf_counter()
+            try:
+                self._load()
+            except Exception as e:
+                if self.error is None or repr(e) != repr(self.error):
+                    print(f"[GameData] {self.name} 加载失败，{self.retry_interval:.0f} 秒后重试: {e}")
+                self.error = e
+                self._retry_at = time.monotonic() + self.retry_interval
+                return False
+            self.elapsed = time.perf_counter() - start
+            self.error = None
+            self.loaded = True
+            return True
+
+
+_loaders: Dict[str, LazyLoader] = {}
+
+
+def register(name: str, load: Callable[[], object]) -> LazyLoader:
+    """注册数据集的加载函数，由各数据模块在导入时调用"""
+    loader = LazyLoader(name, load)
+    _loaders[name] = loader
+    return loader
+
+
+def get_loader(name: str) -> LazyLoader:
+    """获取数据集的加载器，对应模块尚未导入时先导入"""
+    if name not in _loaders:
+        importlib.import_module(DATASETS[name])
+    return _loaders[name]
+
+
+def preload(names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """
+    立即加载数据集
+
+    Args:
+        names: 数据集名，None 表示全部
+
+    Returns:
+        数据集名 -> 加载耗时（秒），已加载的为首次加载的耗时
+
+    Raises:
+        加载失败时抛出加载函数的异常（见 LazyLoader.error）
+    """
+    result = {}
+    for name in (DATASETS if names is None else names):
+        loader = get_loader(name)
+        if not loader.ensure():
+            raise loader.error
+        result[name] = loader.elapsed
+    return result
+
+
+def preload_in_background(names: Optional[Iterable[str]] = None) -> threading.Thread:
+    """
+    在后台线程加载数据集，加载期间访问同一数据集的线程会等待其完成
+
+    Args:
+        names: 数据集名，None 表示全部
+
+    Returns:
+        已启动的守护线程
+    """
+    names = list(DATASETS if names is None else names)
+
+    def run():
+        for name in names:
+            # 加载失败时 LazyLoader 已打印错误
+            loader = get_loader(name)
+            if loader.ensure():
+                print(f"[GameData] {name} 已加载 ({loader.elapsed * 1000:.0f} ms)")
+
+    thread = threading.Thread(target=run, name="GameDataPreload", daemon=True)
+    thread.start()
+    return thread
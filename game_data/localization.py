@@ -1,49 +1,223 @@
-from collections import defaultdict
+"""
+本地化文本
+只加载指定的语言（默认简体中文与英文，应用启动时按设置项 localization_langs 调用 set_langs），相同文本只保留一份；
+每个分类按 id 排序存放，查询时二分查找
+"""
+import bisect
 import json
 import os
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from game_data.cache import CacheData, StringTable, load_cached
+from game_data.loader import register
+
+DEFAULT_LANGS = ('ZH-CN', 'EN-US')
+
+# 按需加载时使用的语言，见 set_langs
+_langs: Tuple[str, ...] = DEFAULT_LANGS
+
+
+class LocalizationTable(object):
+    """
+    单个分类的本地化文本
+    keys 为排序后的 id，texts[lang][i] 为 keys[i] 在该语言下的文本（缺失为 None）
+    """
+    __slots__ = ('keys', 'texts')
+
+    def __init__(self, keys: Optional[List[str]] = None, texts: Optional[Dict[str, List[Optional[str]]]] = None):
+        self.keys = keys or []
+        self.texts = texts or {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) >= 0
+
+    def _find(self, key: str) -> int:
+        keys = self.keys
+        i = bisect.bisect_left(keys, key)
+        return i if i < len(keys) and keys[i] == key else -1
+
+    def text(self, key: str, lang: str, default: str = '') -> str:
+        """
+        查询文本
+
+        Returns:
+            文本，id 不存在、语言未加载或该语言下无文本时返回 default
+        """
+        column = self.texts.get(lang)
+        if column is None:
+            return default
+        i = self._find(key)
+        if i < 0:
+            return default
+        value = column[i]
+        return default if value is None else value
+
+    def get(self, key: str, default: Optional[dict] = None) -> Optional[Dict[str, str]]:
+        """
+        按旧接口返回 {语言: 文本}，只包含已加载的语言
+
+        Returns:
+            字典，id 不存在时返回 default
+        """
+        i = self._find(key)
+        if i < 0:
+            return default
+        return {lang: column[i] for lang, column in self.texts.items() if column[i] is not None}
+
 
 class Localization(object):
     def __init__(self):
-        self.items = {}
-        self.spells = {}
-        self.shop_category = {}
-        self.destiny_board = {}
-        self.journal = {}
-        self.sa = {}
-    
+        self.langs: Tuple[str, ...] = ()
+        self.items = LocalizationTable()
+        self.spells = LocalizationTable()
+        self.shop_category = LocalizationTable()
+        self.destiny_board = LocalizationTable()
+        self.journal = LocalizationTable()
+        self.sa = LocalizationTable()
+
     def get_spell_name(self, spell_uid: str, lang: str = 'ZH-CN') -> str:
-        return self.spells.get(spell_uid, {}).get(lang, '')
+        loader.ensure()
+        return self.spells.text(spell_uid, lang)
 
     def get_spell_desc(self, spell_uid: str, lang: str = 'ZH-CN') -> str:
-        return self.spells.get(f'{spell_uid}_DESC', {}).get(lang, '')
+        loader.ensure()
+        return self.spells.text(f'{spell_uid}_DESC', lang)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        估算各分类占用的内存（列表与字符串对象，相同字符串只计一次）
+
+        Returns:
+            分类属性名 -> 字节数
+        """
+        seen = set()
+
+        def size_of(strings: Iterable[Optional[str]]) -> int:
+            total = 0
+            for s in strings:
+                if s is not None and id(s) not in seen:
+                    seen.add(id(s))
+                    total += sys.getsizeof(s)
+            return total
+
+        report = {}
+        for _, attr in CATEGORIES:
+            table = getattr(self, attr)
+            total = sys.getsizeof(table.keys) + size_of(table.keys)
+            for column in table.texts.values():
+                total += sys.getsizeof(column) + size_of(column)
+            report[attr] = total
+        return report
 
 localization = Localization()
 
-def load():
-    global localization
-    with open(os.path.join(os.path.dirname(__file__), './data/merged_localization.json'), 'r', encoding='utf-8') as f:
+LOCALIZATION_SOURCE = os.path.join(os.path.dirname(__file__), './data/merged_localization.json')
+# 缓存数据布局版本，列变化时递增
+LOCALIZATION_CACHE_SCHEMA = 2
+
+# tuid 前缀 -> Localization 属性名，缓存中以下标保存
+CATEGORIES = (
+    ('ITEMS', 'items'),
+    ('SPELLS', 'spells'),
+    ('SHOPCATEGORY', 'shop_category'),
+    ('DESTINYBOARD', 'destiny_board'),
+    ('JOURNAL', 'journal'),
+    ('SA', 'sa'),
+)
+
+
+def _build_localization_cache() -> CacheData:
+    """
+    merged_localization.json -> 列式缓存
+    行按 (分类, id) 排序，同一分类内 id 重复时保留最后一条；meta['bounds'] 为各分类的起始行
+    """
+    with open(LOCALIZATION_SOURCE, 'r', encoding='utf-8') as f:
         raw = json.load(f)
+    category_index = {prefix: i for i, (prefix, _) in enumerate(CATEGORIES)}
+    categories: List[Dict[str, dict]] = [{} for _ in CATEGORIES]
+    langs = {}
     for d in raw:
         tuid = d['@tuid']
+        prefix = tuid.split('_')[0]
+        category = category_index.get(prefix)
+        if category is None:
+            continue
         tuv = {}
         lang_data = d.get('tuv', [])
         if isinstance(lang_data, dict):
             lang_data = [lang_data]
         for i in lang_data:
-            tuv[i['@xml:lang']] = i['seg']
-        prefix = tuid.split('_')[0]
-        trimd_id = tuid[len(prefix)+1:]
-        if prefix == 'ITEMS':
-            localization.items[trimd_id] = tuv
-        elif prefix == 'SPELLS':
-            localization.spells[trimd_id] = tuv
-        elif prefix == 'SHOPCATEGORY':
-            localization.shop_category[trimd_id] = tuv
-        elif prefix == 'DESTINYBOARD':
-            localization.destiny_board[trimd_id] = tuv
-        elif prefix == 'JOURNAL':
-            localization.journal[trimd_id] = tuv
-        elif prefix == 'SA':
-            localization.sa[trimd_id] = tuv
-
-load()
\ No newline at end of file
+            seg = i['seg']
+            # 空文本按空字符串保存；个别文本带标记时 seg 不是字符串，以 JSON 文本保存
+            if seg is None:
+                seg = ''
+            elif not isinstance(seg, str):
+                seg = json.dumps(seg, ensure_ascii=False)
+            tuv[i['@xml:lang']] = seg
+            langs.setdefault(i['@xml:lang'], None)
+        categories[category][tuid[len(prefix)+1:]] = tuv
+
+    keys = []
+    rows = []
+    bounds = []
+    for entries in categories:
+        bounds.append(len(keys))
+        for key in sorted(entries):
+            keys.append(key)
+            rows.append(entries[key])
+    bounds.append(len(keys))
+    strings = {'key': StringTable.from_strings(keys)}
+    for lang in langs:
+        strings[f'seg:{lang}'] = StringTable.from_strings([tuv.get(lang) for tuv in rows])
+    return CacheData(strings=strings, meta={'langs': list(langs), 'bounds': bounds})
+
+
+def set_langs(langs: Sequence[str]) -> None:
+    """
+    设置按需加载的语言，已加载时立即按新语言重新加载
+    技能名固定取简体中文（并写入 spells 缓存），因此 ZH-CN 始终加载
+
+    Args:
+        langs: 语言列表，如设置项 localization_langs
+    """
+    global _langs
+    _langs = tuple(dict.fromkeys(['ZH-CN', *langs]))
+    if loader.loaded:
+        load()
+
+
+def load(langs: Optional[Sequence[str]] = None):
+    """
+    加载本地化文本，可重复调用以切换语言
+
+    Args:
+        langs: 要加载的语言，None 表示使用 set_langs 设置的语言
+    """
+    global localization
+    langs = tuple(_langs if langs is None else langs)
+    data = load_cached('localization', LOCALIZATION_CACHE_SCHEMA, [LOCALIZATION_SOURCE], _build_localization_cache)
+    bounds = data.meta['bounds']
+    # 相同文本（包括跨语言、跨分类）只保留一个字符串对象
+    pool: Dict[str, str] = {}
+    intern = pool.setdefault
+    keys = [intern(k, k) for k in data.strings['key'].tolist()]
+    columns = {}
+    for lang in langs:
+        table = data.strings.get(f'seg:{lang}')
+        if table is not None:
+            columns[lang] = [None if t is None else intern(t, t) for t in table.tolist()]
+
+    for category, (_, attr) in enumerate(CATEGORIES):
+        start, end = bounds[category], bounds[category + 1]
+        setattr(localization, attr, LocalizationTable(
+            keys[start:end],
+            {lang: column[start:end] for lang, column in columns.items()},
+        ))
+    localization.langs = langs
+
+# 首次查询时加载；直接读取 localization 的分类表前需调用 loader.ensure()
+loader = register('localization', load)
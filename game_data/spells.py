@@ -1,11 +1,18 @@
+import json
 import os
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
-from typing import List, Optional
-from game_data.localization import localization
+from typing import Dict, List, Mapping, Optional
 
+import numpy as np
 
-@dataclass
+from game_data.cache import CacheData, StringTable, load_cached
+from game_data.loader import register
+from game_data.localization import LOCALIZATION_SOURCE, localization
+from game_data.localization import loader as localization_loader
+
+
+@dataclass(frozen=True)
 class GameFileDataSpell:
     index: int = -1
     unique_name: str = ""
@@ -15,41 +22,163 @@ class GameFileDataSpell:
     description_locatag: str = ""
 
 
-_spells: List[GameFileDataSpell] = []
+# 查询不到时返回的共享对象
+MISSING_SPELL = GameFileDataSpell()
+
+_SPELL_STRING_FIELDS = ("unique_name", "target", "category", "name_locatag", "description_locatag")
+
+
+class SpellTable(object):
+    """
+    按技能序号下标访问的并行数组
+    各字段保存为字符串池中的下标（0 为空字符串），GameFileDataSpell 在首次查询时构造并缓存
+    """
+
+    def __init__(self, strings: List[str], fields: Dict[str, List[int]], present: List[bool]):
+        """
+        Args:
+            strings: 字符串池，strings[0] 为空字符串
+            fields: 字段名 -> 每个序号在字符串池中的下标
+            present: 每个序号是否有技能
+        """
+        self.strings = strings
+        self.present = present
+        self._unique_name = fields["unique_name"]
+        self._target = fields["target"]
+        self._category = fields["category"]
+        self._name = fields["name_locatag"]
+        self._description = fields["description_locatag"]
+        self._objects: List[Optional[GameFileDataSpell]] = [None] * len(present)
+
+    def __len__(self) -> int:
+        return len(self.present)
+
+    def _row(self, index: int) -> int:
+        if index < 0:
+            index = (index + (1 << 32)) & 0xFFFFFFFF
+        if index < len(self.present) and self.present[index]:
+            return index
+        return -1
+
+    def name(self, index: int) -> str:
+        """技能名，查询不到返回空字符串"""
+        row = self._row(index)
+        return self.strings[self._name[row]] if row >= 0 else ""
+
+    def unique_name(self, index: int) -> str:
+        """技能唯一名，查询不到返回空字符串"""
+        row = self._row(index)
+        return self.strings[self._unique_name[row]] if row >= 0 else ""
+
+    def names(self) -> List[str]:
+        """按序号排列的全部技能名"""
+        strings = self.strings
+        return [strings[i] for i in self._name]
+
+    def spell(self, index: int) -> GameFileDataSpell:
+        """技能数据，查询不到返回 MISSING_SPELL"""
+        row = self._row(index)
+        if row < 0:
+            return MISSING_SPELL
+        spell = self._objects[row]
+        if spell is None:
+            strings = self.strings
+            spell = GameFileDataSpell(
+                index=row,
+                unique_name=strings[self._unique_name[row]],
+                target=strings[self._target[row]],
+                category=strings[self._category[row]],
+                name_locatag=strings[self._name[row]],
+                description_locatag=strings[self._description[row]],
+            )
+            self._objects[row] = spell
+        return spell
+
+
+_table = SpellTable([""], {field: [] for field in _SPELL_STRING_FIELDS}, [])
 
 
 def get_unique_name(index: int) -> str:
-    s = get_spell_by_index(index)
-    return s.unique_name if s else ""
+    loader.ensure()
+    return _table.unique_name(index)
+
+
+def get_spell_name(index: int) -> str:
+    loader.ensure()
+    return _table.name(index)
+
+
+def get_spell_table() -> SpellTable:
+    loader.ensure()
+    return _table
 
 
 def is_data_loaded() -> bool:
-    return len(_spells) > 0
+    loader.ensure()
+    return len(_table) > 0
+
 
+def get_spell_by_index(index: int) -> GameFileDataSpell:
+    loader.ensure()
+    return _table.spell(index)
 
-def get_spell_by_index(index: int) -> Optional[GameFileDataSpell]:
-    if not is_data_loaded():
-        return GameFileDataSpell()
-    if index < 0:
-        index = (index + (1 << 32)) & 0xFFFFFFFF
-    if 0 <= index < len(_spells):
-        return _spells[index]
-    return GameFileDataSpell()
 
 
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SPELLS_SOURCE = os.path.join(DATA_DIR, "spells.xml")
+PROCESSED_SPELLS_SOURCE = os.path.join(DATA_DIR, "processed_spells.json")
+# 缓存数据布局版本，列变化时递增
+SPELLS_CACHE_SCHEMA = 2
+
+
+def spells_source() -> Optional[str]:
+    """技能数据源：优先 spells.xml，其次 processed_spells.json，都不存在返回 None"""
+    for path in (SPELLS_SOURCE, PROCESSED_SPELLS_SOURCE):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _build_spells_cache(source: str) -> CacheData:
+    """技能数据源（技能名取自本地化数据，不可用时为 namelocatag / descriptionlocatag）-> 字符串池 + 每个字段一列池下标"""
+    if source.endswith(".xml"):
+        spells = build_spells(list(ET.parse(source).getroot()))
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            spells = build_spells_from_json(json.load(f))
+
+    size = max((s.index for s in spells), default=-1) + 1
+    pool: Dict[str, int] = {"": 0}
+    columns = {field: np.zeros(size, dtype=np.int32) for field in _SPELL_STRING_FIELDS}
+    present = np.zeros(size, dtype=np.bool_)
+    for s in spells:
+        present[s.index] = True
+        for field in _SPELL_STRING_FIELDS:
+            columns[field][s.index] = pool.setdefault(getattr(s, field), len(pool))
+    arrays = {f"field:{field}": column for field, column in columns.items()}
+    arrays["present"] = present
+    return CacheData(arrays, {"strings": StringTable.from_strings(list(pool))})
+
 
 def load_data() -> bool:
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(base_dir, "data", "spells.xml")
-    if not os.path.exists(file_path):
-        _spells.clear()
+    global _table
+    source = spells_source()
+    if source is None:
+        _table = SpellTable([""], {field: [] for field in _SPELL_STRING_FIELDS}, [])
         return False
-    root = ET.parse(file_path).getroot()
-    elements = list(root)
-    spells = build_spells(elements)
-    _spells.clear()
-    _spells.extend(spells)
-    return len(_spells) >= 0
+    # 本地化数据不可用时技能名使用 namelocatag，缓存只记录技能数据源，本地化文件出现后缓存失效并重新构建
+    if localization_loader.ensure():
+        sources = [source, LOCALIZATION_SOURCE]
+    else:
+        print("[GameData] 本地化数据不可用，技能名使用 namelocatag")
+        sources = [source]
+    data = load_cached("spells", SPELLS_CACHE_SCHEMA, sources, lambda: _build_spells_cache(source))
+    _table = SpellTable(
+        data.strings["strings"].tolist(),
+        {field: data.arrays[f"field:{field}"].tolist() for field in _SPELL_STRING_FIELDS},
+        data.arrays["present"].tolist(),
+    )
+    return True
 
 
 def build_spells(elements: List[ET.Element]) -> List[GameFileDataSpell]:
@@ -60,22 +189,22 @@ def build_spells(elements: List[ET.Element]) -> List[GameFileDataSpell]:
         if tag == "colortag":
             pass
         elif tag == "passivespell":
-            s = _create_game_file_data_spell(index, el)
+            s = _create_game_file_data_spell(index, el.attrib)
             index += 1
             if s:
                 spells.append(s)
         elif tag == "activespell":
-            s = _create_game_file_data_spell(index, el)
+            s = _create_game_file_data_spell(index, el.attrib)
             index += 1
             if s:
                 spells.append(s)
             if el.find("channelingspell") is not None:
-                cs = _create_game_file_data_spell(index, el)
+                cs = _create_game_file_data_spell(index, el.attrib)
                 index += 1
                 if cs:
                     spells.append(cs)
         elif tag == "togglespell":
-            s = _create_game_file_data_spell(index, el)
+            s = _create_game_file_data_spell(index, el.attrib)
             index += 1
             if s:
                 spells.append(s)
@@ -84,14 +213,26 @@ def build_spells(elements: List[ET.Element]) -> List[GameFileDataSpell]:
     return spells
 
 
-def _create_game_file_data_spell(index: int, el: ET.Element) -> Optional[GameFileDataSpell]:
-    unique_name = _get_attr(el, "uniquename")
-    name_locatag = _get_attr(el, "namelocatag")
-    description_locatag = _get_attr(el, "descriptionlocatag")
-    target = _get_attr(el, "target")
-    category = _get_attr(el, "category")
-    name_locatag = localization.get_spell_name(unique_name) or name_locatag
-    description_locatag = localization.get_spell_desc(unique_name) or description_locatag
+def build_spells_from_json(entries: List[dict]) -> List[GameFileDataSpell]:
+    """processed_spells.json 已按技能序号展开，每条记录占一个序号，属性名带 @ 前缀"""
+    spells: List[GameFileDataSpell] = []
+    for index, entry in enumerate(entries):
+        attrs = {key[1:]: value for key, value in entry.items() if key.startswith("@")}
+        s = _create_game_file_data_spell(index, attrs)
+        if s:
+            spells.append(s)
+    return spells
+
+
+def _create_game_file_data_spell(index: int, attrs: Mapping[str, str]) -> Optional[GameFileDataSpell]:
+    unique_name = _get_attr(attrs, "uniquename")
+    name_locatag = _get_attr(attrs, "namelocatag")
+    description_locatag = _get_attr(attrs, "descriptionlocatag")
+    target = _get_attr(attrs, "target")
+    category = _get_attr(attrs, "category")
+    if localization_loader.loaded:
+        name_locatag = localization.get_spell_name(unique_name) or name_locatag
+        description_locatag = localization.get_spell_desc(unique_name) or description_locatag
     if unique_name:
         return GameFileDataSpell(
             index=index,
@@ -104,9 +245,9 @@ def _create_game_file_data_spell(index: int, el: ET.Element) -> Optional[GameFil
     return None
 
 
-def _get_attr(el: ET.Element, name: str) -> str:
-    v = el.get(name)
-    return v if v is not None else ""
+def _get_attr(attrs: Mapping[str, str], name: str) -> str:
+    v = attrs.get(name)
+    return str(v) if v is not None else ""
 
 
 def _strip_ns(tag: str) -> str:
@@ -114,4 +255,5 @@ def _strip_ns(tag: str) -> str:
         return tag.split("}", 1)[1]
     return tag
 
-load_data()
\ No newline at end of file
+# 首次查询时加载
+loader = register("spells", load_data)
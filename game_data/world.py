@@ -2,6 +2,9 @@ from pydantic import BaseModel
 import json
 import os
 
+from game_data.cache import CacheData, StringTable, load_cached
+from game_data.loader import register
+
 class WorldData(BaseModel):
     raw: dict
     displayname: str
@@ -10,31 +13,56 @@ class WorldData(BaseModel):
 def isalpha(c):
     return 'a' <= c <= 'z' or 'A' <= c <= 'Z' or c == ' ' or c in ['\'', '.']
 
-with open(os.path.join(os.path.dirname(__file__), './data/world.json'), 'r', encoding='utf-8-sig') as f:
-    data = json.load(f)
+WORLD_SOURCE = os.path.join(os.path.dirname(__file__), './data/world.json')
+# 缓存数据布局版本，列变化时递增
+WORLD_CACHE_SCHEMA = 1
+
+
+def _build_world_cache() -> CacheData:
+    """world.json -> 列式缓存：id、显示名，以及每张地图的原始 JSON 文本"""
+    with open(WORLD_SOURCE, 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+    # 同一 id 出现多次时保留最后一条
+    rows = {d['@id']: d for d in data}
+    return CacheData(strings={
+        'id': StringTable.from_strings(list(rows)),
+        'displayname': StringTable.from_strings([d.get('@displayname') for d in rows.values()]),
+        'raw': StringTable.from_strings([json.dumps(d, ensure_ascii=False) for d in rows.values()]),
+    })
 
+
+_world = None
+# id -> 缓存行号；WorldData 在首次查询时构造并存入 map_data
+_map_rows = {}
 map_data = {}
-for d in data:
-    map_data[d['@id']] = d
-
-for d in data:
-    displayname = d.get('@displayname')
-    map_id = d.get('@id')
-    # for l in displayname:
-        # if not isalpha(l):
-        #     print(f'{k}:{displayname}')
-        #     break
-    map_data[map_id] = WorldData(
-        raw=d,
-        displayname=displayname,
-        id=map_id
-    )
 
 
+def load():
+    global _world
+    _world = load_cached('world', WORLD_CACHE_SCHEMA, [WORLD_SOURCE], _build_world_cache)
+    _map_rows.update((map_id, row) for row, map_id in enumerate(_world.strings['id'].tolist()))
+
+
+# 首次查询时加载
+loader = register('world', load)
+
 
 def get_map(map_id: int) -> WorldData:
-    return map_data.get(map_id, WorldData(
-        raw={},
-        displayname="Unknown",
-        id="Unknown"
-    ))
\ No newline at end of file
+    world = map_data.get(map_id)
+    if world is not None:
+        return world
+    loader.ensure()
+    row = _map_rows.get(map_id)
+    if row is None:
+        return WorldData(
+            raw={},
+            displayname="Unknown",
+            id="Unknown"
+        )
+    world = WorldData(
+        raw=json.loads(_world.strings['raw'][row]),
+        displayname=_world.strings['displayname'][row],
+        id=map_id
+    )
+    map_data[map_id] = world
+    return world
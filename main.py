@@ -5,8 +5,8 @@ import time
 from PySide6.QtWidgets import QApplication
 
 # 核心框架
-from core.engine import Engine
-from base.base2 import EventType
+from core.engine import HandlerLane
+from core.qt_engine import QtEngine
 
 # UI 层
 from ui.master_overlay import MasterOverlay
@@ -14,6 +14,9 @@ from ui.control_dashboard import ControlDashboard
 
 # 插件系统 (集中注册)
 from plugins import register_default_plugins, log_plugin, player_plugin, path_recorder_plugin, fps_plugin
+from core.config.storage import global_config_manager
+from game_data.loader import preload_in_background
+from game_data.localization import DEFAULT_LANGS, set_langs
 
 # TODO: 替换为你实际游戏窗口的精确标题
 GAME_WINDOW_TITLE = "Albion Online Client" 
@@ -29,12 +32,13 @@ def main():
     
 
     # 2. 初始化游戏引擎
-    engine = Engine()
+    engine = QtEngine()
     engine.start()
-    engine.game_event_dispatcher.register(EventType.Debug, None, log_plugin.handle_event)
-    engine.game_event_dispatcher.register(EventType.Debug, None, player_plugin.handle_event)
-    engine.game_event_dispatcher.register(EventType.Debug, None, fps_plugin.handle_event)
-    engine.game_event_dispatcher.register(EventType.Debug, None, path_recorder_plugin.handle_event)
+    engine.game_event_dispatcher.register_plugin(log_plugin)
+    engine.game_event_dispatcher.register_plugin(player_plugin)
+    engine.game_event_dispatcher.register_plugin(fps_plugin)
+    # 路径记录器不操作 UI，直接在解码线程处理
+    engine.game_event_dispatcher.register_plugin(path_recorder_plugin, lane=HandlerLane.WORKER)
    
     
     # 3. 注册插件（集中管理，自动恢复配置）
@@ -51,6 +55,9 @@ def main():
         
     overlay.edit_mode_changed.connect(update_dashboard_ui)
 
+    # 5. 界面显示后在后台预热游戏数据，首个事件到达时无需再等待加载
+    set_langs(global_config_manager.get_setting("general", "localization_langs", list(DEFAULT_LANGS)))
+    preload_in_background()
     
     # 6. 运行应用
     result = app.exec()
@@ -3,10 +3,9 @@
 整合 SnifferWorker 和 HandlerRegistry，对外提供统一的网络管理接口
 类似于 C# 的 NetworkManager
 """
-from network.providers.libpcap import LibpcapProvider
 from network.providers.udp_socket import UdpSocketProvider
 from typing import Optional, List
-from base.base2 import RawPacketSignal
+from base.base2 import PacketProvider, RawPacketSignal
 from core.config.storage import global_config_manager
 
 class NetworkManager:
@@ -25,15 +24,21 @@ class NetworkManager:
         """
         self.target_ports = target_ports
         
-        self.packet_provider: Optional[object] = None # LibpcapProvider or UdpSocketProvider
+        self.packet_provider: Optional[object] = None # LibpcapProvider, UdpSocketProvider, AsyncPacketProvider or ReplayProvider
         
         print("[NetworkManager] 网络管理器已初始化")
 
     
-    def start(self, signal: RawPacketSignal) -> bool:
+    def start(self, signal: RawPacketSignal, mode: Optional[str] = None) -> bool:
         """
         启动网络抓包
         
+        Args:
+            signal: 用于传输数据包内容的信号
+            mode: 抓包模式 "local" / "remote" / "async" / "replay"，None 表示读取配置 sniffer_mode；
+                "async" 在当前线程运行中的事件循环上接收 Go Sniffer 转发的数据包，
+                "replay" 回放配置 replay_file 指定的录制文件
+        
         Returns:
             如果启动成功返回 True，否则返回 False
         """
@@ -43,15 +48,60 @@ class NetworkManager:
         
         try:
             # 读取配置决定使用哪种模式
-            mode = global_config_manager.get_setting("general", "sniffer_mode", "local")
+            if mode is None:
+                mode = global_config_manager.get_setting("general", "sniffer_mode", "local")
+            # 批量投递：每批最多 batch_size 个数据包，首包最多等待 batch_interval_ms
+            batch_size = global_config_manager.get_setting("general", "packet_batch_size", 64)
+            batch_interval = global_config_manager.get_setting("general", "packet_batch_interval_ms", 2) / 1000.0
             
-            if mode == "remote":
+            if mode == "async":
+                print("[NetworkManager] 使用远程/Go转发模式 (asyncio UDP)")
+                from network.providers.async_udp import AsyncPacketProvider
+                self.packet_provider = AsyncPacketProvider(
+                    signal=signal,
+                    target_ports=self.target_ports,
+                    listening_port=44444,
+                    recv_buffer_size=global_config_manager.get_setting("general", "udp_recv_buffer_size", 8 * 1024 * 1024),
+                )
+            elif mode == "replay":
+                from network.providers.replay import ReplayProvider
+                replay_file = global_config_manager.get_setting("general", "replay_file", "")
+                replay_speed = global_config_manager.get_setting("general", "replay_speed", 1.0)
+                print(f"[NetworkManager] 使用回放模式 ({replay_file})")
+                self.packet_provider = ReplayProvider(
+                    signal=signal,
+                    path=replay_file,
+                    target_ports=self.target_ports,
+                    speed=replay_speed,
+                    batch_size=batch_size,
+                    batch_interval=batch_interval,
+                )
+            elif mode == "remote":
                 print("[NetworkManager] 使用远程/Go转发模式 (UDP Socket)")
                 # 监听端口 44444，与 Go Sniffer config.json 中的 targets 对应
-                self.packet_provider = UdpSocketProvider(signal=signal, target_ports=self.target_ports, listening_port=44444)
+                self.packet_provider = UdpSocketProvider(
+                    signal=signal,
+                    target_ports=self.target_ports,
+                    listening_port=44444,
+                    batch_size=batch_size,
+                    batch_interval=batch_interval,
+                    bulk_receive=global_config_manager.get_setting("general", "udp_bulk_receive", True),
+                    recv_buffer_size=global_config_manager.get_setting("general", "udp_recv_buffer_size", 8 * 1024 * 1024),
+                )
             else:
-                print("[NetworkManager] 使用本地抓包模式 (Libpcap)")
-                self.packet_provider = LibpcapProvider(signal=signal, target_ports=self.target_ports)
+                # 仅本地抓包需要 pcapy，远程模式（如无界面服务器）无需安装
+                from network.providers.libpcap import LibpcapProvider, CaptureMode
+                capture_mode = global_config_manager.get_setting("general", "capture_mode", CaptureMode.BLOCKING)
+                print(f"[NetworkManager] 使用本地抓包模式 (Libpcap, {capture_mode})")
+                read_timeout_ms = global_config_manager.get_setting("general", "capture_timeout_ms", 1)
+                self.packet_provider = LibpcapProvider(
+                    signal=signal,
+                    target_ports=self.target_ports,
+                    capture_mode=capture_mode,
+                    read_timeout_ms=read_timeout_ms,
+                    batch_size=batch_size,
+                    batch_interval=batch_interval,
+                )
                 
             success = self.packet_provider.start()
             
@@ -63,6 +113,22 @@ class NetworkManager:
             print(f"[NetworkManager] 启动失败: {e}")
             return False
     
+    def start_provider(self, provider: PacketProvider) -> bool:
+        """
+        启动调用方构造好的数据包提供者（如基准测试中的 ReplayProvider），不读取 sniffer_mode 配置
+        
+        Args:
+            provider: 已绑定信号的数据包提供者
+        
+        Returns:
+            如果启动成功返回 True，否则返回 False
+        """
+        if self.packet_provider and self.packet_provider.is_running():
+            print("[NetworkManager] 数据包提供者已在运行")
+            return False
+        self.packet_provider = provider
+        return provider.start()
+
     def stop(self) -> bool:
         """
         停止网络抓包
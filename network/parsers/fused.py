@@ -0,0 +1,131 @@
+"""
+L2→L4 融合解析器
+在一次遍历中完成 以太网 / IP / UDP 解析，基于 memoryview 零拷贝提取 UDP 负载
+"""
+import struct
+from typing import Optional
+
+from network.parsers.ethernet import EtherType, EthernetParser
+from network.parsers.ip import IPProtocol
+from network.parsers.udp import UDPParser
+
+
+_unpack_ether_type = struct.Struct('!H').unpack_from
+_unpack_udp_header = struct.Struct('!HHH').unpack_from
+
+IPV4_MIN_HEADER_SIZE = 20
+IPV6_HEADER_SIZE = 40
+
+
+class UDPDatagram:
+    """
+    融合解析结果
+    仅保存端口与负载视图，IP 地址字符串在首次访问时才生成
+    """
+    __slots__ = ('src_port', 'dst_port', 'payload', '_ip_header', '_ip_version')
+
+    def __init__(self, src_port: int, dst_port: int, payload: memoryview, ip_header: memoryview, ip_version: int):
+        self.src_port = src_port
+        self.dst_port = dst_port
+        self.payload = payload
+        self._ip_header = ip_header
+        self._ip_version = ip_version
+
+    def _format_addr(self, start: int) -> str:
+        if self._ip_version == 4:
+            return '.'.join(str(b) for b in self._ip_header[start:start + 4])
+        return self._ip_header[start:start + 16].hex()
+
+    @property
+    def src_addr(self) -> str:
+        """源 IP 地址（惰性计算，格式与 IPParser 一致）"""
+        return self._format_addr(12 if self._ip_version == 4 else 8)
+
+    @property
+    def dst_addr(self) -> str:
+        """目标 IP 地址（惰性计算，格式与 IPParser 一致）"""
+        return self._format_addr(16 if self._ip_version == 4 else 24)
+
+
+class FusedParser:
+    """
+    融合解析器
+    替代 EthernetParser → IPParser → UDPParser 的逐层解析，
+    不构造中间层对象、不复制负载，非 UDP 数据包尽早丢弃
+    """
+
+    @staticmethod
+    def parse_ethernet(data: bytes) -> Optional[UDPDatagram]:
+        """
+        从以太网帧开始解析
+
+        Args:
+            data: 以太网帧数据
+
+        Returns:
+            UDPDatagram 对象，如果不是 UDP 数据包或解析失败返回 None
+        """
+        if len(data) < EthernetParser.ETHERNET_HEADER_SIZE:
+            return None
+
+        view = memoryview(data)
+        ether_type = _unpack_ether_type(view, 12)[0]
+        if ether_type != EtherType.IPv4 and ether_type != EtherType.IPv6:
+            return None
+        return FusedParser.parse_ip(view, EthernetParser.ETHERNET_HEADER_SIZE)
+
+    @staticmethod
+    def parse_ip(data: bytes, offset: int = 0) -> Optional[UDPDatagram]:
+        """
+        从 IP 头部开始解析（IPv4 / IPv6 由版本号自动识别）
+
+        Args:
+            data: 包含 IP 数据包的数据
+            offset: IP 头部在 data 中的起始偏移
+
+        Returns:
+            UDPDatagram 对象，如果不是 UDP 数据包或解析失败返回 None
+        """
+        view = data if isinstance(data, memoryview) else memoryview(data)
+        total = len(view)
+        if total <= offset:
+            return None
+
+        version = view[offset] >> 4
+        if version == 4:
+            if total - offset < IPV4_MIN_HEADER_SIZE:
+                return None
+            if view[offset + 9] != IPProtocol.UDP:
+                return None
+            header_size = (view[offset] & 0x0F) * 4
+            if header_size < IPV4_MIN_HEADER_SIZE:
+                return None
+        elif version == 6:
+            if total - offset < IPV6_HEADER_SIZE:
+                return None
+            # 与 IPParser.parse_ipv6 一致，不处理扩展头
+            if view[offset + 6] != IPProtocol.UDP:
+                return None
+            header_size = IPV6_HEADER_SIZE
+        else:
+            return None
+
+        udp_offset = offset + header_size
+        if total - udp_offset < UDPParser.UDP_HEADER_SIZE:
+            return None
+
+        src_port, dst_port, length = _unpack_udp_header(view, udp_offset)
+        payload_start = udp_offset + UDPParser.UDP_HEADER_SIZE
+        # 以 UDP 长度字段截断，去掉以太网最小帧长的填充字节
+        if UDPParser.UDP_HEADER_SIZE <= length <= total - udp_offset:
+            payload_end = udp_offset + length
+        else:
+            payload_end = total
+
+        return UDPDatagram(
+            src_port,
+            dst_port,
+            view[payload_start:payload_end],
+            view[offset:udp_offset],
+            version,
+        )
@@ -46,3 +46,64 @@ class PhotonSignatures:
 
     # Photon 协议头长度
     PHOTON_HEADER_LENGTH = 12
+
+
+class PhotonCommandType:
+    """
+    Photon 命令类型
+    """
+    Acknowledge = 1
+    Disconnect = 4
+    SendReliable = 6
+    SendUnreliable = 7
+    SendFragment = 8
+
+    # 命令头长度: 类型(1) 通道(1) 标志(1) 保留(1) 长度(4) 序号(4)
+    COMMAND_HEADER_LENGTH = 12
+    # SendUnreliable 在命令头后额外携带 4 字节不可靠序号
+    UNRELIABLE_EXTRA_LENGTH = 4
+
+
+class PhotonMessageType:
+    """
+    Photon 消息类型（可靠/不可靠命令负载的第 2 个字节）
+    """
+    OperationRequest = 2
+    OperationResponse = 3
+    Event = 4
+
+
+class PhotonParameterKey:
+    """
+    Albion 在参数表中携带真实消息码的键
+    """
+    # 事件的真实事件码，缺失时使用 Photon 事件码
+    EventCode = 252
+    # 请求/响应的真实操作码
+    OperationCode = 253
+
+
+class Protocol16Type:
+    """
+    Photon Protocol16 值类型码
+    """
+    Unknown = 0
+    Null = 42
+    Dictionary = 68
+    StringArray = 97
+    Byte = 98
+    Double = 100
+    EventData = 101
+    Float = 102
+    Hashtable = 104
+    Integer = 105
+    Short = 107
+    Long = 108
+    IntegerArray = 110
+    Boolean = 111
+    OperationResponse = 112
+    OperationRequest = 113
+    String = 115
+    ByteArray = 120
+    Array = 121
+    ObjectArray = 122
@@ -0,0 +1,196 @@
+"""
+Photon 数据包解码器
+解析 Photon 头部与命令，重组分片，并在反序列化参数表之前先查看消息码，
+没有订阅者的消息直接跳过，不构造参数字典
+"""
+import struct
+from typing import Any, Callable, Dict, Optional
+
+from network.photon.constants import (
+    PhotonCommandType,
+    PhotonMessageType,
+    PhotonParameterKey,
+    PhotonSignatures,
+)
+from network.photon.protocol16 import find_parameter, read_parameter_table, read_value
+
+
+_unpack_command_length = struct.Struct('>I').unpack_from
+_unpack_fragment_header = struct.Struct('>iiiii').unpack_from
+
+# 分片头: 起始序号 分片数 分片号 总长度 分片偏移
+FRAGMENT_HEADER_LENGTH = 20
+
+# 数据损坏或截断时反序列化可能抛出的异常
+_DECODE_ERRORS = (struct.error, IndexError, ValueError, UnicodeDecodeError)
+
+# 消息回调: (消息码, 参数字典)
+MessageCallback = Callable[[int, Dict[int, Any]], None]
+# 订阅判断: (消息类型, 消息码) -> 是否需要解码
+WantsCallback = Callable[[int, int], bool]
+
+
+class _SegmentedPayload:
+    """正在重组的分片消息"""
+    __slots__ = ('total_length', 'bytes_written', 'payload')
+
+    def __init__(self, total_length: int):
+        self.total_length = total_length
+        self.bytes_written = 0
+        self.payload = bytearray(total_length)
+
+
+class PhotonDecoder(object):
+    """
+    Photon 数据包解码器
+
+    事件码取参数 252，缺失时使用 Photon 事件码；请求/响应的操作码取参数 253，缺失时丢弃
+    CRC 校验包（标志 0xCC）不做校验直接解析，加密包（标志 1）直接丢弃
+    """
+
+    def __init__(
+        self,
+        on_event: MessageCallback,
+        on_request: MessageCallback,
+        on_response: MessageCallback,
+        wants: Optional[WantsCallback] = None,
+        max_pending_segments: int = 64,
+    ):
+        """
+        Args:
+            on_event: 事件回调
+            on_request: 请求回调
+            on_response: 响应回调
+            wants: 订阅判断，返回 False 的消息不反序列化参数表；None 表示全部解码
+            max_pending_segments: 最多同时重组的分片消息数，超出时丢弃最早的
+        """
+        self.on_event = on_event
+        self.on_request = on_request
+        self.on_response = on_response
+        self.wants = wants
+        self.max_pending_segments = max_pending_segments
+        self._pending_segments: Dict[int, _SegmentedPayload] = {}
+
+        self.decoded = 0
+        self.skipped = 0
+        self.malformed = 0
+
+    def handle_payload(self, payload) -> None:
+        """
+        解码一个 UDP 负载
+
+        Args:
+            payload: UDP 负载（bytes 或 memoryview）
+        """
+        buf = payload if isinstance(payload, memoryview) else memoryview(payload)
+        total = len(buf)
+        if total < PhotonSignatures.PHOTON_HEADER_LENGTH:
+            return
+
+        # 头部: peer_id(2) 标志(1) 命令数(1) 时间戳(4) 挑战值/CRC(4)
+        if buf[2] == 1:
+            return
+
+        offset = PhotonSignatures.PHOTON_HEADER_LENGTH
+        for _ in range(buf[3]):
+            if offset + PhotonCommandType.COMMAND_HEADER_LENGTH > total:
+                self.malformed += 1
+                return
+            command_type = buf[offset]
+            length = _unpack_command_length(buf, offset + 4)[0]
+            end = offset + length
+            if length < PhotonCommandType.COMMAND_HEADER_LENGTH or end > total:
+                self.malformed += 1
+                return
+
+            body = offset + PhotonCommandType.COMMAND_HEADER_LENGTH
+            if command_type == PhotonCommandType.SendReliable:
+                self._handle_message(buf[body:end])
+            elif command_type == PhotonCommandType.SendUnreliable:
+                self._handle_message(buf[body + PhotonCommandType.UNRELIABLE_EXTRA_LENGTH:end])
+            elif command_type == PhotonCommandType.SendFragment:
+                self._handle_fragment(buf[body:end])
+            elif command_type == PhotonCommandType.Disconnect:
+                return
+            offset = end
+
+    def stats(self) -> dict:
+        """
+        获取解码统计
+
+        Returns:
+            包含 decoded, skipped, malformed, pending_segments 的字典
+        """
+        return {
+            'decoded': self.decoded,
+            'skipped': self.skipped,
+            'malformed': self.malformed,
+            'pending_segments': len(self._pending_segments),
+        }
+
+    def _handle_fragment(self, fragment: memoryview) -> None:
+        if len(fragment) < FRAGMENT_HEADER_LENGTH:
+            self.malformed += 1
+            return
+        start_sequence, _, _, total_length, fragment_offset = _unpack_fragment_header(fragment, 0)
+        data = fragment[FRAGMENT_HEADER_LENGTH:]
+        fragment_end = fragment_offset + len(data)
+
+        segment = self._pending_segments.get(start_sequence)
+        if segment is None:
+            if total_length <= 0:
+                self.malformed += 1
+                return
+            if len(self._pending_segments) >= self.max_pending_segments:
+                del self._pending_segments[next(iter(self._pending_segments))]
+            segment = _SegmentedPayload(total_length)
+            self._pending_segments[start_sequence] = segment
+
+        if fragment_offset < 0 or fragment_end > segment.total_length:
+            self.malformed += 1
+            del self._pending_segments[start_sequence]
+            return
+
+        segment.payload[fragment_offset:fragment_end] = data
+        segment.bytes_written += len(data)
+        if segment.bytes_written >= segment.total_length:
+            del self._pending_segments[start_sequence]
+            self._handle_message(memoryview(segment.payload))
+
+    def _handle_message(self, message: memoryview) -> None:
+        """
+        处理可靠/不可靠命令负载: 信号字节(1) 消息类型(1) 消息体
+        """
+        if len(message) < 3:
+            return
+        message_type = message[1]
+        try:
+            if message_type == PhotonMessageType.Event:
+                callback = self.on_event
+                table = 3
+                code = find_parameter(message, table, PhotonParameterKey.EventCode)
+                if code is None:
+                    code = message[2]
+            elif message_type == PhotonMessageType.OperationRequest:
+                callback = self.on_request
+                table = 3
+                code = find_parameter(message, table, PhotonParameterKey.OperationCode)
+            elif message_type == PhotonMessageType.OperationResponse:
+                callback = self.on_response
+                # 操作码(1) 返回码(2) 调试信息(类型码 + 值)
+                table = read_value(message, 6, message[5])[1]
+                code = find_parameter(message, table, PhotonParameterKey.OperationCode)
+            else:
+                return
+            if code is None:
+                return
+            if self.wants is not None and not self.wants(message_type, code):
+                self.skipped += 1
+                return
+            parameters = read_parameter_table(message, table)[0]
+        except _DECODE_ERRORS:
+            self.malformed += 1
+            return
+
+        self.decoded += 1
+        callback(code, parameters)
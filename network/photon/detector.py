@@ -2,7 +2,8 @@
 Photon 数据包检测器
 识别 Photon 协议的数据包
 """
-from network.photon.constants import PhotonPorts, PhotonSignatures
+from typing import Iterable
+from network.photon.constants import PhotonPorts, PhotonSignatures, PhotonCommandType, PhotonMessageType
 
 
 class PhotonDetector:
@@ -10,6 +11,9 @@ class PhotonDetector:
     Photon 协议检测器
     通过端口和负载特征双重验证识别 Photon 数据包
     """
+
+    # Albion 的 Move 事件直接使用 Photon 事件码 3，不携带 252 参数
+    MOVE_EVENT_CODE = 3
     
     @staticmethod
     def looks_like_photon(payload: bytes) -> bool:
@@ -56,3 +60,70 @@ class PhotonDetector:
         
         # 但负载不能为空
         return is_photon and len(payload) > 0
+
+    @staticmethod
+    def build_bpf_filter(ports: Iterable[int], payload_checks: bool = True) -> str:
+        """
+        生成 BPF 过滤表达式
+        
+        payload_checks 为 True 时在内核中同时校验 UDP 负载：
+        - 负载长度不小于 Photon 协议头长度
+        - 标志字节（负载第 3 字节）不为加密标志 1，加密包在解析时同样会被丢弃
+        - 命令数（负载第 4 字节）不为 0
+        IPv6 不支持 udp[] 访问，按固定 40 字节头部用 ip6[] 绝对偏移校验（与解析器一致，不处理扩展头）
+        
+        Args:
+            ports: 目标 UDP 端口
+            payload_checks: 是否附加负载校验，仅适用于以太网链路层
+            
+        Returns:
+            BPF 过滤表达式
+        """
+        port_expr = ' or '.join(f'udp port {port}' for port in ports)
+        if not payload_checks:
+            return port_expr
+        
+        min_udp_length = 8 + PhotonSignatures.PHOTON_HEADER_LENGTH
+        ipv4 = f'ip and ({port_expr}) and udp[4:2] >= {min_udp_length} and udp[10] != 1 and udp[11] != 0'
+        ipv6 = f'ip6 and ip6[6] == 17 and ({port_expr}) and ip6[44:2] >= {min_udp_length} and ip6[50] != 1 and ip6[51] != 0'
+        return f'({ipv4}) or ({ipv6})'
+
+    @staticmethod
+    def is_move_only(payload: bytes) -> bool:
+        """
+        仅遍历命令头判断数据包是否只包含 Move 事件（以及确认等无事件命令）
+        用于队列满时优先丢弃，分片及无法识别的命令一律视为非 Move
+        
+        Args:
+            payload: UDP 负载数据
+            
+        Returns:
+            如果数据包中只有 Move 事件返回 True
+        """
+        total = len(payload)
+        if total < PhotonSignatures.PHOTON_HEADER_LENGTH:
+            return False
+        
+        offset = PhotonSignatures.PHOTON_HEADER_LENGTH
+        for _ in range(payload[3]):
+            if offset + PhotonCommandType.COMMAND_HEADER_LENGTH > total:
+                return False
+            command_type = payload[offset]
+            length = int.from_bytes(payload[offset + 4:offset + 8], 'big')
+            if length < PhotonCommandType.COMMAND_HEADER_LENGTH:
+                return False
+            
+            if command_type == PhotonCommandType.SendReliable or command_type == PhotonCommandType.SendUnreliable:
+                body = offset + PhotonCommandType.COMMAND_HEADER_LENGTH
+                if command_type == PhotonCommandType.SendUnreliable:
+                    body += PhotonCommandType.UNRELIABLE_EXTRA_LENGTH
+                # 负载: 信号字节, 消息类型, 事件码
+                if body + 3 > total:
+                    return False
+                if payload[body + 1] != PhotonMessageType.Event or payload[body + 2] != PhotonDetector.MOVE_EVENT_CODE:
+                    return False
+            elif command_type != PhotonCommandType.Acknowledge:
+                return False
+            
+            offset += length
+        return True
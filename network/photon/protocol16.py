@@ -0,0 +1,288 @@
+"""
+Photon Protocol16 反序列化器
+基于 struct.unpack_from 直接在 memoryview 上按偏移读取，不构造中间流对象
+所有读取函数签名为 (buf, offset) -> (value, new_offset)
+"""
+import struct
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from network.photon.constants import Protocol16Type
+
+
+_unpack_short = struct.Struct('>h').unpack_from
+_unpack_int = struct.Struct('>i').unpack_from
+_unpack_long = struct.Struct('>q').unpack_from
+_unpack_float = struct.Struct('>f').unpack_from
+_unpack_double = struct.Struct('>d').unpack_from
+
+# 定长类型的值长度（字节），用于跳过不需要的参数
+_FIXED_SIZES: Dict[int, int] = {
+    Protocol16Type.Unknown: 0,
+    Protocol16Type.Null: 0,
+    Protocol16Type.Byte: 1,
+    Protocol16Type.Boolean: 1,
+    Protocol16Type.Short: 2,
+    Protocol16Type.Integer: 4,
+    Protocol16Type.Float: 4,
+    Protocol16Type.Long: 8,
+    Protocol16Type.Double: 8,
+}
+
+
+def _take(buf, offset: int, size: int) -> int:
+    """校验 buf 中 offset 处还有 size 字节，返回结束偏移"""
+    end = offset + size
+    if size < 0 or end > len(buf):
+        raise ValueError(f"Protocol16 数据越界: offset={offset} size={size} total={len(buf)}")
+    return end
+
+
+def _read_none(buf, offset: int) -> Tuple[None, int]:
+    return None, offset
+
+
+def _read_byte(buf, offset: int) -> Tuple[int, int]:
+    return buf[offset], offset + 1
+
+
+def _read_boolean(buf, offset: int) -> Tuple[bool, int]:
+    return buf[offset] != 0, offset + 1
+
+
+def _read_short(buf, offset: int) -> Tuple[int, int]:
+    return _unpack_short(buf, offset)[0], offset + 2
+
+
+def _read_integer(buf, offset: int) -> Tuple[int, int]:
+    return _unpack_int(buf, offset)[0], offset + 4
+
+
+def _read_long(buf, offset: int) -> Tuple[int, int]:
+    return _unpack_long(buf, offset)[0], offset + 8
+
+
+def _read_float(buf, offset: int) -> Tuple[float, int]:
+    return _unpack_float(buf, offset)[0], offset + 4
+
+
+def _read_double(buf, offset: int) -> Tuple[float, int]:
+    return _unpack_double(buf, offset)[0], offset + 8
+
+
+def _read_string(buf, offset: int) -> Tuple[str, int]:
+    size = _unpack_short(buf, offset)[0]
+    offset += 2
+    end = _take(buf, offset, size)
+    return str(buf[offset:end], 'utf-8'), end
+
+
+def _read_byte_array(buf, offset: int) -> Tuple[bytes, int]:
+    size = _unpack_int(buf, offset)[0]
+    offset += 4
+    end = _take(buf, offset, size)
+    return bytes(buf[offset:end]), end
+
+
+def _read_integer_array(buf, offset: int) -> Tuple[list, int]:
+    size = _unpack_int(buf, offset)[0]
+    offset += 4
+    end = _take(buf, offset, size * 4)
+    return list(struct.unpack_from(f'>{size}i', buf, offset)), end
+
+
+def _read_string_array(buf, offset: int) -> Tuple[list, int]:
+    size = _unpack_short(buf, offset)[0]
+    offset += 2
+    result = []
+    for _ in range(size):
+        value, offset = _read_string(buf, offset)
+        result.append(value)
+    return result, offset
+
+
+def _read_object_array(buf, offset: int) -> Tuple[list, int]:
+    size = _unpack_short(buf, offset)[0]
+    offset += 2
+    result = []
+    for _ in range(size):
+        value, offset = read_value(buf, offset + 1, buf[offset])
+        result.append(value)
+    return result, offset
+
+
+def _read_array(buf, offset: int) -> Tuple[list, int]:
+    size = _unpack_short(buf, offset)[0]
+    type_code = buf[offset + 2]
+    offset += 3
+    result = []
+    if type_code == Protocol16Type.Dictionary:
+        # 字典数组：键/值类型码只出现一次，每个元素只有长度与条目
+        key_type, value_type = buf[offset], buf[offset + 1]
+        offset += 2
+        for _ in range(size):
+            count = _unpack_short(buf, offset)[0]
+            value, offset = _read_dictionary_elements(buf, offset + 2, count, key_type, value_type)
+            result.append(value)
+        return result, offset
+
+    reader = _READERS.get(type_code)
+    if reader is None:
+        raise ValueError(f"未知的 Protocol16 类型码: {type_code}")
+    for _ in range(size):
+        value, offset = reader(buf, offset)
+        result.append(value)
+    return result, offset
+
+
+def _read_dictionary_elements(buf, offset: int, count: int, key_type: int, value_type: int) -> Tuple[dict, int]:
+    dynamic_key = key_type == Protocol16Type.Unknown or key_type == Protocol16Type.Null
+    dynamic_value = value_type == Protocol16Type.Unknown or value_type == Protocol16Type.Null
+    result = {}
+    for _ in range(count):
+        if dynamic_key:
+            key, offset = read_value(buf, offset + 1, buf[offset])
+        else:
+            key, offset = read_value(buf, offset, key_type)
+        if dynamic_value:
+            value, offset = read_value(buf, offset + 1, buf[offset])
+        else:
+            value, offset = read_value(buf, offset, value_type)
+        result[key] = value
+    return result, offset
+
+
+def _read_dictionary(buf, offset: int) -> Tuple[dict, int]:
+    key_type, value_type = buf[offset], buf[offset + 1]
+    count = _unpack_short(buf, offset + 2)[0]
+    return _read_dictionary_elements(buf, offset + 4, count, key_type, value_type)
+
+
+def _read_hashtable(buf, offset: int) -> Tuple[dict, int]:
+    count = _unpack_short(buf, offset)[0]
+    return _read_dictionary_elements(buf, offset + 2, count, Protocol16Type.Unknown, Protocol16Type.Unknown)
+
+
+def _read_event_data(buf, offset: int) -> Tuple[tuple, int]:
+    code = buf[offset]
+    parameters, offset = read_parameter_table(buf, offset + 1)
+    return (code, parameters), offset
+
+
+def _read_operation_request(buf, offset: int) -> Tuple[tuple, int]:
+    code = buf[offset]
+    parameters, offset = read_parameter_table(buf, offset + 1)
+    return (code, parameters), offset
+
+
+def _read_operation_response(buf, offset: int) -> Tuple[tuple, int]:
+    code = buf[offset]
+    return_code = _unpack_short(buf, offset + 1)[0]
+    debug_message, offset = read_value(buf, offset + 4, buf[offset + 3])
+    parameters, offset = read_parameter_table(buf, offset)
+    return (code, return_code, debug_message, parameters), offset
+
+
+_READERS: Dict[int, Callable[[Any, int], Tuple[Any, int]]] = {
+    Protocol16Type.Unknown: _read_none,
+    Protocol16Type.Null: _read_none,
+    Protocol16Type.Dictionary: _read_dictionary,
+    Protocol16Type.StringArray: _read_string_array,
+    Protocol16Type.Byte: _read_byte,
+    Protocol16Type.Double: _read_double,
+    Protocol16Type.EventData: _read_event_data,
+    Protocol16Type.Float: _read_float,
+    Protocol16Type.Hashtable: _read_hashtable,
+    Protocol16Type.Integer: _read_integer,
+    Protocol16Type.Short: _read_short,
+    Protocol16Type.Long: _read_long,
+    Protocol16Type.IntegerArray: _read_integer_array,
+    Protocol16Type.Boolean: _read_boolean,
+    Protocol16Type.OperationResponse: _read_operation_response,
+    Protocol16Type.OperationRequest: _read_operation_request,
+    Protocol16Type.String: _read_string,
+    Protocol16Type.ByteArray: _read_byte_array,
+    Protocol16Type.Array: _read_array,
+    Protocol16Type.ObjectArray: _read_object_array,
+}
+
+
+def read_value(buf, offset: int, type_code: int) -> Tuple[Any, int]:
+    """
+    按类型码读取一个值
+
+    字节数组返回 bytes；嵌套的 EventData / OperationRequest / OperationResponse
+    分别返回 (code, parameters) / (code, parameters) / (code, return_code, debug_message, parameters)
+
+    Args:
+        buf: 数据（bytes 或 memoryview）
+        offset: 值的起始偏移
+        type_code: Protocol16 类型码
+
+    Returns:
+        (值, 值之后的偏移)
+    """
+    reader = _READERS.get(type_code)
+    if reader is None:
+        raise ValueError(f"未知的 Protocol16 类型码: {type_code}")
+    return reader(buf, offset)
+
+
+def skip_value(buf, offset: int, type_code: int) -> int:
+    """
+    跳过一个值，常见类型只读取长度字段，不构造对象
+
+    Returns:
+        值之后的偏移
+    """
+    size = _FIXED_SIZES.get(type_code)
+    if size is not None:
+        return offset + size
+    if type_code == Protocol16Type.String:
+        return _take(buf, offset + 2, _unpack_short(buf, offset)[0])
+    if type_code == Protocol16Type.ByteArray:
+        return _take(buf, offset + 4, _unpack_int(buf, offset)[0])
+    if type_code == Protocol16Type.IntegerArray:
+        return _take(buf, offset + 4, _unpack_int(buf, offset)[0] * 4)
+    if type_code == Protocol16Type.Array:
+        size = _FIXED_SIZES.get(buf[offset + 2])
+        if size is not None:
+            return _take(buf, offset + 3, _unpack_short(buf, offset)[0] * size)
+    return read_value(buf, offset, type_code)[1]
+
+
+def read_parameter_table(buf, offset: int) -> Tuple[Dict[int, Any], int]:
+    """
+    读取参数表：数量(short) + 若干 [键(byte) 类型码(byte) 值]
+
+    Returns:
+        (参数字典, 参数表之后的偏移)
+    """
+    count = _unpack_short(buf, offset)[0]
+    offset += 2
+    parameters = {}
+    for _ in range(count):
+        key = buf[offset]
+        parameters[key], offset = read_value(buf, offset + 2, buf[offset + 1])
+    return parameters, offset
+
+
+def find_parameter(buf, offset: int, key: int) -> Optional[Any]:
+    """
+    在参数表中查找单个参数，其余参数只跳过不反序列化
+
+    Args:
+        buf: 数据
+        offset: 参数表起始偏移
+        key: 参数键
+
+    Returns:
+        参数值，不存在时返回 None
+    """
+    count = _unpack_short(buf, offset)[0]
+    offset += 2
+    for _ in range(count):
+        type_code = buf[offset + 1]
+        if buf[offset] == key:
+            return read_value(buf, offset + 2, type_code)[0]
+        offset = skip_value(buf, offset + 2, type_code)
+    return None
@@ -0,0 +1,112 @@
+import asyncio
+import socket
+from typing import Optional, List
+from base.base2 import PacketProvider, RawPacketSignal
+
+
+class _ForwarderProtocol(asyncio.DatagramProtocol):
+    """把收到的数据报交给 AsyncPacketProvider"""
+
+    def __init__(self, provider: "AsyncPacketProvider"):
+        self._provider = provider
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        # 直接发射数据包，Go Sniffer 已经过滤了 Photon 协议
+        self._provider.emit(data)
+
+    def error_received(self, exc: Exception) -> None:
+        print(f"[AsyncPacketProvider] 接收错误: {exc}")
+
+
+class AsyncPacketProvider(PacketProvider):
+    """
+    基于 asyncio 的 UDP 数据包提供者
+    
+    接收 Go Sniffer 转发的数据包，不创建线程：数据报在事件循环线程中通过 DatagramProtocol 回调发射，
+    须在运行中的事件循环内调用 start（配合 core.async_engine.AsyncEngine 使用）
+    """
+
+    def __init__(
+        self,
+        signal: RawPacketSignal,
+        target_ports: Optional[List[int]] = None,
+        listening_port: int = 44444,
+        host: str = '0.0.0.0',
+        recv_buffer_size: int = 8 * 1024 * 1024,
+    ):
+        """
+        Args:
+            signal: 用于传输数据包内容的信号
+            target_ports: 仅作为参考或逻辑兼容
+            listening_port: 监听端口
+            host: 监听地址
+            recv_buffer_size: 内核接收缓冲大小 (SO_RCVBUF)
+        """
+        # 数据报逐个在事件循环中处理，不使用聚合线程
+        super().__init__(signal)
+        self.listening_port = listening_port
+        self.recv_buffer_size = recv_buffer_size
+        self._host = host
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._opening: Optional[asyncio.Task] = None
+        self._sock: Optional[socket.socket] = None # 已绑定、尚未交给传输的 Socket
+
+    def start(self) -> bool:
+        """
+        在当前线程运行中的事件循环上开始监听，Socket 在返回前已绑定
+
+        Raises:
+            RuntimeError: 当前线程没有运行中的事件循环
+        """
+        if self.is_running():
+            return True
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # 扩大内核接收缓冲，吸收 Go Sniffer 的突发转发
+            self._set_recv_buffer(sock)
+            sock.bind((self._host, self.listening_port))
+            sock.setblocking(False)
+        except OSError as e:
+            sock.close()
+            print(f"[AsyncPacketProvider] 启动失败: {e}")
+            return False
+        print(f"[AsyncPacketProvider] 正在监听 {self._host}:{self.listening_port}")
+        self._sock = sock
+        self._opening = loop.create_task(self._open(loop, sock))
+        return True
+
+    async def _open(self, loop: asyncio.AbstractEventLoop, sock: socket.socket) -> None:
+        try:
+            transport, _ = await loop.create_datagram_endpoint(lambda: _ForwarderProtocol(self), sock=sock)
+        except BaseException:
+            # 被 stop 取消或创建失败时 Socket 仍归本对象所有
+            sock.close()
+            raise
+        self._sock = None
+        self._transport = transport
+
+    def stop(self) -> bool:
+        if self._opening is not None and not self._opening.done():
+            self._opening.cancel()
+        self._opening = None
+        # _open 尚未执行时传输还不存在，直接关闭 Socket 释放端口
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        return True
+
+    def is_running(self) -> bool:
+        return self._opening is not None or self._transport is not None
+
+    def _set_recv_buffer(self, sock: socket.socket):
+        """设置 SO_RCVBUF 并打印实际生效的大小（可能受系统上限约束）"""
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer_size)
+            actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            print(f"[AsyncPacketProvider] 接收缓冲: 请求 {self.recv_buffer_size} 字节, 实际 {actual} 字节")
+        except OSError as e:
+            print(f"[AsyncPacketProvider] 设置接收缓冲失败: {e}")
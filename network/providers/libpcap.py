@@ -5,16 +5,17 @@
 from this import d
 import pcapy
 import time
+import queue
+import select
 import threading
-from typing import Optional, Dict, List
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Tuple
 
 from pydantic.type_adapter import P
 from base.base2 import PacketProvider, RawPacketSignal
-from network.parsers.ethernet import EthernetParser, EtherType
-from network.parsers.ip import IPParser, IPProtocol
-from network.parsers.udp import UDPParser
+from network.parsers.fused import FusedParser
 from network.photon.detector import PhotonDetector
-from network.providers.device_type import get_network_interface_types
+from network.providers.device_type import get_network_interface_types, is_windows
 
 
 class DeviceLockManager:
@@ -67,21 +68,97 @@ class DeviceLockManager:
         with self._lock:
             return self._active_device is None or self._active_device == device_name
 
+    def is_locked_to(self, device_name: str) -> bool:
+        """检查是否已锁定到该设备（未锁定时所有设备都不是）"""
+        with self._lock:
+            return self._active_device == device_name
+
+
+class CaptureMode:
+    """抓包循环模式"""
+    # 单线程轮询所有设备，无数据时休眠 25ms（旧模式）
+    POLL = "poll"
+    # 阻塞等待所有设备：POSIX 下 select 所有 pcap fd，
+    # Windows 下每个设备一个阻塞读线程，数据包经同一队列立即分发
+    BLOCKING = "blocking"
+
+
+@dataclass
+class DeviceCaptureStats:
+    """单设备唤醒与延迟统计"""
+    wakeups: int = 0 # 读调用返回次数
+    idle_wakeups: int = 0 # 返回但无数据的次数
+    packets: int = 0 # 分发的数据包数
+    total_latency_us: float = 0.0 # 内核时间戳到分发的累计延迟
+    max_latency_us: float = 0.0
+
+    def record_latency(self, ts: Tuple[int, int]):
+        """
+        记录一个数据包从内核时间戳到分发的延迟
+        
+        Args:
+            ts: pcap 头部时间戳 (秒, 微秒)
+        """
+        latency_us = max(0.0, (time.time() - ts[0]) * 1e6 - ts[1])
+        self.packets += 1
+        self.total_latency_us += latency_us
+        if latency_us > self.max_latency_us:
+            self.max_latency_us = latency_us
+
+    def to_dict(self) -> dict:
+        """转换为字典用于展示"""
+        return {
+            'wakeups': self.wakeups,
+            'idle_wakeups': self.idle_wakeups,
+            'packets': self.packets,
+            'avg_latency_us': self.total_latency_us / self.packets if self.packets else 0.0,
+            'max_latency_us': self.max_latency_us,
+        }
+
 
 class LibpcapProvider(PacketProvider):
     """
     基于 Npcap/Libpcap 的数据包提供者
     实现多设备管理、智能锁定、分层解析等企业级特性
     """
+    # 读线程模式下未锁定、被排除或空闲设备的读超时：每个空闲设备每秒最多唤醒 1000 / 100 = 10 次，
+    # 空闲后首个数据包最多延迟 100 ms（与 POLL 模式的读超时相同）
+    IDLE_READ_TIMEOUT_MS = 100
+    # 锁定设备连续无数据超过该时长（秒）后改用 IDLE_READ_TIMEOUT_MS
+    ACTIVE_IDLE_SECONDS = 1.0
     
-    def __init__(self, signal: RawPacketSignal, target_ports: Optional[List[int]] = None):
-        super().__init__(signal)
+    def __init__(
+        self,
+        signal: RawPacketSignal,
+        target_ports: Optional[List[int]] = None,
+        capture_mode: str = CaptureMode.BLOCKING,
+        read_timeout_ms: int = 1,
+        batch_size: int = 1,
+        batch_interval: float = 0.002,
+    ):
+        """
+        Args:
+            signal: 用于传输数据包内容的信号
+            target_ports: 目标端口，用于生成 BPF 过滤器
+            capture_mode: 抓包循环模式，见 CaptureMode
+            read_timeout_ms: 阻塞模式下 pcap 读超时，即内核缓冲数据包的最长等待时间，决定了投递延迟上限
+            batch_size: 每批最大数据包数，<= 1 时逐包发射
+            batch_interval: 批内首个数据包的最长等待时间（秒）
+        """
+        super().__init__(signal, batch_size, batch_interval)
 
         self.target_ports = target_ports
+        self.capture_mode = capture_mode
+        self.read_timeout_ms = read_timeout_ms
         self._captures: Dict[str, pcapy.pcapy] = {}
         self._device_type: Dict[str, any] = {}
+        self._device_stats: Dict[str, DeviceCaptureStats] = {}
+        self._kernel_filtered: Dict[str, bool] = {} # 设备是否已在内核完成 Photon 负载校验
+        self._read_timeouts: Dict[str, int] = {} # 设备句柄打开时的读超时
         self._stop_event = threading.Event()
         self._worker_thread: Optional[threading.Thread] = None
+        self._reader_threads: List[threading.Thread] = []
+        self._packet_queue: "queue.SimpleQueue" = queue.SimpleQueue()
         self._lock_manager = DeviceLockManager()
     
     def start(self) -> bool:
@@ -105,17 +182,23 @@ class LibpcapProvider(PacketProvider):
             for i, device in enumerate(devices):
                 try:
                     # 打开设备
-                    cap = pcapy.open_live(device, 65536, False, 100)
+                    if self.capture_mode != CaptureMode.BLOCKING:
+                        timeout_ms = 100
+                    elif is_windows():
+                        # Npcap 使用读线程，锁定设备有数据时才切换为 read_timeout_ms，见 _reader
+                        timeout_ms = self.IDLE_READ_TIMEOUT_MS
+                    else:
+                        timeout_ms = self.read_timeout_ms
+                    cap = pcapy.open_live(device, 65536, False, timeout_ms)
                     
                     # 设置 BPF 过滤器
                     if self.target_ports:
-                        filter_str = f'udp port {self.target_ports[0]}'
-                        for port in self.target_ports[1:]:
-                            filter_str += f' or udp port {port}'
-                        cap.setfilter(filter_str)
+                        filter_str = self._apply_filter(device, cap)
                         print(f"[LibpcapProvider][{i}] {device}: 过滤器 = {filter_str}")
                     
                     self._captures[device] = cap
+                    self._read_timeouts[device] = timeout_ms
+                    self._device_stats[device] = DeviceCaptureStats()
                     opened_count += 1
                     print(f"[LibpcapProvider][{i}] 打开设备: {device} ({self._device_type[device]})")
                     
@@ -128,10 +211,21 @@ class LibpcapProvider(PacketProvider):
             
             # 启动工作线程
             self._stop_event.clear()
-            self._worker_thread = threading.Thread(target=self._worker, daemon=True)
+            self._start_batching()
+            fds = self._selectable_fds() if self.capture_mode == CaptureMode.BLOCKING else {}
+            if fds:
+                self._worker_thread = threading.Thread(target=self._select_worker, args=(fds,), daemon=True)
+            elif self.capture_mode == CaptureMode.BLOCKING:
+                for device, cap in list(self._captures.items()):
+                    reader = threading.Thread(target=self._reader, args=(device, cap), daemon=True)
+                    reader.start()
+                    self._reader_threads.append(reader)
+                self._worker_thread = threading.Thread(target=self._queue_worker, daemon=True)
+            else:
+                self._worker_thread = threading.Thread(target=self._worker, daemon=True)
             self._worker_thread.start()
             
-            print(f"[LibpcapProvider] 数据包捕获已启动，打开 {opened_count} 个设备")
+            print(f"[LibpcapProvider] 数据包捕获已启动，打开 {opened_count} 个设备 (模式: {self.capture_mode})")
             return True
             
         except Exception as e:
@@ -145,8 +239,13 @@ class LibpcapProvider(PacketProvider):
         
         try:
             self._stop_event.set()
+            # 读线程在读超时内返回（最长 IDLE_READ_TIMEOUT_MS），须在关闭设备前退出
+            for reader in self._reader_threads:
+                reader.join(timeout=2.0)
+            self._reader_threads.clear()
             if self._worker_thread:
                 self._worker_thread.join(timeout=2.0)
+            self._stop_batching()
             
             # 关闭所有设备
             for device, cap in self._captures.items():
@@ -158,6 +257,8 @@ class LibpcapProvider(PacketProvider):
             self._captures.clear()
             self._worker_thread = None
             
+            for device, stats in self._device_stats.items():
+                print(f"[LibpcapProvider] {device}: {stats.to_dict()}")
             print("[LibpcapProvider] 数据包捕获已停止")
             return True
         except Exception as e:
@@ -167,6 +268,65 @@ class LibpcapProvider(PacketProvider):
     def is_running(self) -> bool:
         """检查是否正在运行"""
         return self._worker_thread is not None and self._worker_thread.is_alive()
+
+    def get_device_stats(self) -> Dict[str, dict]:
+        """
+        获取各设备的唤醒与延迟统计
+        
+        Returns:
+            设备名称 -> 统计字典（wakeups, idle_wakeups, packets, avg_latency_us, max_latency_us）
+        """
+        return {device: stats.to_dict() for device, stats in self._device_stats.items()}
+
+    def _apply_filter(self, device: str, cap) -> str:
+        """
+        为设备设置 BPF 过滤器
+        
+        以太网链路层使用附带 Photon 负载校验的过滤器，非 Photon 数据包不会进入用户态；
+        UU 路由等链路层偏移不确定的设备只按端口过滤，并保留 Python 中的 Photon 检测
+        
+        Returns:
+            实际生效的过滤表达式
+        """
+        device_info = self._device_type.get(device)
+        uu_route = device_info is not None and device_info.if_type == 53
+        if not uu_route and cap.datalink() == pcapy.DLT_EN10MB:
+            filter_str = PhotonDetector.build_bpf_filter(self.target_ports)
+            try:
+                cap.setfilter(filter_str)
+                self._kernel_filtered[device] = True
+                return filter_str
+            except pcapy.PcapError as e:
+                print(f"[LibpcapProvider] {device}: 负载过滤器设置失败，回退端口过滤: {e}")
+        
+        filter_str = PhotonDetector.build_bpf_filter(self.target_ports, payload_checks=False)
+        cap.setfilter(filter_str)
+        self._kernel_filtered[device] = False
+        return filter_str
+
+    def _selectable_fds(self) -> Dict[int, str]:
+        """
+        获取可 select 的 pcap 文件描述符并切换为非阻塞读
+
+        Npcap 不提供可 select 的 fd，此时返回空字典，改用读线程
+
+        Returns:
+            fd -> 设备名称
+        """
+        if is_windows():
+            return {}
+        fds = {}
+        try:
+            for device, cap in self._captures.items():
+                fd = cap.getfd()
+                if fd < 0:
+                    return {}
+                fds[fd] = device
+            for cap in self._captures.values():
+                cap.setnonblock(1)
+        except (AttributeError, pcapy.PcapError):
+            return {}
+        return fds
     
     def _worker(self):
         """工作线程：轮询所有设备并分发数据"""
@@ -180,11 +340,16 @@ class LibpcapProvider(PacketProvider):
                 for device, cap in list(self._captures.items()):
                     if not self._lock_manager.is_active_device(device):
                         continue
+                    stats = self._device_stats[device]
                     try:
                         header, raw_data = cap.next()
+                        stats.wakeups += 1
                         if header:
+                            stats.record_latency(header.getts())
                             self._dispatch(device, raw_data)
                             dispatched += 1
+                        else:
+                            stats.idle_wakeups += 1
                     except pcapy.PcapError:
                         continue
                 
@@ -200,59 +365,163 @@ class LibpcapProvider(PacketProvider):
         
         print("[LibpcapProvider] 工作线程已退出")
 
-    def _handle_uu_route(self, raw_data: bytes):
+    def _select_worker(self, fds: Dict[int, str]):
         """
-        处理 UU 路由模式数据包
+        工作线程：select 等待所有设备，就绪后一次性取出并分发该设备缓冲中的数据包
+        
+        Args:
+            fds: _selectable_fds 的结果，fd -> 设备名称
         """
-        if len(raw_data) < 1:
-            return None
+        print("[LibpcapProvider] 工作线程已启动 (select 模式)")
+        handlers = {fd: self._make_packet_handler(device) for fd, device in fds.items()}
         
-        version = (raw_data[0] >> 4) & 0x0F
-        if version == 4:
-            return IPParser.parse_ipv4(raw_data)
-        elif version == 6:
-            return IPParser.parse_ipv6(raw_data)
-        return None        
-    
+        while not self._stop_event.is_set():
+            try:
+                ready, _, _ = select.select(list(fds), [], [], 0.5)
+            except (OSError, ValueError):
+                break
+            for fd in ready:
+                device = fds[fd]
+                stats = self._device_stats[device]
+                stats.wakeups += 1
+                try:
+                    if self._captures[device].dispatch(-1, handlers[fd]) == 0:
+                        stats.idle_wakeups += 1
+                except pcapy.PcapError:
+                    continue
+        
+        print("[LibpcapProvider] 工作线程已退出")
+
+    def _make_packet_handler(self, device: str):
+        """为设备生成 pcap dispatch 回调"""
+        stats = self._device_stats[device]
+        
+        def on_packet(header, raw_data):
+            if not self._lock_manager.is_active_device(device):
+                return
+            stats.record_latency(header.getts())
+            try:
+                self._dispatch(device, raw_data)
+            except ValueError:
+                pass
+        return on_packet
+
+    def _reader(self, device: str, cap):
+        """
+        设备读线程：阻塞在 pcap 读调用上，收到数据包立即放入分发队列
+        
+        pcapy 不提供 Npcap 的事件句柄（pcap_getevent），无法无超时地等待，因此按设备状态切换读超时：
+        未锁定、被其他设备排除或连续 ACTIVE_IDLE_SECONDS 无数据的设备使用 IDLE_READ_TIMEOUT_MS，
+        只有收到数据的锁定设备使用 read_timeout_ms
+        
+        Args:
+            device: 设备名称
+            cap: pcap 句柄
+        """
+        stats = self._device_stats[device]
+        fast = self._read_timeouts.get(device) != self.IDLE_READ_TIMEOUT_MS
+        last_packet = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                header, raw_data = cap.next()
+            except pcapy.PcapError:
+                continue
+            stats.wakeups += 1
+            if not header:
+                stats.idle_wakeups += 1
+                if fast and (
+                    time.monotonic() - last_packet > self.ACTIVE_IDLE_SECONDS
+                    or not self._lock_manager.is_locked_to(device)
+                ):
+                    cap = self._reopen(device, cap, self.IDLE_READ_TIMEOUT_MS)
+                    fast = False
+                continue
+            # 被其他设备锁定时仍需读出数据，避免内核缓冲堆积
+            if not self._lock_manager.is_active_device(device):
+                if fast:
+                    cap = self._reopen(device, cap, self.IDLE_READ_TIMEOUT_MS)
+                    fast = False
+                continue
+            last_packet = time.monotonic()
+            self._packet_queue.put((device, header.getts(), raw_data))
+            if not fast and self._lock_manager.is_locked_to(device):
+                cap = self._reopen(device, cap, self.read_timeout_ms)
+                fast = True
+
+    def _reopen(self, device: str, cap, timeout_ms: int):
+        """
+        以新的读超时重新打开设备（pcap 不支持修改已打开设备的读超时）
+        先打开新句柄再以非阻塞方式读空旧句柄，切换期间的数据包不丢失（两个句柄同时打开的极短时间内到达的可能重复）
+        
+        Args:
+            device: 设备名称
+            cap: 当前 pcap 句柄
+            timeout_ms: 新的读超时
+        
+        Returns:
+            新的 pcap 句柄，打开失败时返回原句柄
+        """
+        try:
+            new_cap = pcapy.open_live(device, 65536, False, timeout_ms)
+            if self.target_ports:
+                self._apply_filter(device, new_cap)
+        except Exception as e:
+            print(f"[LibpcapProvider] {device}: 重新打开设备失败: {e}")
+            return cap
+        try:
+            cap.setnonblock(1)
+            if self._lock_manager.is_active_device(device):
+                while True:
+                    header, raw_data = cap.next()
+                    if not header:
+                        break
+                    self._packet_queue.put((device, header.getts(), raw_data))
+        except pcapy.PcapError:
+            pass
+        self._captures[device] = new_cap
+        self._read_timeouts[device] = timeout_ms
+        try:
+            cap.close()
+        except:
+            pass
+        return new_cap
+
+    def _queue_worker(self):
+        """工作线程：从所有设备的读线程汇总的队列中取包并分发"""
+        print("[LibpcapProvider] 工作线程已启动 (阻塞模式)")
+        
+        while not self._stop_event.is_set():
+            try:
+                device, ts, raw_data = self._packet_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._device_stats[device].record_latency(ts)
+            try:
+                self._dispatch(device, raw_data)
+            except ValueError:
+                pass
+        
+        print("[LibpcapProvider] 工作线程已退出")
+
     def _dispatch(self, device: str, raw_data: bytes):
         """
-        分发数据包：分层解析并识别 Photon
+        分发数据包：融合解析 L2→L4 并识别 Photon
         
         Args:
             device: 设备名称
             raw_data: 原始数据包
         """
-        # L2: 解析以太网帧
-
         device_info = self._device_type[device]
-        ip_packet = None
-        if device_info.if_type == 53: # UU 路由模式
-            ip_packet = self._handle_uu_route(raw_data)
+        if device_info.if_type == 53: # UU 路由模式，数据包直接从 IP 头开始
+            udp_packet = FusedParser.parse_ip(raw_data)
         else:
-            eth_frame = EthernetParser.parse(raw_data)
-            if not eth_frame:
-                return        
-            # 根据以太网类型选择 L3 解析
-            if eth_frame.ether_type == EtherType.IPv4:
-                ip_packet = IPParser.parse_ipv4(eth_frame.payload)
-            elif eth_frame.ether_type == EtherType.IPv6:
-                ip_packet = IPParser.parse_ipv6(eth_frame.payload)
-            else:
-                return
+            udp_packet = FusedParser.parse_ethernet(raw_data)
 
-        if not ip_packet:
-            return
-        
-        # L4: 仅处理 UDP
-        protocol = ip_packet.protocol if hasattr(ip_packet, 'protocol') else ip_packet.next_header
-        if protocol != IPProtocol.UDP:
-            return
-        
-        udp_packet = UDPParser.parse(ip_packet.payload)
         if not udp_packet:
             return
 
-        if not PhotonDetector.is_photon_packet(
+        # 内核过滤器已校验过 Photon 负载的设备无需重复检测
+        if not self._kernel_filtered.get(device) and not PhotonDetector.is_photon_packet(
             udp_packet.src_port,
             udp_packet.dst_port,
             udp_packet.payload,
@@ -266,5 +535,5 @@ class LibpcapProvider(PacketProvider):
         if not self._lock_manager.is_active_device(device):
             return
         
-        # 发布事件
+        # 发布事件（负载为原始帧上的 memoryview，不做复制）
         self.emit(udp_packet.payload)
@@ -0,0 +1,134 @@
+import time
+from threading import Thread, Event
+from typing import Optional, List
+from base.base2 import PacketProvider, RawPacketSignal
+from network.recording import read_recording
+
+
+class ReplayProvider(PacketProvider):
+    """
+    录制文件回放数据包提供者
+
+    按录制时的时间间隔把 PacketRecorder 写入的数据包重新发射到 RawPacketSignal，
+    speed 为 1 时按原速，N 时 N 倍速，<= 0 时不等待、按 batch_size 固定分批尽快发射（分批结果可复现）
+    """
+
+    def __init__(
+        self,
+        signal: RawPacketSignal,
+        path: str,
+        target_ports: Optional[List[int]] = None,
+        speed: float = 1.0,
+        max_gap: float = 5.0,
+        batch_size: int = 1,
+        batch_interval: float = 0.002,
+    ):
+        """
+        Args:
+            signal: 用于传输数据包内容的信号
+            path: 录制文件路径
+            target_ports: 仅作为参考或逻辑兼容
+            speed: 回放倍速，<= 0 表示不限速
+            max_gap: 相邻数据包的最长等待时间（录制时间，秒），跳过多次录制追加之间的空档
+            batch_size: 每批最大数据包数，<= 1 时逐包发射
+            batch_interval: 批内首个数据包的最长等待时间（秒）
+        """
+        super().__init__(signal, batch_size if speed > 0 else 1, batch_interval)
+        self.path = path
+        self.speed = speed
+        self.max_gap = max_gap
+        self.batch_size = max(1, batch_size)
+        self.packets = 0
+        self.finished = Event() # 全部数据包已发射
+        self._is_running = False
+        self._thread: Optional[Thread] = None
+        self._stop_event = Event()
+
+    def start(self) -> bool:
+        if self._is_running:
+            return True
+        try:
+            # 提前读取文件头，格式错误时启动失败
+            next(read_recording(self.path), None)
+        except (OSError, ValueError) as e:
+            print(f"[ReplayProvider] 启动失败: {e}")
+            return False
+        print(f"[ReplayProvider] 开始回放 {self.path} (速度: {self.speed if self.speed > 0 else '不限'})")
+        self._stop_event.clear()
+        self.finished.clear()
+        self.packets = 0
+        self._is_running = True
+        self._start_batching()
+        self._thread = Thread(target=self._worker if self.speed > 0 else self._fast_worker, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> bool:
+        self._is_running = False
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self._stop_batching()
+        return True
+
+    def is_running(self) -> bool:
+        return self._is_running
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待回放结束
+
+        Returns:
+            全部数据包已发射返回 True，超时返回 False
+        """
+        return self.finished.wait(timeout)
+
+    def _worker(self):
+        """工作线程：按录制时间间隔 / speed 发射，按累计时间计算每包的发射时刻，不累积误差"""
+        print("[ReplayProvider] 工作线程已启动")
+        start = time.perf_counter()
+        offset = 0.0
+        previous = None
+        for timestamp_ns, packet in read_recording(self.path):
+            if previous is not None:
+                # 时钟回拨时不等待
+                offset += min(max(timestamp_ns - previous, 0) / 1e9, self.max_gap)
+            previous = timestamp_ns
+            delay = start + offset / self.speed - time.perf_counter()
+            if delay > 0 and self._stop_event.wait(delay):
+                break
+            if self._stop_event.is_set():
+                break
+            self.emit(packet)
+            self.packets += 1
+        self._finish()
+
+    def _fast_worker(self):
+        """工作线程（不限速）：每 batch_size 个数据包整批发射"""
+        print("[ReplayProvider] 工作线程已启动 (不限速)")
+        batch = []
+        for _, packet in read_recording(self.path):
+            if self._stop_event.is_set():
+                batch = []
+                break
+            batch.append(packet)
+            if len(batch) >= self.batch_size:
+                self._emit_batch(batch)
+                batch = []
+        if batch:
+            self._emit_batch(batch)
+        self._finish()
+
+    def _emit_batch(self, batch: list) -> None:
+        if len(batch) == 1:
+            self.emit(batch[0])
+        else:
+            self.emit_many(batch)
+        self.packets += len(batch)
+
+    def _finish(self) -> None:
+        if self._batcher:
+            self._batcher.flush()
+        print(f"[ReplayProvider] 回放结束，共 {self.packets} 个数据包")
+        self.finished.set()
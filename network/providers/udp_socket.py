@@ -1,8 +1,12 @@
+import select
 import socket
 from typing import Optional, List
 from threading import Thread, Event
 from base.base2 import PacketProvider, RawPacketSignal
 
+# UDP 数据报最大长度，接收缓冲剩余空间小于该值时换用新的缓冲区
+MAX_DATAGRAM_SIZE = 65536
+
 class UdpSocketProvider(PacketProvider):
     """
     UDP Socket 数据包提供者
@@ -10,10 +14,39 @@ class UdpSocketProvider(PacketProvider):
     通过标准 Socket 监听本地端口，接收来自 Go Sniffer 转发的数据包
     """
     
-    def __init__(self, signal: RawPacketSignal, target_ports: Optional[List[int]] = None, listening_port: int = 44444, host: str = '0.0.0.0'):
-        super().__init__(signal)
+    def __init__(
+        self,
+        signal: RawPacketSignal,
+        target_ports: Optional[List[int]] = None,
+        listening_port: int = 44444,
+        host: str = '0.0.0.0',
+        batch_size: int = 1,
+        batch_interval: float = 0.002,
+        bulk_receive: bool = True,
+        recv_buffer_size: int = 8 * 1024 * 1024,
+        arena_size: int = 1024 * 1024,
+        max_drain: int = 256,
+    ):
+        """
+        Args:
+            signal: 用于传输数据包内容的信号
+            target_ports: 仅作为参考或逻辑兼容
+            listening_port: 监听端口
+            host: 监听地址
+            batch_size: 每批最大数据包数，<= 1 时逐包发射
+            batch_interval: 批内首个数据包的最长等待时间（秒）
+            bulk_receive: 批量接收模式，一次唤醒读空 Socket 并整批发射
+            recv_buffer_size: 内核接收缓冲大小 (SO_RCVBUF)
+            arena_size: 批量模式下预分配接收缓冲区的大小
+            max_drain: 批量模式下一次唤醒最多读取的数据报数
+        """
+        super().__init__(signal, batch_size, batch_interval)
         # target_ports 在这里不用于监听，仅作为参考或逻辑兼容
         self.listening_port = listening_port
+        self.bulk_receive = bulk_receive
+        self.recv_buffer_size = recv_buffer_size
+        self.arena_size = max(arena_size, MAX_DATAGRAM_SIZE)
+        self.max_drain = max_drain
         self._is_running = False
         self._thread: Optional[Thread] = None
         self._stop_event = Event()
@@ -29,14 +62,20 @@ class UdpSocketProvider(PacketProvider):
             
             # 创建单一接收 Socket
             sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # 扩大内核接收缓冲，吸收 Go Sniffer 的突发转发
+            self._set_recv_buffer(sock)
             # 绑定到本地环回地址，接收 Go Sniffer 转发的数据
             sock.bind((self._host, self.listening_port))
-            sock.settimeout(1.0) # 设置超时，以便线程可以响应停止信号
+            if self.bulk_receive:
+                sock.setblocking(False) # 由 select 等待，读空 Socket 时不阻塞
+            else:
+                sock.settimeout(1.0) # 设置超时，以便线程可以响应停止信号
             self._socket = sock
             print(f"[UdpSocketProvider] 正在监听 {self._host}:{self.listening_port}")
             
             self._is_running = True
-            self._thread = Thread(target=self._worker, daemon=True)
+            self._start_batching()
+            self._thread = Thread(target=self._bulk_worker if self.bulk_receive else self._worker, daemon=True)
             self._thread.start()
             return True
             
@@ -52,6 +91,7 @@ class UdpSocketProvider(PacketProvider):
         if self._thread:
             self._thread.join(timeout=2.0)
             self._thread = None
+        self._stop_batching()
             
         if self._socket:
             try:
@@ -64,6 +104,15 @@ class UdpSocketProvider(PacketProvider):
         
     def is_running(self) -> bool:
         return self._is_running
+
+    def _set_recv_buffer(self, sock: socket.socket):
+        """设置 SO_RCVBUF 并打印实际生效的大小（可能受系统上限约束）"""
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer_size)
+            actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            print(f"[UdpSocketProvider] 接收缓冲: 请求 {self.recv_buffer_size} 字节, 实际 {actual} 字节")
+        except OSError as e:
+            print(f"[UdpSocketProvider] 设置接收缓冲失败: {e}")
         
     def _worker(self):
         """工作线程：轮询 Socket 接收数据"""
@@ -84,3 +133,49 @@ class UdpSocketProvider(PacketProvider):
                     print(f"[UdpSocketProvider] 接收错误: {e}")
                         
         print("[UdpSocketProvider] 工作线程已停止")
+
+
+    def _bulk_worker(self):
+        """
+        工作线程（批量模式）：select 等待可读后读空 Socket，
+        数据报直接 recv_into 预分配缓冲区，以 memoryview 整批发射
+        
+        缓冲区写满后换用新的缓冲区而不复用，已发射的 memoryview 在下游处理期间保持有效
+        """
+        print("[UdpSocketProvider] 工作线程已启动 (批量模式)")
+        
+        arena = memoryview(bytearray(self.arena_size))
+        offset = 0
+        while not self._stop_event.is_set():
+            sock = self._socket
+            if not sock:
+                break
+            try:
+                readable, _, _ = select.select([sock], [], [], 0.5)
+            except (OSError, ValueError):
+                break
+            if not readable:
+                continue
+            
+            packets = []
+            while len(packets) < self.max_drain:
+                if self.arena_size - offset < MAX_DATAGRAM_SIZE:
+                    arena = memoryview(bytearray(self.arena_size))
+                    offset = 0
+                try:
+                    n = sock.recv_into(arena[offset:offset + MAX_DATAGRAM_SIZE])
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError as e:
+                    if self._is_running:
+                        print(f"[UdpSocketProvider] 接收错误: {e}")
+                    break
+                if n:
+                    # 直接发射数据包，Go Sniffer 已经过滤了 Photon 协议
+                    packets.append(arena[offset:offset + n])
+                    offset += n
+            
+            if packets:
+                self.emit_many(packets)
+        
+        print("[UdpSocketProvider] 工作线程已停止")
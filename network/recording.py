@@ -0,0 +1,195 @@
+"""
+数据包录制文件
+只追加写入的原始 Photon 负载与时间戳，供 ReplayProvider 回放、分析脚本与回归测试读取
+
+文件布局:
+    魔数(4) 格式版本(u16) 保留(u16)
+    记录 * N: 时间戳(i64, time.time_ns 纳秒) 长度(u32) 负载
+
+用法:
+    python -m network.recording <文件>    打印录制文件概况
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+from base.base2 import RawPacketSignal
+
+MAGIC = b"APRC"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHH")
+_RECORD = struct.Struct("<qI")
+
+
+class PacketRecorder(object):
+    """
+    把 RawPacketSignal 上的数据包追加写入录制文件
+    槽函数在抓包线程中执行，写入带缓冲，不做格式转换
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        """
+        Args:
+            path: 录制文件路径，已存在时在末尾追加
+            buffer_size: 写缓冲大小
+
+        Raises:
+            ValueError: 已存在的文件魔数或格式版本不匹配
+
+        已存在的文件末尾有不完整的记录（如上次录制时进程被终止）时，先截断到最后一条完整记录再追加
+        """
+        self.path = path
+        self.packets = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._signal: Optional[RawPacketSignal] = None
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            _truncate_incomplete(path)
+        self._file = open(path, "ab", buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+
+    def record(self, packet: bytes, timestamp_ns: Optional[int] = None) -> None:
+        """
+        写入一个数据包
+
+        Args:
+            packet: 数据包内容（bytes / memoryview）
+            timestamp_ns: 时间戳，None 表示当前时间
+        """
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_RECORD.pack(timestamp_ns, len(packet)))
+            self._file.write(packet)
+            self.packets += 1
+            self.bytes += len(packet)
+
+    def record_many(self, packets: list) -> None:
+        """
+        写入一批数据包，使用同一时间戳
+        批内数据包没有各自的到达时间，按原速回放时批内间隔（最长为提供者的 batch_interval）不会还原
+        """
+        timestamp_ns = time.time_ns()
+        pack = _RECORD.pack
+        with self._lock:
+            if self._file is None:
+                return
+            write = self._file.write
+            for packet in packets:
+                write(pack(timestamp_ns, len(packet)))
+                write(packet)
+                self.bytes += len(packet)
+            self.packets += len(packets)
+
+    def attach(self, signal: RawPacketSignal) -> None:
+        """录制 signal 上的逐包与批量数据包"""
+        self._signal = signal
+        signal.packet_received.connect(self.record)
+        signal.batch_received.connect(self.record_many)
+
+    def close(self) -> None:
+        """断开信号并关闭文件"""
+        if self._signal is not None:
+            self._signal._disconnect_signal(self.record)
+            self._signal._disconnect_batch_signal(self.record_many)
+            self._signal = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _truncate_incomplete(path: str) -> None:
+    """
+    校验已存在录制文件的文件头，并截断末尾不完整的记录，使追加的记录紧接最后一条完整记录
+
+    Raises:
+        ValueError: 魔数或格式版本不匹配
+    """
+    with open(path, "r+b") as f:
+        size = os.fstat(f.fileno()).st_size
+        header = f.read(_HEADER.size)
+        magic, version = _HEADER.unpack(header)[:2] if len(header) == _HEADER.size else (header, None)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"unsupported recording format: {magic!r} v{version}")
+        end = _HEADER.size
+        while end + _RECORD.size <= size:
+            f.seek(end)
+            length = _RECORD.unpack(f.read(_RECORD.size))[1]
+            if end + _RECORD.size + length > size:
+                break
+            end += _RECORD.size + length
+        if end < size:
+            print(f"[PacketRecorder] {path}: 截断末尾不完整的记录 ({size - end} 字节)")
+            f.truncate(end)
+
+
+def read_recording(path: str) -> Iterator[Tuple[int, bytes]]:
+    """
+    按写入顺序读取录制文件，末尾不完整的记录（如录制时进程被终止）被忽略
+
+    Yields:
+        (时间戳纳秒, 数据包内容)
+
+    Raises:
+        ValueError: 魔数或格式版本不匹配
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"empty recording file: {path}")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with mm:
+        if len(mm) < _HEADER.size:
+            raise ValueError(f"recording file too short: {path}")
+        magic, version, _ = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"unsupported recording format: {magic!r} v{version}")
+        offset = _HEADER.size
+        end = len(mm)
+        unpack = _RECORD.unpack_from
+        size = _RECORD.size
+        while offset + size <= end:
+            timestamp_ns, length = unpack(mm, offset)
+            offset += size
+            if offset + length > end:
+                break
+            yield timestamp_ns, mm[offset:offset + length]
+            offset += length
+
+
+def recording_info(path: str) -> dict:
+    """
+    统计录制文件
+
+    Returns:
+        包含 packets, bytes, duration（秒）的字典
+    """
+    packets = 0
+    total = 0
+    first = last = None
+    for timestamp_ns, packet in read_recording(path):
+        if first is None or timestamp_ns < first:
+            first = timestamp_ns
+        if last is None or timestamp_ns > last:
+            last = timestamp_ns
+        packets += 1
+        total += len(packet)
+    return {"packets": packets, "bytes": total, "duration": (last - first) / 1e9 if packets else 0.0}
+
+
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:]:
+        info = recording_info(path)
+        print(f"{path}: {info['packets']} 个数据包, {info['bytes']} 字节, 时长 {info['duration']:.1f} 秒")
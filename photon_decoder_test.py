@@ -0,0 +1,101 @@
+"""
+PhotonDecoder 回归测试
+把 bench.synthetic 生成的数据包同时送入内置的 PhotonDecoder 与外部库 photon_packet_parser，
+按旧封装的方式重映射参数 252/253 后逐条比较，并固定两者之间有意的差异:
+
+    响应消息进入 on_response（外部库送到 on_request）
+    元素类型为 Dictionary 的 Array 解码为列表（外部库为 {下标: 字典}）
+    空字节数组解码为 b''（外部库为 []）
+
+用法:
+    python photon_decoder_test.py
+    python -m pytest photon_decoder_test.py
+"""
+import struct
+
+from photon_packet_parser import PhotonPacketParser as ExternalParser
+
+from bench.synthetic import build_packet, byte_array, encode_event, encode_parameters, short, zvz_session
+from network.photon.constants import PhotonMessageType, PhotonParameterKey, Protocol16Type
+from network.photon.decoder import PhotonDecoder
+
+
+def decode_in_tree(payloads):
+    """内置解码器: [(消息种类, 消息码, 参数字典)]"""
+    messages = []
+    decoder = PhotonDecoder(
+        lambda code, parameters: messages.append(("event", code, parameters)),
+        lambda code, parameters: messages.append(("request", code, parameters)),
+        lambda code, parameters: messages.append(("response", code, parameters)),
+    )
+    for payload in payloads:
+        decoder.handle_payload(payload)
+    return messages
+
+
+def decode_external(payloads):
+    """外部库，按旧 core.photon_parser 封装重映射: 事件码取参数 252（缺失时用 Photon 事件码），操作码取参数 253（缺失时丢弃）"""
+    messages = []
+
+    def on_event(event):
+        messages.append(("event", event.parameters.get(PhotonParameterKey.EventCode, event.code), event.parameters))
+
+    def on_request(request):
+        code = request.parameters.get(PhotonParameterKey.OperationCode)
+        if code is not None:
+            messages.append(("request", code, request.parameters))
+
+    parser = ExternalParser(on_event, on_request, on_request)
+    for payload in payloads:
+        parser.HandlePayload(bytes(payload))
+    return messages
+
+
+def test_synthetic_session_matches_external():
+    payloads = [payload for _, payload in zvz_session(players=50, moves_per_second=1000, casts_per_second=100, duration=1.0)]
+    ours = decode_in_tree(payloads)
+    theirs = decode_external(payloads)
+    assert len(ours) == len(theirs), f"消息数不一致: {len(ours)} != {len(theirs)}"
+    mismatches = [(a, b) for a, b in zip(ours, theirs) if a != b]
+    assert not mismatches, f"{len(mismatches)} / {len(ours)} 条消息不一致，首条: {mismatches[0]}"
+    print(f"[photon_decoder_test] {len(ours)} 条消息一致")
+
+
+def test_response_goes_to_on_response():
+    # 操作码(1) 返回码(2) 调试信息(Null) 参数表
+    parameters = encode_parameters({PhotonParameterKey.OperationCode: short(21), 0: short(7)})
+    message = bytes((0xF3, PhotonMessageType.OperationResponse, 1)) + struct.pack('>hB', 0, Protocol16Type.Null) + parameters
+    payload = build_packet([(True, message)])
+    assert decode_in_tree([payload]) == [("response", 21, {PhotonParameterKey.OperationCode: 21, 0: 7})]
+    # 外部库把响应送到 on_request
+    assert decode_external([payload]) == [("request", 21, {PhotonParameterKey.OperationCode: 21, 0: 7})]
+
+
+def test_dictionary_array_decodes_to_list():
+    # Array(数量=2, 元素类型=Dictionary) 键类型 Byte 值类型 Short，每个元素: 条目数 + 条目
+    value = struct.pack('>hBBB', 2, Protocol16Type.Dictionary, Protocol16Type.Byte, Protocol16Type.Short)
+    value += struct.pack('>hBh', 1, 1, 100)
+    value += struct.pack('>hBhBh', 2, 2, 200, 3, 300)
+    message = encode_event(10, {0: short(1)})
+    message = message[:3] + struct.pack('>h', 3) + message[5:] + struct.pack('>BB', 1, Protocol16Type.Array) + value
+    payload = build_packet([(True, message)])
+    [(_, code, parameters)] = decode_in_tree([payload])
+    assert code == 10
+    assert parameters[1] == [{1: 100}, {2: 200, 3: 300}]
+    [(_, _, external)] = decode_external([payload])
+    assert external[1] == {0: {1: 100}, 1: {2: 200, 3: 300}}
+
+
+def test_empty_byte_array_decodes_to_bytes():
+    payload = build_packet([(True, encode_event(10, {1: byte_array(b'')}))])
+    [(_, _, parameters)] = decode_in_tree([payload])
+    assert parameters[1] == b''
+    [(_, _, external)] = decode_external([payload])
+    assert external[1] == []
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"[photon_decoder_test] {name} 通过")
@@ -4,13 +4,13 @@ from typing import Any, Dict
 from pydantic import BaseModel, Field
 from base.plugin import BasePlugin
 from base.base2 import GameEvent, P
-from base.event_codes import EventCodes, EventType
+from base.event_codes import EventCodes
 from controllor.move import KeyboardController
 import keyboard
-from core.events.response.join import JoinFinishResponseEvent
+from core.events.response.join import JoinFinishResponseEvent, JoinFinishResponseEventParser
 from event_tool.object import object_to_guid
-from core.events.request.move import MoveRequestEvent
-from core.events.response.change_cluster import ChangeClusterResponseEvent 
+from core.events.request.move import MoveRequestEvent, MoveRequestEventParser
+from core.events.response.change_cluster import ChangeClusterResponseEvent, ChangeClusterResponseEventParser
 from plugins.autodrive_plugin.path_compose import douglas_peucker
 from collections import defaultdict
 import time
@@ -18,6 +18,11 @@ import time
 
 
 class PathRecorderPlugin(BasePlugin):
+    subscriptions = (
+        (MoveRequestEventParser.type, MoveRequestEventParser.code),
+        (ChangeClusterResponseEventParser.type, ChangeClusterResponseEventParser.code),
+        (JoinFinishResponseEventParser.type, JoinFinishResponseEventParser.code),
+    )
 
     def __init__(self):
         super().__init__("path_recorder_plugin", "路径记录器 (Path Recorder)")
@@ -2,11 +2,10 @@
 FPS 插件主类
 整合 overlay 和 config 组件
 """
-from core.events.response.join import JoinFinishResponseEvent
-from core.events.response.change_cluster import ChangeClusterResponseEvent
-from core.events.request.move import MoveRequestEvent
+from core.events.response.join import JoinFinishResponseEvent, JoinFinishResponseEventParser
+from core.events.response.change_cluster import ChangeClusterResponseEvent, ChangeClusterResponseEventParser
+from core.events.request.move import MoveRequestEvent, MoveRequestEventParser
 from base.plugin import BasePlugin
-from base.event_codes import EventType
 from .overlay_widget import FPSOverlayWidget
 from .config_widget import FPSConfigWidget
 from base.base2 import P
@@ -14,6 +13,11 @@ from base.base2 import P
 
 class FPSPlugin(BasePlugin):
     """FPS 监控插件"""
+    subscriptions = (
+        (MoveRequestEventParser.type, MoveRequestEventParser.code),
+        (ChangeClusterResponseEventParser.type, ChangeClusterResponseEventParser.code),
+        (JoinFinishResponseEventParser.type, JoinFinishResponseEventParser.code),
+    )
     
     def __init__(self):
         super().__init__("fps_plugin", "FPS Monitor",)
@@ -7,6 +7,7 @@ from game_data.items import get_item
 
 
 class LogPlugin(BasePlugin):
+    debug_tap = True
 
     def __init__(self):
         super().__init__("log_plugin", "系统日志 (Logs)")
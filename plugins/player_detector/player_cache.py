@@ -0,0 +1,73 @@
+"""
+玩家缓存
+按名字做 LRU 淘汰，同时维护 oid -> 名字 的二级索引，CastStart 等按 oid 查找玩家时为 O(1)
+"""
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+
+
+class PlayerCache(object):
+    """
+    玩家 LRU 缓存（名字 -> 玩家数据）与 oid 索引
+    玩家数据为 PlayerMonitorPanel 使用的字典，必须包含 "oid" 与 "name"
+    """
+
+    def __init__(self, max_size: int = 500):
+        """
+        Args:
+            max_size: 最多缓存的玩家数，超出时淘汰最久未更新的玩家
+        """
+        self.max_size = max_size
+        self._players: "OrderedDict[str, dict]" = OrderedDict()
+        self._oid_index: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._players
+
+    def values(self) -> Iterator[dict]:
+        return iter(self._players.values())
+
+    def put(self, player_data: dict) -> None:
+        """
+        放入或更新玩家，并同步 oid 索引
+        """
+        name = player_data["name"]
+        oid = player_data["oid"]
+        previous = self._players.get(name)
+        if previous is not None:
+            self._players.move_to_end(name)
+            # 同一玩家换了 oid（重新进入视野），旧 oid 不再指向该玩家
+            if previous["oid"] != oid:
+                self._unindex(previous["oid"], name)
+        self._players[name] = player_data
+        self._oid_index[oid] = name
+
+        if len(self._players) > self.max_size:
+            evicted_name, evicted = self._players.popitem(last=False)
+            self._unindex(evicted["oid"], evicted_name)
+
+    def get(self, name: str) -> Optional[dict]:
+        return self._players.get(name)
+
+    def name_by_oid(self, oid: int) -> Optional[str]:
+        """
+        按 oid 查找玩家名字
+
+        Returns:
+            名字，oid 不在索引中返回 None
+        """
+        return self._oid_index.get(oid)
+
+    def forget_oid(self, oid: int) -> None:
+        """
+        实体离开视野后 oid 可能被复用，从索引中移除；玩家数据仍保留在缓存中
+        """
+        self._oid_index.pop(oid, None)
+
+    def _unindex(self, oid: int, name: str) -> None:
+        # oid 可能已被其他玩家占用，只移除仍指向该玩家的映射
+        if self._oid_index.get(oid) == name:
+            del self._oid_index[oid]
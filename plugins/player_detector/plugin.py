@@ -1,6 +1,6 @@
  
 from base.plugin import BasePlugin
-from base.base2 import GameEvent, Entity
+from base.base2 import GameEvent, Entity, SlotType
 from base.event_codes import EventCodes, EventType
 from ui.panels.log_panel import LogPanel
 from ui.panels.player_monitor_panel import PlayerMonitorPanel
@@ -9,18 +9,31 @@ from core.events.event.spell import CastStartEvent
 import time
 from game_data.spells import get_spell_by_index
 from game_data.items import get_item_name
-from collections import OrderedDict
+from event_tool.equipment import get_equipment_tables
+from .player_cache import PlayerCache
 
 
 class PlayerPlugin(BasePlugin):
+    subscriptions = (
+        (EventType.Event, EventCodes.NewCharacter),
+        (EventType.Event, EventCodes.CastStart),
+        (EventType.Event, EventCodes.Leave),
+    )
 
     def __init__(self):
         super().__init__("player", "玩家追踪")
         self._config_widget = None
-        self._players = OrderedDict() # LRU Cache: name -> player_data
         self._max_cache_size = 500
+        self._players = PlayerCache(self._max_cache_size) # LRU Cache: name -> player_data, 附带 oid -> name 索引
+        self._tables = None # 物品/技能查找表，首次使用时构建
 
 
+    @property
+    def tables(self):
+        if self._tables is None:
+            self._tables = get_equipment_tables()
+        return self._tables
+
     def get_overlay_widget(self):
         return None
 
@@ -45,23 +58,20 @@ class PlayerPlugin(BasePlugin):
 
     def handle_event(self, event: GameEvent):
         if isinstance(event, NewCharacterEvent):
-            self._update_player_data(event.entity)
+            self._update_player_data(event.entity, event.equipment_slots)
+
+        if event.type == EventType.Event and event.code == EventCodes.Leave:
+            self._players.forget_oid(event.raw_data.get(0))
 
         if isinstance(event, CastStartEvent):
-            spell = get_spell_by_index(event.spell_id)
             if self._config_widget:
-                if spell:
-                    # Find player name from OID
-                    player_name = None
-                    for p in self._players.values():
-                        if p["oid"] == event.oid:
-                            player_name = p["name"]
-                            break
-                    
-                    if player_name:
-                        self._config_widget.trigger_skill_alert(player_name, event.spell_id, spell.name_locatag)
-
-    def _update_player_data(self, entity: Entity):
+                # Find player name from OID
+                player_name = self._players.name_by_oid(event.oid)
+
+                if player_name:
+                    self._config_widget.trigger_skill_alert(player_name, event.spell_id, self.tables.spell_name(event.spell_id))
+
+    def _update_player_data(self, entity: Entity, slots):
         # Format data for PlayerMonitorPanel
         
         # Ensure name is clean
@@ -78,69 +88,38 @@ class PlayerPlugin(BasePlugin):
             "equipment": {}
         }
 
+        tables = self.tables
+
         # Helper to format item data
-        def format_item(item):
-            if not item or item.index == 0:
+        def format_item(slot):
+            index, spell_ids = slot
+            if index == 0:
                 return None
-            
-            # get_item_name returns str, need to check if it returns unique_name or localized name?
-            # looking at plugin.py imports: from game_data.items import get_item_name
-            # usually get_item_name returns localized name.
-            # We need unique_name for armor type detection in UI.
-            # Let's check game_data.items.py again if needed, but I recall get_item_name returns name.
-            # Wait, PlayerMonitorPanel expects "unique_name" for armor type.
-            # And "name" for display.
-            # We need a way to get unique_name from index.
-            # I should import get_item_unique_name if available or access item_idx directly?
-            # Re-checking game_data/items.py in my memory/search...
-            # Previous Read of game_data/items.py showed:
-            # item_idx = {} ... Item(index, name, ..., unique_name)
-            # So I can access item_idx to get unique_name.
-            
-            from game_data.items import item_idx, get_item_name as get_loc_name
-            
-            item_info = item_idx.get(str(item.index)) or item_idx.get(item.index)
-            unique_name = item_info.unique_name if item_info else ""
-            name = get_loc_name(item.index)
-            
-            spells = []
-            for spell_id in item.spells:
-                s = get_spell_by_index(spell_id)
-                if s:
-                    # Append tuple (spell_id, spell_name)
-                    spells.append((spell_id, s.name_locatag)) 
-            
+            unique_name, item_name, armor_class = tables.item(index)
             return {
-                "name": name,
+                "name": item_name,
                 "unique_name": unique_name,
-                "spells": spells # List of (id, name) tuples
+                "armor_class": armor_class,
+                "spells": [(spell_id, tables.spell_name(spell_id)) for spell_id in spell_ids] # List of (id, name) tuples
             }
 
-        equip = entity.equipment
+        # UI PlayerMonitorPanel 的胸甲槽位 key 为 "armor"
+        chest = format_item(slots[SlotType.Chest])
         player_data["equipment"] = {
-            "main_hand": format_item(equip.main_hand),
-            "off_hand": format_item(equip.off_hand),
-            "head": format_item(equip.head),
-            "chest": format_item(equip.chest), # UI uses 'armor' key? Let's check UI.
-            # UI PlayerMonitorPanel uses "armor" key for chest/armor slot?
-            # Let's check PlayerMonitorPanel.slots: "armor": (1, 1, "胸甲")
-            # So yes, key is "armor". But Entity has "chest".
-            "armor": format_item(equip.chest), 
-            "shoes": format_item(equip.shoes),
-            "bag": format_item(equip.bag),
-            "cape": format_item(equip.cape),
-            "potion": format_item(equip.potion),
-            "food": format_item(equip.buff_food)
+            "main_hand": format_item(slots[SlotType.MainHand]),
+            "off_hand": format_item(slots[SlotType.OffHand]),
+            "head": format_item(slots[SlotType.Head]),
+            "chest": chest,
+            "armor": chest,
+            "shoes": format_item(slots[SlotType.Shoes]),
+            "bag": format_item(slots[SlotType.Bag]),
+            "cape": format_item(slots[SlotType.Cape]),
+            "potion": format_item(slots[SlotType.Potion]),
+            "food": format_item(slots[SlotType.BuffFood])
         }
 
-        # Cache Logic (LRU by name)
-        key = name
-        if key in self._players:
-            self._players.move_to_end(key)
-        self._players[key] = player_data
-        
-        if len(self._players) > self._max_cache_size:
-            self._players.popitem(last=False) # Remove first (oldest)
+        # Cache Logic (LRU by name, oid 索引随之更新与淘汰)
+        self._players.put(player_data)
 
         # Update UI if initialized
         if self._config_widget:
@@ -1138,7 +1138,7 @@ class PlayerMonitorPanel(QWidget):
             main_hand = main_hand_data.get("name", "None")
             
             armor_data = equip.get("armor") or {}
-            armor_type = self._get_armor_type(armor_data.get("unique_name", ""))
+            armor_type = self._get_armor_type(armor_data.get("armor_class", ""))
             
             display_text = f"{name} | {main_hand} | {armor_type}"
             
@@ -1146,16 +1146,15 @@ class PlayerMonitorPanel(QWidget):
             item.setData(Qt.UserRole, name)
             self.player_list.addItem(item)
 
-    def _get_armor_type(self, unique_name):
-        if not unique_name:
-            return "Unknown"
-        if "ARMOR_PLATE" in unique_name:
-            return "板甲 (Plate)"
-        elif "ARMOR_CLOTH" in unique_name:
-            return "布甲 (Cloth)"
-        elif "ARMOR_LEATHER" in unique_name:
-            return "皮甲 (Leather)"
-        return "Unknown"
+    ARMOR_TYPE_LABELS = {
+        "PLATE": "板甲 (Plate)",
+        "CLOTH": "布甲 (Cloth)",
+        "LEATHER": "皮甲 (Leather)",
+    }
+
+    def _get_armor_type(self, armor_class):
+        # armor_class 由 EquipmentTables 预先从物品唯一名解析
+        return self.ARMOR_TYPE_LABELS.get(armor_class, "Unknown")
 
     def _on_player_selected(self, current: QListWidgetItem, previous: QListWidgetItem):
         if not current: